@@ -0,0 +1,228 @@
+"""Engine-vs-engine matches over paired openings, with Elo and SPRT reporting."""
+
+from __future__ import annotations
+
+import dataclasses as dc
+import math
+import random
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+import numpy as np
+
+from chess.ai.minmax import MinMaxAgent
+from chess.ai.profiling import SearchProfiler, make_profiler
+from chess.ai.selfplay import DEFAULT_MAX_PLIES, SelfPlayGame, play_out, stream_jobs
+from chess.core.board_state import START_FEN, BoardState
+from chess.core.types import Color
+
+_SPEC_KEYS = {"depth": "depth", "samples": "max_n_samples", "movetime": "movetime"}
+
+
+@dc.dataclass(frozen=True)
+class AgentSpec:
+    """One arena contestant; ``movetime`` (ms) deepens iteratively up to ``depth``."""
+
+    depth: int = 3
+    max_n_samples: int | None = None
+    movetime: int | None = None
+
+    @classmethod
+    def parse(cls, text: str) -> AgentSpec:
+        """Parse ``depth=3,samples=8,movetime=200`` (any subset, any order)."""
+        values: dict[str, int] = {}
+        for item in filter(None, (part.strip() for part in text.split(","))):
+            key, sep, raw = item.partition("=")
+            if not sep or key not in _SPEC_KEYS:
+                raise ValueError(f"agent spec items are {sorted(_SPEC_KEYS)}=N, got {item!r}")
+            values[_SPEC_KEYS[key]] = int(raw)
+        spec = cls(**values)
+        if spec.depth < 1:
+            raise ValueError(f"agent depth must be >= 1, got {spec.depth}")
+        return spec
+
+    def label(self) -> str:
+        parts = [f"depth={self.depth}"]
+        if self.max_n_samples is not None:
+            parts.append(f"samples={self.max_n_samples}")
+        if self.movetime is not None:
+            parts.append(f"movetime={self.movetime}")
+        return ",".join(parts)
+
+    def agent(self, color: Color, profiler: SearchProfiler | None = None) -> MinMaxAgent:
+        return MinMaxAgent(
+            color,
+            depth=self.depth,
+            max_n_samples=self.max_n_samples,
+            workers=1,
+            profiler=profiler,
+        )
+
+
+@dc.dataclass(frozen=True)
+class Sprt:
+    """Sequential probability ratio test of H0 ``elo0`` against H1 ``elo1``."""
+
+    elo0: float = 0.0
+    elo1: float = 10.0
+    alpha: float = 0.05
+    beta: float = 0.05
+
+    def bounds(self) -> tuple[float, float]:
+        return math.log(self.beta / (1 - self.alpha)), math.log((1 - self.beta) / self.alpha)
+
+    def decide(self, llr: float) -> str | None:
+        """``"H0"`` or ``"H1"`` once the log-likelihood ratio crosses a bound."""
+        lower, upper = self.bounds()
+        if llr <= lower:
+            return "H0"
+        if llr >= upper:
+            return "H1"
+        return None
+
+
+def _logistic(elo: float) -> float:
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def _elo(score: float) -> float:
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return 400 * math.log10(score / (1 - score))
+
+
+@dc.dataclass
+class ArenaStats:
+    """Running match totals; wins, draws and losses are from engine A's side."""
+
+    wins: int = 0
+    draws: int = 0
+    losses: int = 0
+    ms: dict[str, float] = dc.field(default_factory=lambda: {"A": 0.0, "B": 0.0})
+    nodes: dict[str, int] = dc.field(default_factory=lambda: {"A": 0, "B": 0})
+    moves: dict[str, int] = dc.field(default_factory=lambda: {"A": 0, "B": 0})
+
+    @property
+    def games(self) -> int:
+        return self.wins + self.draws + self.losses
+
+    @property
+    def score(self) -> float:
+        return (self.wins + self.draws / 2) / self.games if self.games else 0.5
+
+    def add(self, game: SelfPlayGame) -> None:
+        # Games cut off at ``max_plies`` (result ``*``) are adjudicated as draws.
+        if game.result in ("1/2-1/2", "*"):
+            self.draws += 1
+        elif (game.result == "1-0") == (game.white == "A"):
+            self.wins += 1
+        else:
+            self.losses += 1
+        # White plays the even plies.
+        for ply, (ms, nodes) in enumerate(zip(game.move_ms, game.move_nodes, strict=True)):
+            side = game.white if ply % 2 == 0 else game.black
+            self.ms[side] += ms
+            self.nodes[side] += nodes
+            self.moves[side] += 1
+
+    def _variance(self) -> float:
+        """Per-game score variance of the trinomial win/draw/loss sample."""
+        s = self.score
+        spread = self.wins * (1 - s) ** 2 + self.draws * (0.5 - s) ** 2 + self.losses * s**2
+        return spread / self.games if self.games else 0.0
+
+    def elo(self) -> tuple[float, float]:
+        """Elo difference of A over B and its 95% confidence half-width."""
+        if not self.games:
+            return 0.0, math.inf
+        margin = 1.96 * math.sqrt(self._variance() / self.games)
+        low, high = _elo(self.score - margin), _elo(self.score + margin)
+        return _elo(self.score), (high - low) / 2
+
+    def llr(self, sprt: Sprt) -> float:
+        """Log-likelihood ratio of H1 over H0 (normal approximation of the score)."""
+        variance = self._variance()
+        if self.games < 2 or variance == 0:
+            return 0.0
+        s0, s1 = _logistic(sprt.elo0), _logistic(sprt.elo1)
+        return self.games * (s1 - s0) * (2 * self.score - s0 - s1) / (2 * variance)
+
+    def average(self, side: str) -> tuple[float, float]:
+        """Mean milliseconds and nodes per move for ``side`` (``"A"`` or ``"B"``)."""
+        moves = max(self.moves[side], 1)
+        return self.ms[side] / moves, self.nodes[side] / moves
+
+
+def load_openings(path: Path | str) -> list[str]:
+    """FEN/EPD lines from ``path``; blank lines and ``#`` comments are skipped."""
+    openings: list[str] = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        fields = line.split("#", 1)[0].split()
+        if not fields:
+            continue
+        # EPD has 4 position fields followed by operations instead of the two clocks.
+        clocks = len(fields) >= 6 and fields[4].isdigit() and fields[5].isdigit()
+        fen = " ".join(fields[:6] if clocks else fields[:4])
+        BoardState.from_fen(fen)
+        openings.append(fen)
+    if not openings:
+        raise ValueError(f"{path}: no opening positions")
+    return openings
+
+
+def play_match_game(
+    index: int,
+    seed: int,
+    fen: str,
+    a: AgentSpec,
+    b: AgentSpec,
+    max_plies: int = DEFAULT_MAX_PLIES,
+    profile: bool = False,
+    pstats_dir: Path | None = None,
+) -> SelfPlayGame:
+    """Game ``index`` of a match: A has White on even indices, B on odd ones."""
+    np.random.seed(seed)
+    state = BoardState.from_fen(fen)
+    white, black = ("A", "B") if index % 2 == 0 else ("B", "A")
+    specs = {"A": a, "B": b}
+    game = SelfPlayGame(index=index, seed=seed, start_fen=fen, white=white, black=black)
+    profiler = make_profiler(profile, pstats_dir)
+    agents = {
+        0: specs[white].agent(Color.WHITE, profiler),
+        1: specs[black].agent(Color.BLACK, profiler),
+    }
+    movetimes = {0: specs[white].movetime, 1: specs[black].movetime}
+    return play_out(game, state, agents, max_plies, movetimes)
+
+
+def run_arena(
+    a: AgentSpec,
+    b: AgentSpec,
+    games: int,
+    *,
+    openings: Sequence[str] = (START_FEN,),
+    max_plies: int = DEFAULT_MAX_PLIES,
+    workers: int = 0,
+    seed: int | None = None,
+    profile: bool = False,
+    pstats_dir: Path | None = None,
+) -> Iterator[SelfPlayGame]:
+    """Yield match games as they finish; stop iterating to abandon the rest.
+
+    Each opening is played twice with colours reversed (games ``2k`` and ``2k + 1``).
+    """
+    if seed is None:
+        seed = random.randrange(1 << 31)
+    jobs = [
+        (
+            index,
+            seed + index,
+            openings[(index // 2) % len(openings)],
+            a,
+            b,
+            max_plies,
+            profile,
+            pstats_dir,
+        )
+        for index in range(games)
+    ]
+    yield from stream_jobs(play_match_game, jobs, workers)
@@ -0,0 +1,185 @@
+"""Offline batch analysis: stream positions from disk through a process pool in chunks.
+
+Input is FEN/EPD text (one position per line, ``#`` comments, optional ``id "..."``) or a
+packed position file: an 8-byte magic followed by fixed ``BoardState.to_packed`` records,
+read through a memory map. Both are consumed lazily and at most ``2 * workers`` chunks
+are in flight, so memory stays flat however large the input is.
+"""
+
+from __future__ import annotations
+
+import dataclasses as dc
+import itertools
+import json
+import re
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+
+from chess.ai.minmax import MinMaxAgent
+from chess.core.board_state import PACKED_SIZE, BoardState, move_to_uci
+from chess.core.types import Color
+
+POSITIONS_MAGIC = b"CHPOS001"
+POSITION_RECORD = np.dtype((np.void, PACKED_SIZE))
+DEFAULT_CHUNK_SIZE = 16
+# Packed records mapped per slice while streaming a binary file.
+_READ_BLOCK = 4096
+
+_EPD_ID = re.compile(r'\bid\s+"([^"]*)"')
+
+# ``(index, id, position)``: ``position`` is FEN text or a packed record.
+Job = tuple[int, str | None, str | bytes]
+
+
+@dc.dataclass
+class PositionResult:
+    """Analysis of one input position; ``score`` is from the side to move, in pawns."""
+
+    index: int
+    fen: str
+    id: str | None = None
+    best: str | None = None
+    score: float | None = None
+    pv: list[str] = dc.field(default_factory=list)
+    lines: list[dict[str, object]] = dc.field(default_factory=list)
+    depth: int = 0
+    nodes: int = 0
+    ms: float = 0.0
+    error: str | None = None
+
+    def to_json(self) -> str:
+        return json.dumps(dc.asdict(self), separators=(",", ":"))
+
+
+def parse_position_line(line: str) -> tuple[str | None, str] | None:
+    """``(id, fen)`` from one FEN/EPD line, or ``None`` for blank and comment lines."""
+    fields = line.split("#", 1)[0].split()
+    if not fields:
+        return None
+    # EPD has 4 position fields followed by operations instead of the two clocks.
+    clocks = len(fields) >= 6 and fields[4].isdigit() and fields[5].isdigit()
+    match = _EPD_ID.search(line)
+    return (match.group(1) if match else None), " ".join(fields[:6] if clocks else fields[:4])
+
+
+def iter_positions(path: Path | str) -> Iterator[tuple[str | None, str | bytes]]:
+    """Lazily yield ``(id, position)`` from a FEN/EPD text file or a packed position file."""
+    path = Path(path)
+    with path.open("rb") as handle:
+        packed = handle.read(len(POSITIONS_MAGIC)) == POSITIONS_MAGIC
+    if packed:
+        size = path.stat().st_size - len(POSITIONS_MAGIC)
+        if size % PACKED_SIZE:
+            raise ValueError(f"{path}: truncated packed position records")
+        if size == 0:
+            return
+        records = np.memmap(path, dtype=POSITION_RECORD, mode="r", offset=len(POSITIONS_MAGIC))
+        for start in range(0, len(records), _READ_BLOCK):
+            for record in records[start : start + _READ_BLOCK].tolist():
+                yield None, record
+        return
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            parsed = parse_position_line(line)
+            if parsed is not None:
+                yield parsed
+
+
+def write_packed_positions(path: Path | str, fens: Iterable[str]) -> int:
+    """Stream FEN strings into a packed position file; returns the number of records."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with path.open("wb") as handle:
+        handle.write(POSITIONS_MAGIC)
+        for fen in fens:
+            handle.write(BoardState.from_fen(fen).to_packed())
+            count += 1
+    return count
+
+
+def analyse_position(
+    index: int, label: str | None, position: str | bytes, depth: int, multipv: int = 1
+) -> PositionResult:
+    """Search one position with a fresh agent, so results do not depend on chunking."""
+    fen = position if isinstance(position, str) else ""
+    try:
+        state = (
+            BoardState.from_fen(position)
+            if isinstance(position, str)
+            else BoardState.from_packed(position)
+        )
+    except ValueError as exc:
+        return PositionResult(index=index, fen=fen, id=label, error=str(exc))
+    result = PositionResult(index=index, fen=state.to_fen(), id=label, depth=depth)
+    color = Color.WHITE if state.turn == 0 else Color.BLACK
+    agent = MinMaxAgent(color=color, depth=depth, workers=1)
+    start = time.perf_counter()
+    lines = agent.analyse_state(state, depth, multipv)
+    result.ms = round((time.perf_counter() - start) * 1000, 3)
+    result.nodes = agent.stats.nodes + agent.stats.qnodes
+    if not lines:
+        # Checkmate or stalemate: nothing to search, the evaluation is the result.
+        result.score = agent.evaluate_state(state)
+        return result
+    result.best = move_to_uci(lines[0].move)
+    result.score = round(lines[0].value, 4)
+    result.pv = [move_to_uci(move) for move in lines[0].pv]
+    if multipv > 1:
+        result.lines = [
+            {
+                "move": move_to_uci(line.move),
+                "score": round(line.value, 4),
+                "pv": [move_to_uci(move) for move in line.pv],
+            }
+            for line in lines
+        ]
+    return result
+
+
+def analyse_chunk(jobs: list[Job], depth: int, multipv: int = 1) -> list[PositionResult]:
+    return [analyse_position(*job, depth, multipv) for job in jobs]
+
+
+def stream_analysis(
+    positions: Iterable[tuple[str | None, str | bytes]],
+    depth: int,
+    *,
+    multipv: int = 1,
+    workers: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[PositionResult]:
+    """Yield results chunk by chunk as they complete (input order within a chunk).
+
+    ``workers`` follows ``ai.workers`` (``0`` = all cores); one worker runs in-process.
+    Input is pulled only when fewer than ``2 * workers`` chunks are pending. Closing
+    the iterator early cancels the chunks that have not started.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be >= 1, got {chunk_size}")
+    indexed = ((index, label, position) for index, (label, position) in enumerate(positions))
+    chunks = iter(lambda: list(itertools.islice(indexed, chunk_size)), [])
+    workers = MinMaxAgent.resolve_pool_workers(workers)
+    if workers == 1:
+        for chunk in chunks:
+            yield from analyse_chunk(chunk, depth, multipv)
+        return
+    pool = ProcessPoolExecutor(max_workers=workers)
+    pending: set[Future[list[PositionResult]]] = set()
+    try:
+        for chunk in chunks:
+            pending.add(pool.submit(analyse_chunk, chunk, depth, multipv))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+    finally:
+        pool.shutdown(cancel_futures=True)
@@ -0,0 +1,184 @@
+"""Fixed-depth search benchmark over a position suite, serial and on the search pool."""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import sys
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import Any
+
+from chess.ai.batch import parse_position_line
+from chess.ai.minmax import MinMaxAgent, shutdown_search_pool, warm_search_pool
+from chess.core.board_state import BoardState, move_to_uci
+from chess.core.types import Color
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+REPORT_VERSION = 1
+DEFAULT_DEPTH = 3
+
+
+def load_positions(path: Path | str) -> list[tuple[str, str]]:
+    """``(id, fen)`` pairs from an EPD/FEN file; unnamed lines become ``pos<N>``."""
+    positions: list[tuple[str, str]] = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        parsed = parse_position_line(line)
+        if parsed is None:
+            continue
+        label, fen = parsed
+        BoardState.from_fen(fen)
+        positions.append((label or f"pos{len(positions) + 1}", fen))
+    if not positions:
+        raise ValueError(f"{path}: no benchmark positions")
+    return positions
+
+
+def peak_rss_mb(children: bool = False) -> dict[str, float] | None:
+    """Peak resident set size in MiB of this process and, optionally, its reaped children.
+
+    The children figure is the largest single child (pool worker), not their sum.
+    """
+    if resource is None:
+        return None
+    # ``ru_maxrss`` is KiB on Linux and bytes on macOS.
+    scale = 1 / (1 << 20) if sys.platform == "darwin" else 1 / (1 << 10)
+    peak = {"self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale, 1)}
+    if children:
+        rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+        peak["children"] = round(rss, 1)
+    return peak
+
+
+def bench_position(fen: str, depth: int, workers: int) -> dict[str, Any]:
+    """Iteratively deepen ``fen`` to ``depth`` with a fresh agent; counters for the run.
+
+    The fresh agent is a new search lineage, so pool workers start it with empty TTs and
+    results do not depend on which positions ran before.
+    """
+    state = BoardState.from_fen(fen)
+    color = Color.WHITE if state.turn == 0 else Color.BLACK
+    agent = MinMaxAgent(color=color, depth=depth, workers=workers)
+    move = agent.iterate(state, depth)
+    stats = agent.stats
+    return {
+        "best": move_to_uci(move) if move is not None else None,
+        "nodes": stats.nodes,
+        "qnodes": stats.qnodes,
+        "ms": round(stats.elapsed * 1000, 1),
+        "nps": round(stats.nps),
+        "depth_ms": [round(ms, 1) for ms in stats.depth_ms],
+    }
+
+
+def run_bench(
+    positions: Sequence[tuple[str, str]],
+    depth: int = DEFAULT_DEPTH,
+    workers: Sequence[int] = (1,),
+    on_result: Callable[[str, int, dict[str, Any]], None] | None = None,
+) -> dict[str, Any]:
+    """Search every position once per worker count and build the JSON report.
+
+    Worker counts go through ``ai.workers`` resolution (``0`` = all cores) and duplicates
+    are dropped. The pool's processes are started before timing so process spawn is not
+    measured; the warm-up runs no search, so no position starts with a warm TT.
+    """
+    counts = list(dict.fromkeys(MinMaxAgent.resolve_pool_workers(count) for count in workers))
+    host = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+    results: dict[str, dict[str, Any]] = {name: {} for name, _ in positions}
+    totals: dict[str, dict[str, Any]] = {}
+    try:
+        for count in counts:
+            if count > 1:
+                warm_search_pool(count)
+            nodes = 0
+            ms = 0.0
+            for name, fen in positions:
+                result = bench_position(fen, depth, count)
+                results[name][str(count)] = result
+                nodes += result["nodes"] + result["qnodes"]
+                ms += result["ms"]
+                if on_result is not None:
+                    on_result(name, count, result)
+            totals[str(count)] = {
+                "nodes": nodes,
+                "ms": round(ms, 1),
+                "nps": round(nodes / ms * 1000) if ms else 0,
+            }
+    finally:
+        # Reap the pool so its workers count towards the children's peak RSS.
+        shutdown_search_pool(wait=True)
+    serial, widest = str(counts[0]), str(counts[-1])
+    speedup = None
+    if len(counts) > 1 and totals[widest]["ms"]:
+        speedup = round(totals[serial]["ms"] / totals[widest]["ms"], 2)
+    return {
+        "version": REPORT_VERSION,
+        "depth": depth,
+        "workers": counts,
+        "host": host,
+        "positions": [{"id": name, "fen": fen, "runs": results[name]} for name, fen in positions],
+        "totals": totals,
+        "speedup": speedup,
+        "peak_rss_mb": peak_rss_mb(children=max(counts) > 1),
+    }
+
+
+def write_report(path: Path | str, report: dict[str, Any]) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def load_report(path: Path | str) -> dict[str, Any]:
+    report = json.loads(Path(path).read_text(encoding="utf-8"))
+    if report.get("version") != REPORT_VERSION:
+        raise ValueError(f"{path}: unsupported bench report version {report.get('version')!r}")
+    return report
+
+
+def _delta(value: float, base: float) -> str:
+    return f"{(value - base) / base:+.1%}" if base else "n/a"
+
+
+def compare_reports(
+    report: dict[str, Any], baseline: dict[str, Any]
+) -> tuple[list[tuple[str, str]], list[str]]:
+    """Table rows of totals against ``baseline`` and the ids whose search changed.
+
+    A position "changed" when its serial node count or best move differs: timing noise
+    cannot do that, so it flags a behavioural change rather than a speed regression.
+    """
+    if report["depth"] != baseline["depth"]:
+        raise ValueError(f"baseline was run at depth {baseline['depth']}, not {report['depth']}")
+    rows: list[tuple[str, str]] = []
+    for count, total in report["totals"].items():
+        base = baseline["totals"].get(count)
+        if base is None:
+            continue
+        for metric in ("nodes", "ms", "nps"):
+            new, old = total[metric], base[metric]
+            rows.append(
+                (f"workers={count} {metric}", f"{new} (baseline {old}, {_delta(new, old)})")
+            )
+    if report["speedup"] is not None and baseline.get("speedup") is not None:
+        rows.append(("speedup", f"{report['speedup']:.2f}x (baseline {baseline['speedup']:.2f}x)"))
+    base_runs = {entry["id"]: entry["runs"] for entry in baseline["positions"]}
+    changed = []
+    for entry in report["positions"]:
+        old = base_runs.get(entry["id"], {}).get("1")
+        new = entry["runs"].get("1")
+        if old is None or new is None:
+            continue
+        if (old["nodes"], old["best"]) != (new["nodes"], new["best"]):
+            changed.append(entry["id"])
+    return rows, changed
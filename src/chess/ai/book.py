@@ -0,0 +1,188 @@
+"""Opening book: weighted moves keyed by Zobrist hash in a compact memory-mapped file.
+
+File layout (little endian): an 8-byte magic, the 64-bit hash of the starting position
+(so books built with a different Zobrist table are rejected), then fixed 12-byte records
+``(key: u64, move: u16, weight: u16)`` sorted by key. Lookups binary-search the mapped
+``key`` column, so opening a book costs no parsing and no per-entry allocation.
+"""
+
+from __future__ import annotations
+
+import random
+import struct
+from collections import Counter
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from pathlib import Path
+
+import numpy as np
+
+from chess.ai.minmax import MinMaxAgent
+from chess.core.board_state import START_FEN, BoardState, StateMove
+from chess.core.pgn import iter_games
+from chess.core.types import Color
+from chess.log import get_logger
+
+BOOK_MAGIC = b"CHBOOK01"
+BOOK_RECORD = np.dtype([("key", "<u8"), ("move", "<u2"), ("weight", "<u2")])
+_HEADER = struct.Struct("<8sQ")
+_MAX_WEIGHT = 0xFFFF
+
+logger = get_logger(__name__)
+
+
+def encode_move(move: StateMove) -> int:
+    """Pack a move as ``from | to << 6 | promotion << 12`` (promotion 0 when absent)."""
+    fx, fy, tx, ty = move[:4]
+    promotion = move[4] if len(move) == 5 else 0
+    return (fy * 8 + fx) | ((ty * 8 + tx) << 6) | (promotion << 12)
+
+
+def decode_move(code: int) -> StateMove:
+    origin, target, promotion = code & 0x3F, (code >> 6) & 0x3F, code >> 12
+    move = (origin % 8, origin // 8, target % 8, target // 8)
+    return (*move, promotion) if promotion else move
+
+
+def starting_state() -> BoardState:
+    return BoardState.initial()
+
+
+class OpeningBook:
+    """Read-only view over sorted book records (usually a ``np.memmap``)."""
+
+    def __init__(self, records: np.ndarray, rng: random.Random | None = None) -> None:
+        self._records = records
+        self._keys = records["key"]
+        self._rng = rng or random.Random()
+
+    @classmethod
+    def open(cls, path: Path | str, rng: random.Random | None = None) -> OpeningBook:
+        book_path = Path(path)
+        with book_path.open("rb") as handle:
+            header = handle.read(_HEADER.size)
+        if len(header) != _HEADER.size:
+            raise ValueError(f"{book_path}: truncated opening book header")
+        magic, fingerprint = _HEADER.unpack(header)
+        if magic != BOOK_MAGIC:
+            raise ValueError(f"{book_path}: not an opening book (bad magic {magic!r})")
+        if fingerprint != starting_state().hash_key():
+            raise ValueError(f"{book_path}: built with a different Zobrist table; rebuild it")
+        size = book_path.stat().st_size - _HEADER.size
+        if size % BOOK_RECORD.itemsize:
+            raise ValueError(f"{book_path}: truncated opening book records")
+        if size == 0:
+            return cls(np.zeros(0, dtype=BOOK_RECORD), rng)
+        records = np.memmap(book_path, dtype=BOOK_RECORD, mode="r", offset=_HEADER.size)
+        return cls(records, rng)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def entries(self, state: BoardState) -> list[tuple[StateMove, int]]:
+        """Legal book moves for ``state`` with their weights (hash collisions filtered out)."""
+        key = np.uint64(state.hash_key())
+        lo = int(np.searchsorted(self._keys, key, side="left"))
+        hi = int(np.searchsorted(self._keys, key, side="right"))
+        if lo == hi:
+            return []
+        legal = set(state.generate_legal_moves())
+        found: list[tuple[StateMove, int]] = []
+        for record in self._records[lo:hi]:
+            move = decode_move(int(record["move"]))
+            if move in legal:
+                found.append((move, int(record["weight"])))
+        return found
+
+    def pick(self, state: BoardState) -> StateMove | None:
+        """Weighted random legal book move for ``state``, or None when out of book."""
+        found = self.entries(state)
+        if not found:
+            return None
+        moves, weights = zip(*found, strict=True)
+        return self._rng.choices(moves, weights=weights)[0]
+
+
+def collect_book_moves(
+    lines: Iterable[Sequence[StateMove]], plies: int
+) -> dict[int, Counter[StateMove]]:
+    """Count the moves played from each position in the first ``plies`` of every line.
+
+    A line stops at its first illegal move, which is not counted.
+    """
+    counts: dict[int, Counter[StateMove]] = {}
+    for line in lines:
+        state = starting_state()
+        for move in line[:plies]:
+            if move not in state.generate_legal_moves():
+                break
+            counts.setdefault(state.hash_key(), Counter())[move] += 1
+            state.make_move(*move)
+    return counts
+
+
+def write_book(path: Path | str, counts: Mapping[int, Mapping[StateMove, int]]) -> int:
+    """Write ``counts`` as a sorted book file; returns the number of records."""
+    rows = sorted(
+        (key, encode_move(move), min(weight, _MAX_WEIGHT))
+        for key, moves in counts.items()
+        for move, weight in moves.items()
+        if weight > 0
+    )
+    records = np.array(rows, dtype=BOOK_RECORD) if rows else np.zeros(0, dtype=BOOK_RECORD)
+    book_path = Path(path)
+    book_path.parent.mkdir(parents=True, exist_ok=True)
+    with book_path.open("wb") as handle:
+        handle.write(_HEADER.pack(BOOK_MAGIC, starting_state().hash_key()))
+        handle.write(records.tobytes())
+    return len(records)
+
+
+def selfplay_lines(
+    games: int, plies: int, depth: int, max_n_samples: int | None
+) -> Iterator[list[StateMove]]:
+    """Opening lines from serial self-play; ``max_n_samples`` adds variety between games."""
+    for _ in range(games):
+        state = starting_state()
+        agents = {
+            0: MinMaxAgent(Color.WHITE, depth=depth, max_n_samples=max_n_samples, workers=1),
+            1: MinMaxAgent(Color.BLACK, depth=depth, max_n_samples=max_n_samples, workers=1),
+        }
+        line: list[StateMove] = []
+        for _ in range(plies):
+            move = agents[state.turn].search(state)
+            if move is None:
+                break
+            state.make_move(*move)
+            line.append(move)
+        yield line
+
+
+def pgn_lines(path: Path | str) -> Iterator[list[StateMove]]:
+    """Main lines of the games in a PGN file that start from the initial position.
+
+    Games that failed to replay are skipped rather than contributing a partial line.
+    """
+    skipped = 0
+    for game in iter_games(path):
+        if game.error is not None or game.start_fen != START_FEN:
+            skipped += 1
+            continue
+        yield game.moves
+    if skipped:
+        logger.warning("Skipped %d PGN games (replay errors or non-standard start)", skipped)
+
+
+def open_book(path: Path | None) -> OpeningBook | None:
+    """Open ``ai.book`` if configured; a missing or stale book only logs a warning."""
+    if path is None:
+        return None
+    if not path.exists():
+        logger.warning("Opening book %s not found; searching from move one", path)
+        return None
+    try:
+        book = OpeningBook.open(path)
+    except ValueError as exc:
+        logger.warning("Ignoring opening book: %s", exc)
+        return None
+    logger.info("Opening book %s (%d entries)", path, len(book))
+    return book
@@ -3,38 +3,169 @@
 from __future__ import annotations
 
 import dataclasses as dc
+import itertools
+import math
 import os
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from typing import Any
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from contextlib import AbstractContextManager, nullcontext
+from typing import TYPE_CHECKING, Any
 
 from chess.core.board import Board
-from chess.core.board_state import MATE_SCORE, PIECE_VALUES, BoardState, Move4
+from chess.core.board_state import MATE_SCORE, QUEEN, BoardState, StateMove
 from chess.core.piece import King, NullPiece, Position
 from chess.core.types import Color, Ending, PieceType
+from chess.log import get_logger
 
-Move = tuple[Position, Position]
+if TYPE_CHECKING:
+    from chess.ai.book import OpeningBook
+    from chess.ai.profiling import SearchProfiler
+    from chess.ai.tablebase import Tablebase
+
+# Board-level move; promotions add the piece type as a third element.
+Move = tuple[Position, Position] | tuple[Position, Position, PieceType]
+# ``(state, depth, color, max_n_samples, tablebase_dir, lineage)``; see ``_worker_agent``.
+SearchPayload = tuple[Any, int, int, int | None, str | None, int]
 
 TT_EXACT = 0
 TT_LOWER = 1
 TT_UPPER = 2
 
+TT_SIZE = 1 << 18
+# Oldest entries inspected for a shallow or stale victim before the oldest is dropped.
+TT_REPLACE_PROBES = 4
+# Nodes between ``should_stop`` polls while an interruptible search runs.
+ABORT_CHECK_INTERVAL = 1024
+# Worker-side agents (and their TTs) kept per pool process by default, most recently used
+# last; callers interleaving more games pass their own count (see ``SearchScheduler``).
+WORKER_LINEAGES = 2
+# Captures-only plies searched past the nominal depth.
+QUIESCENCE_MAX_PLY = 8
+
+
+logger = get_logger(__name__)
+
+
+_lineage_ids = itertools.count(1)
+
+
+def _new_lineage() -> int:
+    # Unique per agent across processes, so a worker never mistakes another agent's TT.
+    return os.getpid() << 32 | next(_lineage_ids)
+
+
+class SearchAborted(Exception):
+    """Raised inside ``_minimax`` when an iterative search's ``should_stop`` fires."""
+
+
+@dc.dataclass(slots=True)
+class SearchStats:
+    """Counters for one search; pool workers return theirs and the root merges them.
+
+    ``qnodes`` counts quiescence nodes past the horizon; ``max_ply`` includes them.
+    ``depth_nodes`` and ``depth_ms`` are cumulative per completed deepening iteration.
+    """
+
+    nodes: int = 0
+    qnodes: int = 0
+    tt_probes: int = 0
+    tt_hits: int = 0
+    cutoffs: int = 0
+    first_move_cutoffs: int = 0
+    max_ply: int = 0
+    elapsed: float = 0.0
+    depth_nodes: list[int] = dc.field(default_factory=list)
+    depth_ms: list[float] = dc.field(default_factory=list)
+
+    def merge(self, other: SearchStats) -> None:
+        """Add a worker's counters; wall time stays the caller's."""
+        self.nodes += other.nodes
+        self.qnodes += other.qnodes
+        self.tt_probes += other.tt_probes
+        self.tt_hits += other.tt_hits
+        self.cutoffs += other.cutoffs
+        self.first_move_cutoffs += other.first_move_cutoffs
+        self.max_ply = max(self.max_ply, other.max_ply)
+
+    @property
+    def nps(self) -> float:
+        return (self.nodes + self.qnodes) / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def tt_hit_rate(self) -> float:
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    @property
+    def first_move_cutoff_rate(self) -> float:
+        """Share of beta cutoffs produced by the first move tried (move-ordering quality)."""
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    @property
+    def branching_factor(self) -> float:
+        """Effective branching factor: node growth of the last deepening iteration."""
+        if len(self.depth_nodes) >= 2 and self.depth_nodes[-2]:
+            return self.depth_nodes[-1] / self.depth_nodes[-2]
+        if self.nodes > 1 and self.max_ply:
+            return math.pow(self.nodes, 1 / self.max_ply)
+        return 0.0
+
+    def summary(self) -> str:
+        return (
+            f"nodes={self.nodes} qnodes={self.qnodes} nps={self.nps:.0f} "
+            f"tt_hits={self.tt_hit_rate:.0%} cutoffs={self.cutoffs} "
+            f"first_move_cutoffs={self.first_move_cutoff_rate:.0%} max_ply={self.max_ply} "
+            f"ebf={self.branching_factor:.2f} time={self.elapsed * 1000:.0f}ms"
+        )
 
-@dc.dataclass
+
+@dc.dataclass(slots=True)
 class TTEntry:
     depth: int
     value: float
     flag: int
+    move: StateMove | None = None
+    generation: int = 0
+
+
+@dc.dataclass(slots=True)
+class AnalysisLine:
+    """One ranked root move: its value (from the agent's side) and principal variation."""
+
+    move: StateMove
+    value: float
+    pv: list[StateMove]
 
 
 @dc.dataclass
 class MinMaxAgent:
-    """Chess agent using minimax with alpha-beta pruning."""
+    """Chess agent using minimax with alpha-beta pruning.
+
+    The transposition table survives between searches. Every new root bumps a generation
+    counter; entries from older generations are the first to be replaced or evicted, and
+    their best moves still seed move ordering (the previous principal variation). A full
+    table replaces in O(1): the oldest stale entry, or one worth less than the incoming
+    entry (shallower, or a bound where the new one is exact), makes room; otherwise the
+    store is skipped, so deep root and PV entries are never pushed out by leaves.
+    """
 
     color: Color = Color.BLACK
     depth: int = 3
     max_n_samples: int | None = None
     workers: int = 0
-    _tt: dict[int, TTEntry] = dc.field(default_factory=dict, repr=False, compare=False)
+    tt_size: int = TT_SIZE
+    book: OpeningBook | None = dc.field(default=None, repr=False, compare=False)
+    tablebase: Tablebase | None = dc.field(default=None, repr=False, compare=False)
+    _tt: OrderedDict[int, TTEntry] = dc.field(
+        default_factory=OrderedDict, repr=False, compare=False
+    )
+    _generation: int = dc.field(default=0, repr=False, compare=False)
+    _root_hash: int | None = dc.field(default=None, repr=False, compare=False)
+    _lineage: int = dc.field(default_factory=_new_lineage, repr=False, compare=False)
+    stats: SearchStats = dc.field(default_factory=SearchStats, repr=False, compare=False)
+    profiler: SearchProfiler | None = dc.field(default=None, repr=False, compare=False)
+    _should_stop: Callable[[], bool] | None = dc.field(default=None, repr=False, compare=False)
 
     def _worker_count(self, move_count: int) -> int:
         if self.workers == 1 or move_count < 2:
@@ -52,19 +183,35 @@ class MinMaxAgent:
         return cpus if workers <= 0 else workers
 
     @staticmethod
-    def generate_possible_moves(board: Board, *, update: bool = True) -> list[Move]:
+    def generate_possible_moves(board: Board, *, update: bool = False) -> list[Move]:
         if update:
             board.update()
         return [MinMaxAgent._coords_to_move(m) for m in board.state.generate_legal_moves()]
 
-    def evaluate_state(self, state: BoardState) -> float:
+    def evaluate_state(self, state: BoardState, ply: int = 0) -> float:
+        """Static value from the agent's side; a mate ``ply`` plies from the root scores
+        ``MATE_SCORE - ply`` (tablebase wins add their distance to mate), so nearer mates
+        rank higher and the distance can be read back from the value.
+        """
         agent_color = 0 if self.color == Color.WHITE else 1
         if state.halfmove >= 80 or state.insufficient_material():
             return 0.0
 
+        tablebase = self.tablebase
+        # Counting pieces first keeps the probe (and its cost) to actual endgames.
+        if tablebase is not None and state.piece_count() <= tablebase.max_pieces:
+            probed = tablebase.probe(state)
+            if probed is not None:
+                wdl, dtm = probed
+                score = wdl * (MATE_SCORE - ply - dtm) if wdl else 0.0
+                if state.turn != agent_color:
+                    score = -score
+                return float(score)
+
         if not state.has_legal_move():
             side = state.turn
-            score = (MATE_SCORE if side == 1 else -MATE_SCORE) if state.in_check(side) else 0.0
+            mate = MATE_SCORE - ply
+            score = (mate if side == 1 else -mate) if state.in_check(side) else 0.0
             if agent_color == 1:
                 score = -score
             return float(score)
@@ -93,8 +240,8 @@ class MinMaxAgent:
 
     @staticmethod
     def apply_move(board: Board, move: Move, *, for_search: bool = False) -> bool:
-        from_pos, to_pos = move
-        board.promotion = PieceType.QUEEN
+        from_pos, to_pos = move[0], move[1]
+        promotion = move[2] if len(move) == 3 else PieceType.QUEEN
         piece = board.get(from_pos)
         if isinstance(piece, NullPiece) or piece.color != board.turn:
             return False
@@ -108,57 +255,374 @@ class MinMaxAgent:
             elif ok:
                 board.turn = Color.WHITE if piece.color == Color.BLACK else Color.BLACK
             return ok
-        ok, _ = board.move_piece(piece, to_pos, update_result=not for_search)
+        ok, _ = board.move_piece(piece, to_pos, update_result=not for_search, promotion=promotion)
         if ok and for_search:
             board.last_move = None
         return ok
 
     @staticmethod
-    def _move_coords(move: Move) -> tuple[int, int, int, int]:
-        return (move[0].x, move[0].y, move[1].x, move[1].y)
+    def _move_coords(move: Move) -> StateMove:
+        coords = (move[0].x, move[0].y, move[1].x, move[1].y)
+        return (*coords, move[2].value) if len(move) == 3 else coords
 
     @staticmethod
-    def _coords_to_move(coords: Move4) -> Move:
-        fx, fy, tx, ty = coords
-        return (Position(fx, fy), Position(tx, ty))
+    def _coords_to_move(coords: StateMove) -> Move:
+        origin, target = Position(coords[0], coords[1]), Position(coords[2], coords[3])
+        return (origin, target, PieceType(coords[4])) if len(coords) == 5 else (origin, target)
+
+    def new_search(self, state: BoardState) -> None:
+        """Start a new TT generation unless ``state`` is the root already being searched."""
+        if state.hash_key() != self._root_hash:
+            self._root_hash = state.hash_key()
+            self._generation += 1
+
+    def principal_variation(self, state: BoardState, limit: int | None = None) -> list[StateMove]:
+        """Best line from ``state`` following TT moves (stops on a miss, illegal move or cycle)."""
+        limit = self.depth if limit is None else limit
+        line: list[StateMove] = []
+        seen: set[int] = set()
+        while len(line) < limit:
+            entry = self._tt.get(state.hash_key())
+            if entry is None or entry.move is None or state.hash_key() in seen:
+                break
+            seen.add(state.hash_key())
+            if entry.move not in state.generate_legal_moves():
+                break
+            state.make_move(*entry.move)
+            line.append(entry.move)
+        for _ in line:
+            state.unmake_move()
+        return line
+
+    def _tt_store(
+        self, key: int, depth: int, value: float, flag: int, move: StateMove | None
+    ) -> None:
+        table = self._tt
+        existing = table.get(key)
+        if existing is not None:
+            table.move_to_end(key)
+            if existing.generation == self._generation and existing.depth > depth:
+                return
+        elif len(table) >= self.tt_size and not self._evict_one(_tt_priority(depth, flag)):
+            return
+        table[key] = TTEntry(
+            depth=depth, value=value, flag=flag, move=move, generation=self._generation
+        )
+
+    def _evict_one(self, priority: int) -> bool:
+        """Drop the oldest entry that is stale or worth less than ``priority``.
+
+        Current entries kept on the way are moved to the back. Returns ``False`` (skip
+        the store) when none of the ``TT_REPLACE_PROBES`` oldest entries can go.
+        """
+        table = self._tt
+        for _ in range(TT_REPLACE_PROBES):
+            key, entry = next(iter(table.items()))
+            stale = entry.generation != self._generation
+            if stale or _tt_priority(entry.depth, entry.flag) < priority:
+                del table[key]
+                return True
+            table.move_to_end(key)
+        return False
 
     def choose_move(self, board: Board) -> Move | None:
-        self._tt.clear()
-        state = board.state
+        move = self.search(board.state)
+        return self._coords_to_move(move) if move is not None else None
+
+    def search(self, state: BoardState) -> StateMove | None:
+        """Best move for the side to move in ``state``: book move first, then minimax."""
+        return self.search_with_stats(state)[0]
+
+    def search_with_stats(self, state: BoardState) -> tuple[StateMove | None, SearchStats]:
+        """``search`` plus the counters it produced (also left in ``self.stats``)."""
+        self.stats = SearchStats()
+        start = time.perf_counter()
+        with self._profile_session("search", state):
+            move = self._search(state)
+        self.stats.elapsed = time.perf_counter() - start
+        if self.stats.nodes:
+            logger.debug("search %s: %s", self.color.name.lower(), self.stats.summary())
+        return move, self.stats
+
+    def _profile_session(self, kind: str, state: BoardState) -> AbstractContextManager[None]:
+        if self.profiler is None:
+            return nullcontext()
+        # Fork the pool before the profiler patches methods and enables cProfile, so its
+        # workers never inherit either and later unprofiled searches run at full speed.
+        workers = self._worker_count(len(state.generate_legal_moves()))
+        if workers > 1:
+            warm_search_pool(workers)
+        side = self.color.name.lower()
+        return self.profiler.session(f"{kind} {side} move {state.fullmove}")
+
+    def _search(self, state: BoardState) -> StateMove | None:
+        self.new_search(state)
         moves = state.generate_legal_moves()
         if not moves:
             return None
+        known = self.lookup_move(state)
+        if known is not None:
+            return known
         if len(moves) == 1:
-            return self._coords_to_move(moves[0])
+            return moves[0]
 
         workers = self._worker_count(len(moves))
         if workers > 1:
-            move = self._choose_parallel_from_state(
-                board.to_search_state(), moves, workers, executor=_get_search_pool(workers)
+            return self._choose_parallel_from_state(
+                state.to_search_state(), moves, workers, executor=_get_search_pool(workers)
             )
-            return self._coords_to_move(move) if move is not None else None
         move, _ = self._minimax(state, self.depth, float("-inf"), float("inf"))
-        return self._coords_to_move(move) if move is not None else None
+        return move
+
+    def iterate(
+        self,
+        state: BoardState,
+        max_depth: int | None = None,
+        *,
+        should_stop: Callable[[], bool] | None = None,
+        on_iteration: Callable[[int, float, list[StateMove]], None] | None = None,
+    ) -> StateMove | None:
+        """Iterative deepening up to ``max_depth`` (default ``self.depth``).
+
+        ``should_stop`` is polled every ``ABORT_CHECK_INTERVAL`` nodes; when it fires the
+        unfinished iteration is dropped and the last completed one decides the move.
+        ``on_iteration(depth, value, pv)`` reports each completed depth; ``stats`` holds
+        the counters since the call started, pool workers included.
+        """
+        self.stats = SearchStats()
+        start = time.perf_counter()
+        try:
+            with self._profile_session("iterate", state):
+                return self._iterate(state, max_depth, should_stop, on_iteration, start)
+        finally:
+            self.stats.elapsed = time.perf_counter() - start
+            if self.stats.nodes:
+                logger.debug("iterate %s: %s", self.color.name.lower(), self.stats.summary())
+
+    def _iterate(
+        self,
+        state: BoardState,
+        max_depth: int | None,
+        should_stop: Callable[[], bool] | None,
+        on_iteration: Callable[[int, float, list[StateMove]], None] | None,
+        start: float,
+    ) -> StateMove | None:
+        self.new_search(state)
+        moves = state.generate_legal_moves()
+        if not moves:
+            return None
+        known = self.lookup_move(state)
+        if known is not None:
+            return known
+        best = _order_moves(state, moves)[0]
+        if len(moves) == 1:
+            return best
+
+        max_depth = self.depth if max_depth is None else max_depth
+        workers = self._worker_count(len(moves))
+        self._should_stop = should_stop
+        try:
+            for depth in range(1, max_depth + 1):
+                # Search a clone: an abort unwinds out of the recursion mid-line.
+                root = state.copy()
+                if workers > 1 and depth > 1:
+                    move, value = self._iterate_parallel(root, moves, depth, workers)
+                else:
+                    move, value = self._minimax(root, depth, float("-inf"), float("inf"))
+                if move is None:
+                    break
+                best = move
+                self.stats.elapsed = time.perf_counter() - start
+                self.stats.depth_nodes.append(self.stats.nodes)
+                self.stats.depth_ms.append(self.stats.elapsed * 1000)
+                if on_iteration is not None:
+                    pv = self.principal_variation(state.copy(), depth)
+                    on_iteration(depth, value, pv if pv and pv[0] == move else [move])
+                if should_stop is not None and should_stop():
+                    break
+        except SearchAborted:
+            pass
+        finally:
+            self._should_stop = None
+        return best
+
+    def _iterate_parallel(
+        self, state: BoardState, moves: list[StateMove], depth: int, workers: int
+    ) -> tuple[StateMove | None, float]:
+        """One deepening step split over the root moves; pending work is cancelled on stop."""
+        payload = self.search_payload(state.to_search_state(), depth)
+        pool = _get_search_pool(workers)
+        hash_entry = self._tt.get(state.hash_key())
+        ordered = _order_moves(state, moves, hash_entry.move if hash_entry else None)
+        submitted = time.perf_counter()
+        pending = {pool.submit(_score_root_move, payload, move) for move in ordered}
+        best_move: StateMove | None = None
+        best_value = float("-inf")
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=0.01, return_when=FIRST_COMPLETED)
+                for future in done:
+                    move_coords, value, stats = future.result()
+                    self.stats.merge(stats)
+                    if self.profiler is not None:
+                        self.profiler.record_unit(time.perf_counter() - submitted, stats.elapsed)
+                    if value > best_value or best_move is None:
+                        best_move, best_value = move_coords, value
+                if pending and self._should_stop is not None and self._should_stop():
+                    raise SearchAborted
+        finally:
+            for future in pending:
+                future.cancel()
+        self._tt_store(state.hash_key(), depth, best_value, TT_EXACT, best_move)
+        return best_move, best_value
+
+    def analyse(
+        self, board: Board, depth: int | None = None, multipv: int = 1
+    ) -> list[AnalysisLine]:
+        return self.analyse_state(board.state, depth, multipv)
+
+    def analyse_state(
+        self, state: BoardState, depth: int | None = None, multipv: int = 1
+    ) -> list[AnalysisLine]:
+        """The best ``multipv`` root moves at ``depth`` with exact values and PVs, best first.
+
+        One iterative-deepening pass shares the TT across all lines. Serially, each root
+        move is searched against the current ``multipv``-th best value, so moves outside
+        the top lines fail low cheaply. With a pool, every root move is scored exactly.
+        Book and tablebase moves are not consulted.
+        """
+        if multipv < 1:
+            raise ValueError(f"multipv must be >= 1, got {multipv}")
+        self.stats = SearchStats()
+        start = time.perf_counter()
+        with self._profile_session("analyse", state):
+            lines = self._analyse(state, self.depth if depth is None else depth, multipv, start)
+        self.stats.elapsed = time.perf_counter() - start
+        if self.stats.nodes:
+            logger.debug("analyse %s: %s", self.color.name.lower(), self.stats.summary())
+        return lines
+
+    def _analyse(
+        self, state: BoardState, depth: int, multipv: int, start: float
+    ) -> list[AnalysisLine]:
+        self.new_search(state)
+        moves = state.generate_legal_moves()
+        if not moves:
+            return []
+        maximizing = state.turn == (0 if self.color == Color.WHITE else 1)
+        count = min(multipv, len(moves))
+        workers = self._worker_count(len(moves))
+        ranked = _order_moves(state, moves)
+        top: list[tuple[StateMove, float, list[StateMove]]] = []
+        for iteration in range(1, depth + 1):
+            root = state.copy()
+            if workers > 1 and iteration > 1:
+                scored = self._analyse_parallel(root, ranked, iteration, workers)
+            else:
+                scored = self._analyse_serial(root, ranked, iteration, count, maximizing)
+            scored.sort(key=lambda line: line[1], reverse=maximizing)
+            top = scored[:count]
+            best_move, best_value, _ = top[0]
+            self._tt_store(state.hash_key(), iteration, best_value, TT_EXACT, best_move)
+            leading = [move for move, _, _ in top]
+            ranked = leading + [move for move in ranked if move not in leading]
+            self.stats.elapsed = time.perf_counter() - start
+            self.stats.depth_nodes.append(self.stats.nodes)
+            self.stats.depth_ms.append(self.stats.elapsed * 1000)
+        return [
+            AnalysisLine(move, value, pv or self._root_line(state, move, depth))
+            for move, value, pv in top
+        ]
+
+    def _analyse_serial(
+        self, state: BoardState, moves: list[StateMove], depth: int, count: int, maximizing: bool
+    ) -> list[tuple[StateMove, float, list[StateMove]]]:
+        """Exact values for the best ``count`` moves; the rest only prove they are worse."""
+        top: list[tuple[StateMove, float, list[StateMove]]] = []
+        for move in moves:
+            bound = top[-1][1] if len(top) == count else None
+            if maximizing:
+                alpha, beta = (float("-inf") if bound is None else bound), float("inf")
+            else:
+                alpha, beta = float("-inf"), (float("inf") if bound is None else bound)
+            state.make_move(*move)
+            _, value = self._minimax(state, depth - 1, alpha, beta, 1)
+            state.unmake_move()
+            if bound is None or (value > bound if maximizing else value < bound):
+                top.append((move, value, []))
+                top.sort(key=lambda line: line[1], reverse=maximizing)
+                del top[count:]
+        return top
+
+    def _analyse_parallel(
+        self, state: BoardState, moves: list[StateMove], depth: int, workers: int
+    ) -> list[tuple[StateMove, float, list[StateMove]]]:
+        payload = self.search_payload(state.to_search_state(), depth)
+        pool = _get_search_pool(workers)
+        submitted = time.perf_counter()
+        futures = [pool.submit(_analyse_root_move, payload, move) for move in moves]
+        scored = []
+        for future in as_completed(futures):
+            move, value, pv, stats = future.result()
+            self.stats.merge(stats)
+            if self.profiler is not None:
+                self.profiler.record_unit(time.perf_counter() - submitted, stats.elapsed)
+            scored.append((move, value, pv))
+        return scored
+
+    def _root_line(self, state: BoardState, move: StateMove, depth: int) -> list[StateMove]:
+        child = state.copy()
+        child.make_move(*move)
+        return [move, *self.principal_variation(child, depth - 1)]
+
+    def lookup_move(self, state: BoardState) -> StateMove | None:
+        """Opening-book or tablebase move for ``state``, when one applies (no search)."""
+        if self.book is not None:
+            move = self.book.pick(state)
+            if move is not None:
+                return move
+        if self.tablebase is not None:
+            return self.tablebase.best_move(state)
+        return None
+
+    def search_payload(
+        self, state_tuple: tuple[Any, ...], depth: int | None = None
+    ) -> SearchPayload:
+        """Picklable job description for pool workers (``_choose_move_serial`` and friends)."""
+        tablebase_dir = str(self.tablebase.directory) if self.tablebase is not None else None
+        depth = self.depth if depth is None else depth
+        return (
+            state_tuple,
+            depth,
+            self.color.value,
+            self.max_n_samples,
+            tablebase_dir,
+            self._lineage,
+        )
 
     def _choose_parallel_from_state(
         self,
         state_tuple: tuple[Any, ...],
-        moves: list[Move4],
+        moves: list[StateMove],
         workers: int,
         *,
         executor: ProcessPoolExecutor | None = None,
-    ) -> Move4 | None:
+    ) -> StateMove | None:
         state = BoardState.from_search_state(state_tuple)
         ordered = _order_moves(state, moves)
-        best_move: Move4 | None = None
+        best_move: StateMove | None = None
         best_value = float("-inf")
-        payload = (state_tuple, self.depth, self.color.value, self.max_n_samples)
+        payload = self.search_payload(state_tuple)
 
-        def collect(pool: ProcessPoolExecutor) -> Move4 | None:
+        def collect(pool: ProcessPoolExecutor) -> StateMove | None:
             nonlocal best_move, best_value
+            submitted = time.perf_counter()
             futures = {pool.submit(_score_root_move, payload, move): move for move in ordered}
             for future in as_completed(futures):
-                move_coords, value = future.result()
+                move_coords, value, stats = future.result()
+                self.stats.merge(stats)
+                if self.profiler is not None:
+                    self.profiler.record_unit(time.perf_counter() - submitted, stats.elapsed)
                 if value > best_value or best_move is None:
                     best_value = value
                     best_move = move_coords
@@ -170,24 +634,43 @@ class MinMaxAgent:
             return collect(pool)
 
     def _minimax(
-        self, state: BoardState, depth: int, alpha: float, beta: float
-    ) -> tuple[Move4 | None, float]:
+        self, state: BoardState, depth: int, alpha: float, beta: float, ply: int = 0
+    ) -> tuple[StateMove | None, float]:
+        stats = self.stats
+        stats.nodes += 1
+        if ply > stats.max_ply:
+            stats.max_ply = ply
+        if (
+            self._should_stop is not None
+            and not stats.nodes % ABORT_CHECK_INTERVAL
+            and self._should_stop()
+        ):
+            raise SearchAborted
+        if ply > 0 and (state.halfmove >= 80 or state.is_repetition()):
+            return None, 0.0
+
         board_hash = state.hash_key()
         cached = self._tt.get(board_hash)
-        if cached is not None and cached.depth >= depth:
+        stats.tt_probes += 1
+        hash_move = None
+        if cached is not None:
+            stats.tt_hits += 1
+            hash_move = cached.move
+        if cached is not None and cached.depth >= depth and ply > 0:
+            cached_value = _value_from_tt(cached.value, ply)
             if cached.flag == TT_EXACT:
-                return None, cached.value
+                return None, cached_value
             if cached.flag == TT_LOWER:
-                alpha = max(alpha, cached.value)
+                alpha = max(alpha, cached_value)
             elif cached.flag == TT_UPPER:
-                beta = min(beta, cached.value)
+                beta = min(beta, cached_value)
             if alpha >= beta:
-                return None, cached.value
+                return None, cached_value
 
         if depth == 0:
-            return None, self.evaluate_state(state)
+            return None, self._quiescence(state, alpha, beta, ply)
 
-        possible_moves = _order_moves(state, state.generate_legal_moves())
+        possible_moves = _order_moves(state, state.generate_legal_moves(), hash_move)
 
         if (
             self.max_n_samples
@@ -200,24 +683,26 @@ class MinMaxAgent:
             possible_moves = [possible_moves[i] for i in idx]
 
         if not possible_moves:
-            return None, self.evaluate_state(state)
+            return None, self.evaluate_state(state, ply)
 
         maximizing = state.turn == (0 if self.color == Color.WHITE else 1)
 
-        best_move: Move4 | None = None
+        best_move: StateMove | None = None
         orig_alpha = alpha
 
         if maximizing:
             value = float("-inf")
-            for move in possible_moves:
+            for index, move in enumerate(possible_moves):
                 state.make_move(*move)
-                _, child = self._minimax(state, depth - 1, alpha, beta)
+                _, child = self._minimax(state, depth - 1, alpha, beta, ply + 1)
                 state.unmake_move()
                 if child > value or best_move is None:
                     value = child
                     best_move = move
                 alpha = max(alpha, value)
                 if beta <= alpha:
+                    stats.cutoffs += 1
+                    stats.first_move_cutoffs += index == 0
                     break
             if value <= orig_alpha:
                 flag = TT_UPPER
@@ -225,19 +710,21 @@ class MinMaxAgent:
                 flag = TT_LOWER
             else:
                 flag = TT_EXACT
-            self._tt[board_hash] = TTEntry(depth=depth, value=value, flag=flag)
+            self._tt_store(board_hash, depth, _value_to_tt(value, ply), flag, best_move)
             return best_move, value
 
         value = float("inf")
-        for move in possible_moves:
+        for index, move in enumerate(possible_moves):
             state.make_move(*move)
-            _, child = self._minimax(state, depth - 1, alpha, beta)
+            _, child = self._minimax(state, depth - 1, alpha, beta, ply + 1)
             state.unmake_move()
             if child < value or best_move is None:
                 value = child
                 best_move = move
             beta = min(beta, value)
             if beta <= alpha:
+                stats.cutoffs += 1
+                stats.first_move_cutoffs += index == 0
                 break
         if value >= beta:
             flag = TT_UPPER
@@ -245,19 +732,110 @@ class MinMaxAgent:
             flag = TT_LOWER
         else:
             flag = TT_EXACT
-        self._tt[board_hash] = TTEntry(depth=depth, value=value, flag=flag)
+        self._tt_store(board_hash, depth, _value_to_tt(value, ply), flag, best_move)
         return best_move, value
 
+    def _quiescence(
+        self, state: BoardState, alpha: float, beta: float, ply: int, qply: int = 0
+    ) -> float:
+        """Captures-only search past the horizon; SEE-losing captures are pruned.
+
+        The static evaluation ("stand pat") is the value of declining every capture.
+        """
+        stats = self.stats
+        # The horizon node itself was already counted by ``_minimax``.
+        if qply:
+            stats.qnodes += 1
+            if ply > stats.max_ply:
+                stats.max_ply = ply
+            if (
+                self._should_stop is not None
+                and not stats.qnodes % ABORT_CHECK_INTERVAL
+                and self._should_stop()
+            ):
+                raise SearchAborted
+        value = self.evaluate_state(state, ply)
+        if qply >= QUIESCENCE_MAX_PLY or abs(value) >= MATE_SCORE / 2:
+            return value
+        maximizing = state.turn == (0 if self.color == Color.WHITE else 1)
+        if maximizing:
+            if value >= beta:
+                return value
+            alpha = max(alpha, value)
+        else:
+            if value <= alpha:
+                return value
+            beta = min(beta, value)
+
+        for move in _winning_captures(state):
+            state.make_move(*move)
+            child = self._quiescence(state, alpha, beta, ply + 1, qply + 1)
+            state.unmake_move()
+            if maximizing:
+                value = max(value, child)
+                alpha = max(alpha, value)
+            else:
+                value = min(value, child)
+                beta = min(beta, value)
+            if beta <= alpha:
+                break
+        return value
+
 
-def _order_moves(state: BoardState, moves: list[Move4]) -> list[Move4]:
-    def capture_value(move: Move4) -> int:
-        tx, ty = move[2], move[3]
-        captured = int(state.grid[ty, tx])
-        if captured == 0:
-            return 0
-        return PIECE_VALUES.get(abs(captured), 0)
+def _value_to_tt(value: float, ply: int) -> float:
+    """Mate scores are stored relative to the node, not the root, so transpositions reached
+    at another ply read back the right distance (``_value_from_tt`` undoes this)."""
+    if value >= MATE_SCORE / 2:
+        return value + ply
+    if value <= -MATE_SCORE / 2:
+        return value - ply
+    return value
 
-    return sorted(moves, key=capture_value, reverse=True)
+
+def _value_from_tt(value: float, ply: int) -> float:
+    if value >= MATE_SCORE / 2:
+        return value - ply
+    if value <= -MATE_SCORE / 2:
+        return value + ply
+    return value
+
+
+def _tt_priority(depth: int, flag: int) -> int:
+    """Replacement value of an entry: deeper first, exact (PV) before bounds at equal depth."""
+    return 2 * depth + (flag == TT_EXACT)
+
+
+def _order_moves(
+    state: BoardState, moves: list[StateMove], hash_move: StateMove | None = None
+) -> list[StateMove]:
+    """Hash move, then captures by SEE: even or winning ones, quiet moves, losing ones."""
+
+    def order_key(move: StateMove) -> int:
+        if move == hash_move:
+            return 1_000
+        if len(move) == 5 or state.is_capture(move):
+            see = state.see(move)
+            return 100 + see if see >= 0 else see
+        return 0
+
+    return sorted(moves, key=order_key, reverse=True)
+
+
+def _winning_captures(state: BoardState) -> list[StateMove]:
+    """Legal captures and queen promotions with a non-negative SEE, best first."""
+    side = state.turn
+    scored: list[tuple[int, StateMove]] = []
+    for move in state.generate_pseudo_legal_moves():
+        if len(move) == 5:
+            if move[4] != QUEEN:
+                continue
+        elif not state.is_capture(move):
+            continue
+        see = state.see(move)
+        if see >= 0 and state._leaves_king_safe(move[0], move[1], move[2], move[3], side):
+            scored.append((see, move))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [move for _, move in scored]
 
 
 _search_pool: ProcessPoolExecutor | None = None
@@ -274,45 +852,139 @@ def _get_search_pool(workers: int) -> ProcessPoolExecutor:
     return _search_pool
 
 
-def shutdown_search_pool() -> None:
+def warm_search_pool(workers: int) -> None:
+    """Start the shared pool's processes with no-op tasks (no search, so no worker TT)."""
+    pool = _get_search_pool(workers)
+    wait([pool.submit(os.getpid) for _ in range(workers)])
+
+
+def shutdown_search_pool(wait: bool = False) -> None:
     global _search_pool, _search_pool_workers
     if _search_pool is not None:
-        _search_pool.shutdown(wait=False, cancel_futures=True)
+        _search_pool.shutdown(wait=wait, cancel_futures=True)
         _search_pool = None
         _search_pool_workers = 0
 
 
+_worker_agents: dict[int, MinMaxAgent] = {}
+_worker_tablebases: dict[str, Tablebase] = {}
+
+
+def _worker_agent(payload: SearchPayload, lineages: int = WORKER_LINEAGES) -> MinMaxAgent:
+    """Per-process agent for the payload's lineage, so its TT carries across depths and turns.
+
+    A lineage is one ``MinMaxAgent`` in the parent: successive iterations and moves of
+    its game share the worker TT, while any other agent (a new game, ``ucinewgame``, a
+    fresh benchmark run) starts from an empty one. The ``lineages`` most recently used
+    agents are kept, each with its own TT.
+    """
+    _, depth, color_value, max_n_samples, tablebase_dir, lineage = payload
+    agent = _worker_agents.pop(lineage, None)
+    if agent is None:
+        tablebase = None
+        if tablebase_dir is not None:
+            tablebase = _worker_tablebases.get(tablebase_dir)
+            if tablebase is None:
+                from chess.ai.tablebase import Tablebase
+
+                tablebase = _worker_tablebases[tablebase_dir] = Tablebase(tablebase_dir)
+        agent = MinMaxAgent(
+            color=Color(color_value),
+            depth=depth,
+            max_n_samples=max_n_samples,
+            workers=1,
+            tablebase=tablebase,
+            _lineage=lineage,
+        )
+    while len(_worker_agents) >= max(lineages, 1):
+        del _worker_agents[next(iter(_worker_agents))]
+    agent.depth = depth
+    _worker_agents[lineage] = agent
+    return agent
+
+
 def _choose_move_serial(
-    payload: tuple[Any, int, int, int | None],
-) -> Move4 | None:
-    state_tuple, depth, color_value, max_n_samples = payload
-    agent = MinMaxAgent(
-        color=Color(color_value),
-        depth=depth,
-        max_n_samples=max_n_samples,
-        workers=1,
-    )
+    payload: SearchPayload,
+) -> tuple[StateMove | None, SearchStats]:
+    state_tuple, depth = payload[:2]
+    agent = _worker_agent(payload)
     state = BoardState.from_search_state(state_tuple)
+    agent.new_search(state)
+    agent.stats = SearchStats()
+    start = time.perf_counter()
     move, _ = agent._minimax(state, depth, float("-inf"), float("inf"))
-    return move
+    agent.stats.elapsed = time.perf_counter() - start
+    return move, agent.stats
+
+
+_ponder_live: Any = None
+
+
+def init_ponder_worker(live: Any) -> None:
+    """Pool initializer: share the ``multiprocessing.Value`` that keeps ponder searches alive.
+
+    A ponder job runs while ``live`` holds its batch id or the negated id of its own
+    ticket; anything else (``0`` after a miss, another batch) aborts it.
+    """
+    global _ponder_live
+    _ponder_live = live
+
+
+def _ponder_move(
+    payload: SearchPayload, batch: int, ticket: int
+) -> tuple[StateMove | None, SearchStats] | None:
+    """``_choose_move_serial`` that gives up (returning None) once its ponder is dropped.
+
+    It searches the worker agent of the payload's lineage, so whatever it stored, aborted
+    or not, stays in the TT the real search of that game uses next.
+    """
+
+    def dropped() -> bool:
+        live = _ponder_live.value if _ponder_live is not None else batch
+        return live not in (batch, -ticket)
+
+    if dropped():
+        return None
+    agent = _worker_agent(payload)
+    agent._should_stop = dropped
+    try:
+        return _choose_move_serial(payload)
+    except SearchAborted:
+        return None
+    finally:
+        agent._should_stop = None
 
 
 def _score_root_move(
-    payload: tuple[Any, int, int, int | None],
-    move_coords: Move4,
-) -> tuple[Move4, float]:
-    state_tuple, depth, color_value, max_n_samples = payload
+    payload: SearchPayload,
+    move_coords: StateMove,
+    lineages: int = WORKER_LINEAGES,
+) -> tuple[StateMove, float, SearchStats]:
+    state_tuple, depth = payload[:2]
     state = BoardState.from_search_state(state_tuple)
-    agent = MinMaxAgent(
-        color=Color(color_value),
-        depth=depth,
-        max_n_samples=max_n_samples,
-        workers=1,
-    )
+    agent = _worker_agent(payload, lineages)
+    agent.new_search(state)
+    agent.stats = SearchStats()
     if not state.make_move(*move_coords):
-        return move_coords, float("-inf")
-    _, value = agent._minimax(state, depth - 1, float("-inf"), float("inf"))
-    return move_coords, value
+        return move_coords, float("-inf"), agent.stats
+    start = time.perf_counter()
+    _, value = agent._minimax(state, depth - 1, float("-inf"), float("inf"), 1)
+    agent.stats.elapsed = time.perf_counter() - start
+    return move_coords, value, agent.stats
+
+
+def _analyse_root_move(
+    payload: SearchPayload,
+    move_coords: StateMove,
+) -> tuple[StateMove, float, list[StateMove], SearchStats]:
+    """``_score_root_move`` plus the line from the worker's TT (its TT stays in the worker)."""
+    move_coords, value, stats = _score_root_move(payload, move_coords)
+    state_tuple, depth = payload[:2]
+    agent = _worker_agent(payload)
+    child = BoardState.from_search_state(state_tuple)
+    if not child.make_move(*move_coords):
+        return move_coords, value, [move_coords], stats
+    return move_coords, value, [move_coords, *agent.principal_variation(child, depth - 1)], stats
 
 
 def choose_move_in_subprocess(
@@ -321,7 +993,7 @@ def choose_move_in_subprocess(
     color: Color,
     max_n_samples: int | None,
     workers: int,
-) -> tuple[int, int, int, int] | None:
+) -> StateMove | None:
     agent = MinMaxAgent(
         color=color,
         depth=depth,
@@ -334,14 +1006,14 @@ def choose_move_in_subprocess(
         return None
     if len(moves) == 1:
         return moves[0]
-    payload = (state, depth, color.value, max_n_samples)
+    payload = agent.search_payload(state)
     parallel_workers = agent._worker_count(len(moves))
     if parallel_workers > 1:
         move = agent._choose_parallel_from_state(
             state, moves, parallel_workers, executor=_get_search_pool(parallel_workers)
         )
     else:
-        move = _choose_move_serial(payload)
+        move, _ = _choose_move_serial(payload)
     if move is None:
         return None
     return move
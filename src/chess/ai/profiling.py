@@ -0,0 +1,141 @@
+"""Opt-in per-phase timers for the search hot path, plus optional cProfile dumps."""
+
+from __future__ import annotations
+
+import cProfile
+import dataclasses as dc
+import functools
+import itertools
+import os
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from chess.ai.minmax import MinMaxAgent
+from chess.core.board_state import BoardState
+from chess.log import get_logger
+
+logger = get_logger(__name__)
+
+# (phase, owner, method). Times are inclusive: legality also runs inside movegen/evaluate.
+PHASES: tuple[tuple[str, type, str], ...] = (
+    ("movegen", BoardState, "generate_legal_moves"),
+    ("legality", BoardState, "_leaves_king_safe"),
+    ("evaluate", MinMaxAgent, "evaluate_state"),
+    ("make_move", BoardState, "make_move"),
+    ("unmake_move", BoardState, "unmake_move"),
+)
+
+
+@dc.dataclass(slots=True)
+class PhaseTimer:
+    calls: int = 0
+    seconds: float = 0.0
+
+
+class SearchProfiler:
+    """Times the hot methods of one search at a time and logs a per-phase breakdown.
+
+    The methods are only wrapped while ``session`` is active, so an agent without a
+    profiler runs the unmodified code; the agent starts its search pool before a session
+    so forked workers never inherit the wrappers. Pool round trips are recorded by the
+    agent as ``latency`` (submit to result, seen by the root) against the worker's own
+    search time; the difference is queueing plus pickling. Phases inside pool workers are
+    not timed. With ``pstats_dir`` every session also writes a cProfile ``.pstats`` file.
+    """
+
+    def __init__(self, pstats_dir: Path | str | None = None) -> None:
+        self.pstats_dir = Path(pstats_dir) if pstats_dir is not None else None
+        self.phases: dict[str, PhaseTimer] = {}
+        self.units = 0
+        self.unit_latency = 0.0
+        self.unit_compute = 0.0
+        self.elapsed = 0.0
+        self._counter = itertools.count(1)
+
+    def reset(self) -> None:
+        self.phases = {phase: PhaseTimer() for phase, _, _ in PHASES}
+        self.units = 0
+        self.unit_latency = 0.0
+        self.unit_compute = 0.0
+        self.elapsed = 0.0
+
+    def record_unit(self, latency: float, compute: float) -> None:
+        """One pool work unit: root-side round trip and the worker's search time."""
+        self.units += 1
+        self.unit_latency += latency
+        self.unit_compute += compute
+
+    @contextmanager
+    def session(self, label: str) -> Iterator[None]:
+        """Profile the enclosed search, then log (and optionally dump) the breakdown."""
+        self.reset()
+        originals = [(owner, name, owner.__dict__[name]) for _, owner, name in PHASES]
+        for (phase, owner, name), (_, _, method) in zip(PHASES, originals, strict=True):
+            setattr(owner, name, self._timed(self.phases[phase], method))
+        profile = cProfile.Profile() if self.pstats_dir is not None else None
+        start = time.perf_counter()
+        try:
+            if profile is not None:
+                profile.enable()
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            self.elapsed = time.perf_counter() - start
+            for owner, name, method in originals:
+                setattr(owner, name, method)
+        self._dump(label, profile)
+
+    @staticmethod
+    def _timed(timer: PhaseTimer, method: Callable[..., Any]) -> Callable[..., Any]:
+        clock = time.perf_counter
+
+        @functools.wraps(method)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                timer.calls += 1
+                timer.seconds += clock() - start
+
+        return wrapper
+
+    def breakdown(self) -> list[tuple[str, int, float, float]]:
+        """``(phase, calls, milliseconds, share of the session)`` rows, pool last.
+
+        Pool units overlap, so their row is the mean overhead per unit and its share of
+        the mean round trip rather than a sum against wall time.
+        """
+        total = self.elapsed or 1.0
+        rows = [
+            (phase, timer.calls, timer.seconds * 1000, timer.seconds / total)
+            for phase, timer in self.phases.items()
+        ]
+        if self.units:
+            overhead = max(self.unit_latency - self.unit_compute, 0.0)
+            share = overhead / self.unit_latency if self.unit_latency else 0.0
+            rows.append(("pool_overhead", self.units, overhead / self.units * 1000, share))
+        return rows
+
+    def _dump(self, label: str, profile: cProfile.Profile | None) -> None:
+        parts = [
+            f"{phase} {calls}x {ms:.1f}ms{'/unit' if phase == 'pool_overhead' else ''} "
+            f"({share:.0%})"
+            for phase, calls, ms, share in self.breakdown()
+        ]
+        logger.info("profile %s %.1fms: %s", label, self.elapsed * 1000, ", ".join(parts))
+        if profile is None or self.pstats_dir is None:
+            return
+        self.pstats_dir.mkdir(parents=True, exist_ok=True)
+        path = self.pstats_dir / f"search-{os.getpid()}-{next(self._counter):05d}.pstats"
+        profile.dump_stats(path)
+        logger.info("profile %s: wrote %s", label, path)
+
+
+def make_profiler(enabled: bool, pstats_dir: Path | str | None = None) -> SearchProfiler | None:
+    """``SearchProfiler`` for ``ai.profile`` / ``ai.profile_dir``; ``None`` when disabled."""
+    return SearchProfiler(pstats_dir) if enabled else None
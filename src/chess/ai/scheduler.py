@@ -0,0 +1,307 @@
+"""Fair-share scheduling of root-move search jobs from many games over one bounded pool.
+
+Library-only: no CLI command uses it (``selfplay`` and ``arena`` run whole games per
+worker through ``stream_jobs``). It is meant for embedding the engine in a server that
+searches many concurrent games.
+"""
+
+from __future__ import annotations
+
+import dataclasses as dc
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any
+
+from chess.ai.minmax import (
+    WORKER_LINEAGES,
+    MinMaxAgent,
+    SearchPayload,
+    SearchStats,
+    _order_moves,
+    _score_root_move,
+)
+from chess.core.board_state import BoardState, StateMove
+from chess.log import get_logger
+
+_LATENCY_WINDOW = 2048
+
+logger = get_logger(__name__)
+
+
+@dc.dataclass
+class _Job:
+    game_id: str
+    seq: int
+    payload: SearchPayload
+    priority: int
+    deadline: float | None
+    submitted_at: float
+    pending: deque[StateMove]
+    future: Future
+    fallback: StateMove
+    inflight: int = 0
+    best_move: StateMove | None = None
+    best_value: float = float("-inf")
+    scored: int = 0
+    stats: SearchStats = dc.field(default_factory=SearchStats)
+
+
+@dc.dataclass
+class _GameShare:
+    inflight: int = 0
+    served: int = 0
+    jobs: deque[_Job] = dc.field(default_factory=deque)
+
+
+@dc.dataclass(frozen=True)
+class SchedulerMetrics:
+    """Point-in-time view of scheduler load and latency."""
+
+    queue_depth: int
+    queued_jobs: int
+    inflight: int
+    pool_size: int
+    games: int
+    completed_jobs: int
+    expired_jobs: int
+    wait_p50: float
+    wait_p99: float
+    latency_p50: float
+    latency_p99: float
+    nodes: int
+    nps: float
+
+
+def _percentile(samples: deque[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class SearchScheduler:
+    """Accepts search jobs from many games and splits their root moves across one pool.
+
+    Each job is broken into work units (one per root move). At most ``pool_size`` units
+    are in flight at once, so a single game can no longer flood the pool. When a slot
+    frees up the next unit comes from the highest-priority job; among equal priorities
+    the game with the fewest units in flight, then the fewest units served so far, wins,
+    and earlier deadlines break remaining ties. A job whose deadline has passed resolves
+    with the best root move scored so far (the first in move order if none was scored)
+    and drops its remaining units; a watcher thread wakes up at each deadline, so jobs
+    queued behind other games expire on time too.
+
+    Fair share interleaves games on every worker, so each unit tells its worker to keep
+    one agent (and TT) per game, up to the most games the scheduler has had in flight at
+    once; a game's TT then survives from move to move however many other games ran on
+    that worker in between.
+    """
+
+    def __init__(self, workers: int = 0, *, executor: Any | None = None) -> None:
+        self._pool_size = MinMaxAgent.resolve_pool_workers(workers)
+        self._owns_executor = executor is None
+        self._executor = executor or ProcessPoolExecutor(max_workers=self._pool_size)
+        self._lock = threading.RLock()
+        self._wakeup = threading.Condition(self._lock)
+        self._watcher: threading.Thread | None = None
+        self._games: dict[str, _GameShare] = {}
+        self._peak_games = WORKER_LINEAGES
+        self._seq = itertools.count()
+        self._inflight = 0
+        self._completed = 0
+        self._expired = 0
+        self._waits: deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        self._latencies: deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        self._closed = False
+        self._nodes = 0
+        self._started = time.monotonic()
+
+    @property
+    def pool_size(self) -> int:
+        return self._pool_size
+
+    def submit(
+        self,
+        game_id: str,
+        state: BoardState,
+        agent: MinMaxAgent,
+        *,
+        priority: int = 0,
+        deadline: float | None = None,
+    ) -> Future:
+        """Queue a search of ``state`` for ``game_id``; the future yields a ``StateMove`` or None.
+
+        ``deadline`` is an absolute ``time.monotonic()`` timestamp.
+        """
+        future: Future = Future()
+        moves = state.generate_legal_moves()
+        if not moves:
+            future.set_result(None)
+            return future
+        if len(moves) == 1:
+            future.set_result(moves[0])
+            return future
+
+        ordered = _order_moves(state, moves)
+        job = _Job(
+            game_id=game_id,
+            seq=next(self._seq),
+            payload=agent.search_payload(state.to_search_state()),
+            priority=priority,
+            deadline=deadline,
+            submitted_at=time.monotonic(),
+            pending=deque(ordered),
+            future=future,
+            fallback=ordered[0],
+        )
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("scheduler is shut down")
+            self._games.setdefault(game_id, _GameShare()).jobs.append(job)
+            self._peak_games = max(self._peak_games, len(self._games))
+            self._dispatch()
+            if deadline is not None and not job.future.done():
+                self._watch_deadlines()
+        return future
+
+    def metrics(self) -> SchedulerMetrics:
+        with self._lock:
+            queued = [job for share in self._games.values() for job in share.jobs]
+            return SchedulerMetrics(
+                queue_depth=sum(len(job.pending) for job in queued),
+                queued_jobs=len(queued),
+                inflight=self._inflight,
+                pool_size=self._pool_size,
+                games=sum(1 for share in self._games.values() if share.jobs),
+                completed_jobs=self._completed,
+                expired_jobs=self._expired,
+                wait_p50=_percentile(self._waits, 0.50),
+                wait_p99=_percentile(self._waits, 0.99),
+                latency_p50=_percentile(self._latencies, 0.50),
+                latency_p99=_percentile(self._latencies, 0.99),
+                nodes=self._nodes,
+                nps=self._nodes / max(time.monotonic() - self._started, 1e-9),
+            )
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify_all()
+            for share in self._games.values():
+                for job in share.jobs:
+                    job.pending.clear()
+                    if not job.future.done():
+                        job.future.cancel()
+                share.jobs.clear()
+        if self._owns_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _watch_deadlines(self) -> None:
+        if self._watcher is None:
+            self._watcher = threading.Thread(
+                target=self._expire_on_time, name="scheduler-deadlines", daemon=True
+            )
+            self._watcher.start()
+        self._wakeup.notify()
+
+    def _expire_on_time(self) -> None:
+        """Sleep until the earliest queued deadline, then expire and redispatch."""
+        with self._lock:
+            while not self._closed:
+                deadlines = [
+                    job.deadline
+                    for share in self._games.values()
+                    for job in share.jobs
+                    if job.deadline is not None
+                ]
+                timeout = min(deadlines) - time.monotonic() if deadlines else None
+                if timeout is None or timeout > 0:
+                    self._wakeup.wait(timeout)
+                else:
+                    self._dispatch()
+
+    def _next_job(self) -> _Job | None:
+        best: _Job | None = None
+        best_key: tuple[Any, ...] | None = None
+        for share in self._games.values():
+            for job in share.jobs:
+                if not job.pending:
+                    continue
+                key = (
+                    -job.priority,
+                    share.inflight,
+                    share.served,
+                    job.deadline if job.deadline is not None else float("inf"),
+                    job.seq,
+                )
+                if best_key is None or key < best_key:
+                    best, best_key = job, key
+        return best
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        self._expire(now)
+        while not self._closed and self._inflight < self._pool_size:
+            job = self._next_job()
+            if job is None:
+                return
+            move = job.pending.popleft()
+            share = self._games[job.game_id]
+            share.inflight += 1
+            share.served += 1
+            job.inflight += 1
+            self._inflight += 1
+            self._waits.append(now - job.submitted_at)
+            unit = self._executor.submit(_score_root_move, job.payload, move, self._peak_games)
+            unit.add_done_callback(lambda done, job=job: self._on_unit_done(job, done))
+
+    def _on_unit_done(self, job: _Job, unit: Future) -> None:
+        with self._lock:
+            share = self._games[job.game_id]
+            share.inflight -= 1
+            job.inflight -= 1
+            self._inflight -= 1
+            if unit.cancelled():
+                pass
+            elif unit.exception() is not None:
+                job.pending.clear()
+                if not job.future.done():
+                    job.future.set_exception(unit.exception())
+            else:
+                move_coords, value, stats = unit.result()
+                job.stats.merge(stats)
+                self._nodes += stats.nodes + stats.qnodes
+                job.scored += 1
+                if value > job.best_value or job.best_move is None:
+                    job.best_value = value
+                    job.best_move = move_coords
+            if not job.pending and job.inflight == 0:
+                self._finish(job)
+            self._dispatch()
+
+    def _expire(self, now: float) -> None:
+        # ``_finish`` may drop a game's share, so iterate over a snapshot.
+        for share in list(self._games.values()):
+            for job in list(share.jobs):
+                if job.deadline is None or now < job.deadline:
+                    continue
+                job.pending.clear()
+                self._expired += 1
+                self._finish(job)
+
+    def _finish(self, job: _Job) -> None:
+        share = self._games[job.game_id]
+        if job in share.jobs:
+            share.jobs.remove(job)
+        if not share.jobs and share.inflight == 0:
+            del self._games[job.game_id]
+        if not job.future.done():
+            self._completed += 1
+            self._latencies.append(time.monotonic() - job.submitted_at)
+            job.stats.elapsed = time.monotonic() - job.submitted_at
+            logger.debug("job %s/%d: %s", job.game_id, job.seq, job.stats.summary())
+            job.future.set_result(job.fallback if job.best_move is None else job.best_move)
@@ -0,0 +1,181 @@
+"""Headless MinMaxAgent self-play, one game per pool worker, streamed as JSONL records."""
+
+from __future__ import annotations
+
+import dataclasses as dc
+import json
+import random
+import time
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, TypeVar
+
+import numpy as np
+
+from chess.ai.minmax import MinMaxAgent
+from chess.ai.profiling import make_profiler
+from chess.core.board_state import START_FEN, BoardState, move_from_uci, move_to_uci
+from chess.core.pgn import PgnGame
+from chess.core.types import Color
+
+DEFAULT_MAX_PLIES = 300
+
+T = TypeVar("T")
+
+
+@dc.dataclass
+class SelfPlayGame:
+    """One finished game: moves in UCI notation with the time and nodes each search took."""
+
+    index: int
+    seed: int
+    result: str = "*"
+    termination: str = "max_plies"
+    start_fen: str = START_FEN
+    white: str = "minimax"
+    black: str = "minimax"
+    moves: list[str] = dc.field(default_factory=list)
+    move_ms: list[float] = dc.field(default_factory=list)
+    move_nodes: list[int] = dc.field(default_factory=list)
+
+    def to_json(self) -> str:
+        return json.dumps(dc.asdict(self), separators=(",", ":"))
+
+    def to_pgn(self, event: str = "chess selfplay") -> PgnGame:
+        """The game as a PGN record, replaying the UCI moves from ``start_fen``."""
+        state = BoardState.from_fen(self.start_fen)
+        moves = []
+        for text in self.moves:
+            move = move_from_uci(state, text)
+            state.make_move(*move)
+            moves.append(move)
+        headers = {
+            "Event": event,
+            "Round": str(self.index + 1),
+            "White": self.white,
+            "Black": self.black,
+            "Termination": self.termination,
+        }
+        if self.start_fen != START_FEN:
+            headers.update(SetUp="1", FEN=self.start_fen)
+        return PgnGame(headers=headers, moves=moves, result=self.result)
+
+
+def game_outcome(state: BoardState) -> tuple[str, str] | None:
+    """``(result, termination)`` once the game in ``state`` is over, else ``None``."""
+    if state.halfmove >= 80:
+        return "1/2-1/2", "move_limit"
+    if state.is_threefold_repetition():
+        return "1/2-1/2", "repetition"
+    if state.insufficient_material():
+        return "1/2-1/2", "insufficient_material"
+    if state.has_legal_move():
+        return None
+    if state.in_check(state.turn):
+        return ("0-1" if state.turn == 0 else "1-0"), "checkmate"
+    return "1/2-1/2", "stalemate"
+
+
+def play_game(
+    index: int,
+    seed: int,
+    depth: int,
+    max_n_samples: int | None = None,
+    max_plies: int = DEFAULT_MAX_PLIES,
+    profile: bool = False,
+    pstats_dir: Path | None = None,
+) -> SelfPlayGame:
+    """Play one game from the start position; both agents search serially."""
+    # ``max_n_samples`` draws from numpy's global RNG, which forked workers share.
+    np.random.seed(seed)
+    profiler = make_profiler(profile, pstats_dir)
+    agents = {
+        turn: MinMaxAgent(
+            color, depth=depth, max_n_samples=max_n_samples, workers=1, profiler=profiler
+        )
+        for turn, color in ((0, Color.WHITE), (1, Color.BLACK))
+    }
+    return play_out(SelfPlayGame(index=index, seed=seed), BoardState.initial(), agents, max_plies)
+
+
+def play_out(
+    game: SelfPlayGame,
+    state: BoardState,
+    agents: dict[int, MinMaxAgent],
+    max_plies: int = DEFAULT_MAX_PLIES,
+    movetime_ms: dict[int, int | None] | None = None,
+) -> SelfPlayGame:
+    """Play ``state`` to the end (or ``max_plies``), recording each move into ``game``.
+
+    ``agents`` and ``movetime_ms`` are keyed by side to move. A side with a move time
+    deepens iteratively (up to its ``depth``) until the time runs out; otherwise it
+    searches to its fixed depth.
+    """
+    while len(game.moves) < max_plies:
+        outcome = game_outcome(state)
+        if outcome is not None:
+            game.result, game.termination = outcome
+            break
+        agent = agents[state.turn]
+        movetime = (movetime_ms or {}).get(state.turn)
+        start = time.perf_counter()
+        if movetime is None:
+            move = agent.search(state)
+        else:
+            deadline = start + movetime / 1000
+            move = agent.iterate(state, should_stop=lambda d=deadline: time.perf_counter() >= d)
+        elapsed = time.perf_counter() - start
+        if move is None:
+            break
+        state.make_move(*move)
+        game.moves.append(move_to_uci(move))
+        game.move_ms.append(round(elapsed * 1000, 3))
+        game.move_nodes.append(agent.stats.nodes + agent.stats.qnodes)
+    return game
+
+
+def run_selfplay(
+    games: int,
+    depth: int,
+    *,
+    max_n_samples: int | None = None,
+    max_plies: int = DEFAULT_MAX_PLIES,
+    workers: int = 0,
+    seed: int | None = None,
+    profile: bool = False,
+    pstats_dir: Path | None = None,
+) -> Iterator[SelfPlayGame]:
+    """Yield games as they finish; ``workers`` follows ``ai.workers`` (``0`` = all cores).
+
+    Game ``i`` uses seed ``seed + i``, so a run is reproducible whatever the pool size.
+    """
+    if seed is None:
+        seed = random.randrange(1 << 31)
+    jobs = [
+        (index, seed + index, depth, max_n_samples, max_plies, profile, pstats_dir)
+        for index in range(games)
+    ]
+    yield from stream_jobs(play_game, jobs, workers)
+
+
+def stream_jobs(
+    fn: Callable[..., T], jobs: Sequence[tuple[Any, ...]], workers: int = 0
+) -> Iterator[T]:
+    """``fn(*job)`` for every job, yielded in completion order from a process pool.
+
+    ``workers`` follows ``ai.workers`` (``0`` = all cores); one worker runs in-process.
+    Closing the iterator early cancels the jobs that have not started.
+    """
+    workers = min(MinMaxAgent.resolve_pool_workers(workers), max(len(jobs), 1))
+    if workers == 1:
+        for job in jobs:
+            yield fn(*job)
+        return
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [pool.submit(fn, *job) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        pool.shutdown(cancel_futures=True)
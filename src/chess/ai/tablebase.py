@@ -0,0 +1,377 @@
+"""Endgame tablebases for small material: retrograde generation and memory-mapped probing.
+
+A table covers one material signature such as ``KQvK`` (White's pieces, ``v``, Black's).
+Each position maps to one slot:
+
+    index = ((king_slot * 64 + sq_1) * 64 + ... + sq_n) * 2 + side_to_move
+
+where ``king_slot`` is the White king square folded by board symmetry (8-fold for
+pawnless material, left/right only with pawns) and ``sq_i = y * 8 + x``. Two arrays are
+stored per signature as ``<sig>.wdl.npy`` (int8: 1 win, 0 draw, -1 loss for the side to
+move) and ``<sig>.dtm.npy`` (int16: plies to mate, 0 for draws) and opened with
+``np.load(..., mmap_mode="r")``.
+
+Generation walks every slot once with :class:`BoardState` to collect successors, then
+solves the whole table with vectorised negamax value iteration. Captures and promotions
+leave the table and are resolved by probing smaller tables, which are built first.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Callable
+from functools import cache
+from pathlib import Path
+
+import numpy as np
+
+from chess.core.board_state import (
+    BISHOP,
+    KING,
+    KNIGHT,
+    PAWN,
+    PIECE_VALUES,
+    QUEEN,
+    ROOK,
+    BoardState,
+    StateMove,
+)
+
+MAX_PIECES = 4
+_BASE = 16_000
+_LETTERS = {KING: "K", QUEEN: "Q", ROOK: "R", BISHOP: "B", KNIGHT: "N", PAWN: "P"}
+_KINDS = {letter: kind for kind, letter in _LETTERS.items()}
+_ORDER = (KING, QUEEN, ROOK, BISHOP, KNIGHT, PAWN)
+
+_TRANSFORMS: tuple[Callable[[int, int], tuple[int, int]], ...] = (
+    lambda x, y: (x, y),
+    lambda x, y: (7 - x, y),
+    lambda x, y: (x, 7 - y),
+    lambda x, y: (7 - x, 7 - y),
+    lambda x, y: (y, x),
+    lambda x, y: (7 - y, x),
+    lambda x, y: (y, 7 - x),
+    lambda x, y: (7 - y, 7 - x),
+)
+_PAWNLESS_SLOTS = {
+    (x, y): slot for slot, (x, y) in enumerate((x, y) for y in range(4) for x in range(4) if x <= y)
+}
+_PAWN_SLOTS = {(x, y): y * 4 + x for y in range(8) for x in range(4)}
+
+
+def _sorted_kinds(kinds: list[int]) -> list[int]:
+    return sorted(kinds, key=_ORDER.index)
+
+
+def _strength(kinds: list[int]) -> tuple[int, list[int]]:
+    return len(kinds), sorted((PIECE_VALUES[k] for k in kinds), reverse=True)
+
+
+def signature_of(white: list[int], black: list[int]) -> str:
+    white_part = "".join(_LETTERS[k] for k in _sorted_kinds(white))
+    black_part = "".join(_LETTERS[k] for k in _sorted_kinds(black))
+    return f"{white_part}v{black_part}"
+
+
+def parse_signature(signature: str) -> tuple[list[int], list[int]]:
+    try:
+        white_part, black_part = signature.upper().split("V")
+        white = _sorted_kinds([_KINDS[c] for c in white_part])
+        black = _sorted_kinds([_KINDS[c] for c in black_part])
+    except (KeyError, ValueError):
+        raise ValueError(f"invalid material signature {signature!r}") from None
+    if white.count(KING) != 1 or black.count(KING) != 1:
+        raise ValueError(f"{signature!r} needs exactly one king per side")
+    if len(white) + len(black) > MAX_PIECES:
+        raise ValueError(f"{signature!r} has more than {MAX_PIECES} pieces")
+    if _strength(white) < _strength(black):
+        raise ValueError(f"{signature!r} must list the stronger side first")
+    return white, black
+
+
+def _is_draw_material(white: list[int], black: list[int]) -> bool:
+    extra = [k for k in white + black if k != KING]
+    return not extra or (len(extra) == 1 and extra[0] in (BISHOP, KNIGHT))
+
+
+@cache
+def _layout(signature: str) -> _Layout:
+    return _Layout(signature)
+
+
+class _Layout:
+    """Index arithmetic for one signature."""
+
+    def __init__(self, signature: str) -> None:
+        white, black = parse_signature(signature)
+        self.signature = signature_of(white, black)
+        self.pieces = [k for k in white] + [-k for k in black]
+        self.has_pawns = PAWN in white or PAWN in black
+        self.slots = _PAWN_SLOTS if self.has_pawns else _PAWNLESS_SLOTS
+        self.slot_squares = {slot: xy for xy, slot in self.slots.items()}
+        self.transforms = _TRANSFORMS[:2] if self.has_pawns else _TRANSFORMS
+        self.size = len(self.slots) * 64 ** (len(self.pieces) - 1) * 2
+
+    def index(self, squares: list[tuple[int, int]], turn: int) -> int:
+        king = squares[0]
+        for transform in self.transforms:
+            slot = self.slots.get(transform(*king))
+            if slot is not None:
+                break
+        index = slot
+        for x, y in squares[1:]:
+            tx, ty = transform(x, y)
+            index = index * 64 + ty * 8 + tx
+        return index * 2 + turn
+
+    def decode(self, index: int) -> tuple[list[tuple[int, int]], int]:
+        turn = index & 1
+        rest = index >> 1
+        squares: list[tuple[int, int]] = []
+        for _ in range(len(self.pieces) - 1):
+            sq = rest % 64
+            squares.append((sq % 8, sq // 8))
+            rest //= 64
+        squares.append(self.slot_squares[rest])
+        squares.reverse()
+        return squares, turn
+
+
+def _place(state: BoardState, pieces: list[int], squares: list[tuple[int, int]], turn: int) -> None:
+    state.grid[:] = 0
+    for value, (x, y) in zip(pieces, squares, strict=True):
+        state.grid[y, x] = value
+        if value == KING:
+            state.wkx, state.wky = x, y
+        elif value == -KING:
+            state.bkx, state.bky = x, y
+    state.turn = turn
+    state.castling = 0
+    state.halfmove = 0
+    state.ep_file = -1
+    state._undo_stack.clear()
+    state._history.clear()
+
+
+def _valid_squares(pieces: list[int], squares: list[tuple[int, int]]) -> bool:
+    if len(set(squares)) != len(squares):
+        return False
+    pairs = zip(pieces, squares, strict=True)
+    return all(not (abs(v) == PAWN and y in (0, 7)) for v, (_, y) in pairs)
+
+
+def solve(
+    offsets: np.ndarray, children: np.ndarray, fixed: np.ndarray, mated: np.ndarray
+) -> np.ndarray:
+    """Negamax value iteration over a successor graph.
+
+    Node ``i`` has successors ``children[offsets[i]:offsets[i + 1]]``; indices ``>= n`` refer
+    to ``fixed`` (already known values, e.g. from smaller tables). ``mated`` flags nodes with
+    no moves whose side to move is checkmated; other move-less nodes are draws. Values are
+    ``_BASE - plies`` for wins, ``-(_BASE - plies)`` for losses and 0 for draws.
+    """
+    n = len(offsets) - 1
+    values = np.zeros(n, dtype=np.int32)
+    values[mated] = -_BASE
+    fixed = fixed.astype(np.int32)
+    counts = np.diff(offsets)
+    moving = np.flatnonzero(counts)
+    starts = offsets[:-1][moving]
+    if len(moving) == 0:
+        return values
+    while True:
+        flipped = -np.concatenate((values, fixed))[children]
+        stepped = flipped - np.sign(flipped)
+        best = np.maximum.reduceat(stepped, starts)
+        if np.array_equal(best, values[moving]):
+            return values
+        values[moving] = best
+
+
+class Tablebase:
+    """Directory of generated tables; probes are memory-mapped and cached per signature."""
+
+    def __init__(self, directory: Path | str) -> None:
+        self.directory = Path(directory)
+        self._tables: dict[str, tuple[np.ndarray, np.ndarray] | None] = {}
+        # Largest generated table, so callers can skip probing busier positions cheaply.
+        self.max_pieces = max(
+            (len(path.name.split(".")[0]) - 1 for path in self.directory.glob("*v*.wdl.npy")),
+            default=0,
+        )
+
+    def _paths(self, signature: str) -> tuple[Path, Path]:
+        return (
+            self.directory / f"{signature}.wdl.npy",
+            self.directory / f"{signature}.dtm.npy",
+        )
+
+    def available(self, signature: str) -> bool:
+        return all(path.exists() for path in self._paths(signature))
+
+    def _table(self, signature: str) -> tuple[np.ndarray, np.ndarray] | None:
+        if signature not in self._tables:
+            if self.available(signature):
+                wdl_path, dtm_path = self._paths(signature)
+                self._tables[signature] = (
+                    np.load(wdl_path, mmap_mode="r"),
+                    np.load(dtm_path, mmap_mode="r"),
+                )
+            else:
+                self._tables[signature] = None
+        return self._tables[signature]
+
+    def probe(self, state: BoardState) -> tuple[int, int] | None:
+        """``(wdl, dtm)`` for the side to move, or None when no table covers ``state``."""
+        if state.piece_count() > MAX_PIECES:
+            return None
+        ys, xs = np.nonzero(state.grid)
+        pieces = [(int(state.grid[y, x]), int(x), int(y)) for y, x in zip(ys, xs, strict=True)]
+        white = [v for v, _, _ in pieces if v > 0]
+        black = [-v for v, _, _ in pieces if v < 0]
+        if _is_draw_material(white, black):
+            return 0, 0
+        turn = state.turn
+        if _strength(white) < _strength(black):
+            pieces = [(-v, x, 7 - y) for v, x, y in pieces]
+            white, black = black, white
+            turn ^= 1
+        signature = signature_of(white, black)
+        table = self._table(signature)
+        if table is None:
+            return None
+        layout = _layout(signature)
+        remaining = list(pieces)
+        squares: list[tuple[int, int]] = []
+        for value in layout.pieces:
+            for entry in remaining:
+                if entry[0] == value:
+                    squares.append((entry[1], entry[2]))
+                    remaining.remove(entry)
+                    break
+        index = layout.index(squares, turn)
+        wdl, dtm = table
+        return int(wdl[index]), int(dtm[index])
+
+    def best_move(self, state: BoardState) -> StateMove | None:
+        """Tablebase-optimal move: fastest win, else a draw, else the longest defence."""
+        if self.probe(state) is None:
+            return None
+        best: StateMove | None = None
+        best_key: tuple[int, int] | None = None
+        for move in state.generate_legal_moves():
+            state.make_move(*move)
+            result = self.probe(state)
+            state.unmake_move()
+            if result is None:
+                return None
+            wdl, dtm = -result[0], result[1]
+            key = (wdl, -dtm if wdl > 0 else dtm)
+            if best_key is None or key > best_key:
+                best, best_key = move, key
+        return best
+
+    def build(
+        self,
+        signature: str,
+        *,
+        on_progress: Callable[[int, int], None] | None = None,
+    ) -> Path:
+        """Generate ``signature`` (and any smaller tables it reaches) into the directory."""
+        layout = _layout(signature)
+        for dependency in _dependencies(layout):
+            if not self.available(dependency):
+                self.build(dependency, on_progress=on_progress)
+
+        offsets = array("q", [0])
+        children = array("q")
+        fixed = array("l")
+        mated = np.zeros(layout.size, dtype=bool)
+        state = BoardState()
+        for index in range(layout.size):
+            if on_progress is not None and index % 4096 == 0:
+                on_progress(index, layout.size)
+            squares, turn = layout.decode(index)
+            if _valid_squares(layout.pieces, squares):
+                _place(state, layout.pieces, squares, turn)
+                if not state.in_check(turn ^ 1):
+                    moves = state.generate_legal_moves()
+                    if not moves:
+                        mated[index] = state.in_check(turn)
+                    for move in moves:
+                        child = self._child(state, layout, squares, move)
+                        if isinstance(child, int):
+                            children.append(child)
+                        else:
+                            children.append(layout.size + len(fixed))
+                            fixed.append(child[0])
+            offsets.append(len(children))
+        if on_progress is not None:
+            on_progress(layout.size, layout.size)
+
+        values = solve(
+            np.frombuffer(offsets, dtype=np.int64),
+            np.frombuffer(children, dtype=np.int64),
+            np.array(fixed, dtype=np.int32),
+            mated,
+        )
+        self.directory.mkdir(parents=True, exist_ok=True)
+        wdl_path, dtm_path = self._paths(layout.signature)
+        np.save(wdl_path, np.sign(values).astype(np.int8))
+        np.save(dtm_path, np.where(values == 0, 0, _BASE - np.abs(values)).astype(np.int16))
+        self._tables.pop(layout.signature, None)
+        self.max_pieces = max(self.max_pieces, len(layout.pieces))
+        return wdl_path
+
+    def _child(
+        self,
+        state: BoardState,
+        layout: _Layout,
+        squares: list[tuple[int, int]],
+        move: StateMove,
+    ) -> int | tuple[int]:
+        fx, fy, tx, ty = move[:4]
+        moved = int(state.grid[fy, fx])
+        leaves_table = int(state.grid[ty, tx]) != 0 or (abs(moved) == PAWN and ty in (0, 7))
+        if not leaves_table:
+            child = [(tx, ty) if sq == (fx, fy) else sq for sq in squares]
+            return layout.index(child, state.turn ^ 1)
+        state.make_move(*move)
+        result = self.probe(state)
+        state.unmake_move()
+        if result is None:
+            raise RuntimeError(f"missing sub-table while building {layout.signature}")
+        wdl, dtm = result
+        return (wdl * (_BASE - dtm) if wdl else 0,)
+
+
+def _dependencies(layout: _Layout) -> list[str]:
+    white = [v for v in layout.pieces if v > 0]
+    black = [-v for v in layout.pieces if v < 0]
+    found: set[str] = set()
+
+    def add(w: list[int], b: list[int]) -> None:
+        if _is_draw_material(w, b):
+            return
+        if _strength(w) < _strength(b):
+            w, b = b, w
+        found.add(signature_of(w, b))
+
+    for side, other, flip in ((white, black, False), (black, white, True)):
+        for i, kind in enumerate(side):
+            if kind == KING:
+                continue
+            reduced = side[:i] + side[i + 1 :]
+            add(*((other, reduced) if flip else (reduced, other)))
+            if kind != PAWN:
+                continue
+            for promoted in (QUEEN, ROOK, BISHOP, KNIGHT):
+                upgraded = reduced + [promoted]
+                add(*((other, upgraded) if flip else (upgraded, other)))
+                for j, captured in enumerate(other):
+                    if captured == KING:
+                        continue
+                    rest = other[:j] + other[j + 1 :]
+                    add(*((rest, upgraded) if flip else (upgraded, rest)))
+    found.discard(layout.signature)
+    return sorted(found)
@@ -3,11 +3,15 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
+import os
+import time
 from pathlib import Path
+from typing import TextIO
 
 from chess.config import AppSettings
 from chess.log import get_logger, setup_logging
-from chess.paths import DEFAULT_CONFIG
+from chess.paths import BENCHMARKS_DIR, DEFAULT_BOOK, DEFAULT_CONFIG, RUNS_DIR, TABLEBASE_DIR
 
 GUI_COMMANDS = frozenset({"play", "play-ai"})
 
@@ -26,12 +30,149 @@ def _build_parser() -> argparse.ArgumentParser:
     parser.add_argument("-v", "--verbose", action="store_true", help="Debug logging")
     parser.add_argument("-q", "--quiet", action="store_true", help="Warnings only")
     parser.add_argument("--log-level", default=None, help="Override log level")
+    parser.add_argument(
+        "--profile", action="store_true", help="Per-phase search timings (ai.profile)"
+    )
+    parser.add_argument(
+        "--profile-dir",
+        type=Path,
+        default=None,
+        help="Also write a cProfile .pstats file per search here (ai.profile_dir)",
+    )
 
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     subparsers.add_parser("play", help="Free-play sandbox (drag pieces, add from panel)")
     play_ai = subparsers.add_parser("play-ai", help="Play vs minimax AI as White")
     play_ai.add_argument("--depth", type=int, default=None, help="Override ai.depth")
+
+    book = subparsers.add_parser("book", help="Opening book tools")
+    book_commands = book.add_subparsers(dest="book_command", required=True)
+    book_build = book_commands.add_parser(
+        "build", help="Build an opening book from self-play or a PGN archive"
+    )
+    book_build.add_argument(
+        "--out", type=Path, default=DEFAULT_BOOK, help=f"Book path (default: {DEFAULT_BOOK})"
+    )
+    book_build.add_argument("--games", type=int, default=32, help="Self-play games")
+    book_build.add_argument("--plies", type=int, default=12, help="Book depth in plies")
+    book_build.add_argument("--depth", type=int, default=3, help="Self-play search depth")
+    book_build.add_argument(
+        "--samples", type=int, default=8, help="Move subsample cap for varied lines"
+    )
+    book_build.add_argument(
+        "--pgn", type=Path, default=None, help="Take lines from these PGN games, not self-play"
+    )
+
+    selfplay = subparsers.add_parser("selfplay", help="Headless AI vs AI games over a process pool")
+    selfplay.add_argument("--games", type=int, default=16, help="Number of games")
+    selfplay.add_argument("--depth", type=int, default=None, help="Override ai.depth")
+    selfplay.add_argument(
+        "--workers", type=int, default=None, help="Parallel games (0 = all cores; ai.workers)"
+    )
+    selfplay.add_argument(
+        "--samples", type=int, default=None, help="Move subsample cap (ai.max_n_samples)"
+    )
+    selfplay.add_argument("--max-plies", type=int, default=300, help="Adjudicate after N plies")
+    selfplay.add_argument("--seed", type=int, default=None, help="Base seed; game i uses seed+i")
+    selfplay.add_argument(
+        "--out",
+        type=Path,
+        default=RUNS_DIR / "selfplay.jsonl",
+        help=f"JSONL output, one game per line (default: {RUNS_DIR / 'selfplay.jsonl'})",
+    )
+    selfplay.add_argument("--pgn", type=Path, default=None, help="Also write the games as PGN")
+
+    arena = subparsers.add_parser("arena", help="Match two agent configs; report Elo and SPRT")
+    arena.add_argument(
+        "--a", dest="agent_a", default="depth=3", help="Engine A, e.g. depth=3,samples=8"
+    )
+    arena.add_argument(
+        "--b", dest="agent_b", default="depth=2", help="Engine B, e.g. depth=3,movetime=200"
+    )
+    arena.add_argument("--games", type=int, default=100, help="Maximum number of games")
+    arena.add_argument(
+        "--openings", type=Path, default=None, help="FEN/EPD file; each line played twice"
+    )
+    arena.add_argument(
+        "--workers", type=int, default=None, help="Concurrent games (0 = all cores; ai.workers)"
+    )
+    arena.add_argument("--max-plies", type=int, default=300, help="Adjudicate a draw after N plies")
+    arena.add_argument("--seed", type=int, default=None, help="Base seed; game i uses seed+i")
+    arena.add_argument("--sprt", action="store_true", help="Stop early on an SPRT decision")
+    arena.add_argument("--elo0", type=float, default=0.0, help="SPRT H0 Elo")
+    arena.add_argument("--elo1", type=float, default=10.0, help="SPRT H1 Elo")
+    arena.add_argument("--alpha", type=float, default=0.05, help="SPRT false-positive rate")
+    arena.add_argument("--beta", type=float, default=0.05, help="SPRT false-negative rate")
+    arena.add_argument(
+        "--out",
+        type=Path,
+        default=RUNS_DIR / "arena.jsonl",
+        help=f"JSONL game records (default: {RUNS_DIR / 'arena.jsonl'})",
+    )
+    arena.add_argument("--pgn", type=Path, default=None, help="Also write the games as PGN")
+
+    analyse = subparsers.add_parser(
+        "analyse", help="Score a FEN/EPD or packed position file on a process pool"
+    )
+    analyse.add_argument("input", type=Path, help="FEN/EPD text or packed position file")
+    analyse.add_argument("--depth", type=int, default=None, help="Override ai.depth")
+    analyse.add_argument("--multipv", type=int, default=1, help="Ranked lines per position")
+    analyse.add_argument(
+        "--workers", type=int, default=None, help="Pool processes (0 = all cores; ai.workers)"
+    )
+    analyse.add_argument("--chunk-size", type=int, default=16, help="Positions per pool task")
+    analyse.add_argument(
+        "--out",
+        type=Path,
+        default=RUNS_DIR / "analysis.jsonl",
+        help=f"JSONL output, one position per line (default: {RUNS_DIR / 'analysis.jsonl'})",
+    )
+    analyse.add_argument(
+        "--pack", type=Path, default=None, help="Convert the FEN input to a packed file instead"
+    )
+
+    bench = subparsers.add_parser("bench", help="Fixed-depth search benchmark, serial vs pool")
+    bench.add_argument("--depth", type=int, default=3, help="Search depth per position")
+    bench.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Pool size for the parallel run (0 = all cores); workers=1 always runs",
+    )
+    bench.add_argument(
+        "--positions",
+        type=Path,
+        default=BENCHMARKS_DIR / "positions.epd",
+        help="EPD suite with id operations (default: benchmarks/positions.epd)",
+    )
+    bench.add_argument(
+        "--baseline",
+        type=Path,
+        default=BENCHMARKS_DIR / "baseline.json",
+        help="Report to compare against, if present (default: benchmarks/baseline.json)",
+    )
+    bench.add_argument(
+        "--out",
+        type=Path,
+        default=RUNS_DIR / "bench.json",
+        help=f"JSON report (default: {RUNS_DIR / 'bench.json'})",
+    )
+
+    subparsers.add_parser("uci", help="Serve the engine over the UCI protocol on stdin/stdout")
+
+    tablebase = subparsers.add_parser("tablebase", help="Endgame tablebase tools")
+    tablebase_commands = tablebase.add_subparsers(dest="tablebase_command", required=True)
+    tablebase_build = tablebase_commands.add_parser(
+        "build", help="Generate tables for 3- and 4-piece material (e.g. KQvK KRvK)"
+    )
+    tablebase_build.add_argument("signatures", nargs="+", help="Material signatures")
+    tablebase_build.add_argument(
+        "--dir",
+        type=Path,
+        default=TABLEBASE_DIR,
+        help=f"Output directory (default: {TABLEBASE_DIR})",
+    )
     return parser
 
 
@@ -46,20 +187,280 @@ def _resolve_log_level(args: argparse.Namespace) -> str:
 
 
 def _load_settings(args: argparse.Namespace) -> AppSettings:
-    overrides: dict = {}
-    if args.command == "play-ai" and args.depth is not None:
-        overrides = {"ai": {"depth": args.depth}}
-    return AppSettings.from_yaml(args.config, overrides=overrides or None)
+    ai: dict = {}
+    if args.command in ("play-ai", "selfplay", "analyse") and args.depth is not None:
+        ai["depth"] = args.depth
+    if args.profile or args.profile_dir is not None:
+        ai["profile"] = True
+    if args.profile_dir is not None:
+        ai["profile_dir"] = str(args.profile_dir.resolve())
+    return AppSettings.from_yaml(args.config, overrides={"ai": ai} if ai else None)
+
+
+def _open_pgn(path: Path | None) -> contextlib.AbstractContextManager[TextIO | None]:
+    if path is None:
+        return contextlib.nullcontext()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path.open("w", encoding="utf-8")
+
+
+def _run_book_build(args: argparse.Namespace) -> None:
+    from chess.ai.book import collect_book_moves, pgn_lines, selfplay_lines, write_book
+    from chess.log import task_progress
+
+    if args.pgn is not None:
+        # Streamed straight into the counts: archives are not held in memory.
+        records = write_book(args.out, collect_book_moves(pgn_lines(args.pgn), args.plies))
+        get_logger(__name__).info("Wrote %d book entries to %s", records, args.out)
+        return
+    lines = []
+    with task_progress("Self-play") as progress:
+        task = progress.add_task("Self-play", total=args.games)
+        for line in selfplay_lines(args.games, args.plies, args.depth, args.samples):
+            lines.append(line)
+            progress.advance(task)
+    records = write_book(args.out, collect_book_moves(lines, args.plies))
+    get_logger(__name__).info("Wrote %d book entries to %s", records, args.out)
+
+
+def _run_selfplay(args: argparse.Namespace, settings: AppSettings) -> None:
+    from collections import Counter
+
+    from chess.ai.selfplay import run_selfplay
+    from chess.core.pgn import format_game
+    from chess.log import task_progress
+
+    workers = settings.ai.workers if args.workers is None else args.workers
+    samples = settings.ai.max_n_samples if args.samples is None else args.samples
+    results: Counter[str] = Counter()
+    move_ms: list[float] = []
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    with (
+        args.out.open("w", encoding="utf-8") as handle,
+        _open_pgn(args.pgn) as pgn,
+        task_progress("Self-play") as progress,
+    ):
+        task = progress.add_task("Self-play", total=args.games)
+        for game in run_selfplay(
+            args.games,
+            settings.ai.depth,
+            max_n_samples=samples,
+            max_plies=args.max_plies,
+            workers=workers,
+            seed=args.seed,
+            profile=settings.ai.profile,
+            pstats_dir=settings.ai.profile_dir,
+        ):
+            handle.write(game.to_json() + "\n")
+            handle.flush()
+            if pgn is not None:
+                pgn.write(format_game(game.to_pgn()) + "\n")
+            results[game.result] += 1
+            move_ms.extend(game.move_ms)
+            progress.advance(task)
+    mean_ms = sum(move_ms) / len(move_ms) if move_ms else 0.0
+    get_logger(__name__).info(
+        "Wrote %d games to %s (1-0: %d, 0-1: %d, draws: %d, unfinished: %d; %.1f ms/move)",
+        args.games,
+        args.out,
+        results["1-0"],
+        results["0-1"],
+        results["1/2-1/2"],
+        results["*"],
+        mean_ms,
+    )
+
+
+def _run_arena(args: argparse.Namespace, settings: AppSettings) -> None:
+    from chess.ai.arena import AgentSpec, ArenaStats, Sprt, load_openings, run_arena
+    from chess.core.board_state import START_FEN
+    from chess.core.pgn import format_game
+    from chess.log import log_kv_table, task_progress
+
+    logger = get_logger(__name__)
+    try:
+        a, b = AgentSpec.parse(args.agent_a), AgentSpec.parse(args.agent_b)
+        openings = load_openings(args.openings) if args.openings else [START_FEN]
+    except ValueError as exc:
+        raise SystemExit(f"arena: {exc}") from exc
+    sprt = Sprt(args.elo0, args.elo1, args.alpha, args.beta)
+    workers = settings.ai.workers if args.workers is None else args.workers
+    stats = ArenaStats()
+    verdict: str | None = None
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    with (
+        args.out.open("w", encoding="utf-8") as handle,
+        _open_pgn(args.pgn) as pgn,
+        task_progress("Arena") as progress,
+    ):
+        task = progress.add_task("Arena", total=args.games)
+        games = run_arena(
+            a,
+            b,
+            args.games,
+            openings=openings,
+            max_plies=args.max_plies,
+            workers=workers,
+            seed=args.seed,
+            profile=settings.ai.profile,
+            pstats_dir=settings.ai.profile_dir,
+        )
+        for game in games:
+            handle.write(game.to_json() + "\n")
+            handle.flush()
+            if pgn is not None:
+                pgn.write(format_game(game.to_pgn("chess arena")) + "\n")
+            stats.add(game)
+            progress.advance(task)
+            if args.sprt:
+                verdict = sprt.decide(stats.llr(sprt))
+                if verdict is not None:
+                    games.close()
+                    break
+
+    elo, margin = stats.elo()
+    lower, upper = sprt.bounds()
+    a_ms, a_nodes = stats.average("A")
+    b_ms, b_nodes = stats.average("B")
+    rows = [
+        ("A", a.label()),
+        ("B", b.label()),
+        ("games", str(stats.games)),
+        ("A wins / draws / losses", f"{stats.wins} / {stats.draws} / {stats.losses}"),
+        ("score", f"{stats.score:.1%}"),
+        ("Elo (A - B)", f"{elo:+.1f} ± {margin:.1f}"),
+        ("A ms / nodes per move", f"{a_ms:.1f} / {a_nodes:.0f}"),
+        ("B ms / nodes per move", f"{b_ms:.1f} / {b_nodes:.0f}"),
+    ]
+    if args.sprt:
+        rows.append(
+            (
+                f"SPRT [{sprt.elo0:g}, {sprt.elo1:g}]",
+                f"LLR {stats.llr(sprt):.2f} ({lower:.2f}, {upper:.2f}) → {verdict or 'running'}",
+            )
+        )
+    log_kv_table("Arena", rows)
+    logger.info("Wrote %d games to %s", stats.games, args.out)
+
+
+def _run_analyse(args: argparse.Namespace, settings: AppSettings) -> None:
+    from chess.ai.batch import iter_positions, stream_analysis, write_packed_positions
+    from chess.log import task_progress
+
+    logger = get_logger(__name__)
+    if args.pack is not None:
+        fens = (fen for _, fen in iter_positions(args.input) if isinstance(fen, str))
+        try:
+            count = write_packed_positions(args.pack, fens)
+        except ValueError as exc:
+            raise SystemExit(f"analyse: {exc}") from exc
+        logger.info("Packed %d positions into %s", count, args.pack)
+        return
+    if args.multipv < 1 or args.chunk_size < 1:
+        raise SystemExit("analyse: --multipv and --chunk-size must be >= 1")
+
+    workers = settings.ai.workers if args.workers is None else args.workers
+    positions = errors = nodes = 0
+    start = time.perf_counter()
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    with args.out.open("w", encoding="utf-8") as handle, task_progress("Analyse") as progress:
+        task = progress.add_task("Analyse", total=None)
+        results = stream_analysis(
+            iter_positions(args.input),
+            settings.ai.depth,
+            multipv=args.multipv,
+            workers=workers,
+            chunk_size=args.chunk_size,
+        )
+        for result in results:
+            handle.write(result.to_json() + "\n")
+            positions += 1
+            errors += result.error is not None
+            nodes += result.nodes
+            progress.advance(task)
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    logger.info(
+        "Wrote %d positions to %s (%d errors; %.1f positions/s, %.0f nps)",
+        positions,
+        args.out,
+        errors,
+        positions / elapsed,
+        nodes / elapsed,
+    )
+
+
+def _run_bench(args: argparse.Namespace) -> None:
+    from chess.ai.bench import compare_reports, load_positions, load_report, run_bench, write_report
+    from chess.log import log_kv_table, task_progress
+
+    logger = get_logger(__name__)
+    try:
+        positions = load_positions(args.positions)
+        baseline = load_report(args.baseline) if args.baseline.exists() else None
+    except ValueError as exc:
+        raise SystemExit(f"bench: {exc}") from exc
+    runs = len(positions) * (1 if args.workers == 1 else 2)
+    with task_progress("Bench") as progress:
+        task = progress.add_task("Bench", total=runs)
+
+        def report(name: str, workers: int, result: dict) -> None:
+            progress.advance(task)
+            logger.debug("%s workers=%d: %s", name, workers, result)
+
+        bench = run_bench(positions, args.depth, (1, args.workers), on_result=report)
+    write_report(args.out, bench)
+
+    rows = [("depth", str(bench["depth"])), ("positions", str(len(positions)))]
+    for count, total in bench["totals"].items():
+        summary = f"{total['nodes']} nodes, {total['ms']:.0f} ms, {total['nps']} nps"
+        rows.append((f"workers={count}", summary))
+    if bench["speedup"] is not None:
+        rows.append(("speedup", f"{bench['speedup']:.2f}x"))
+    if bench["peak_rss_mb"] is not None:
+        rss = bench["peak_rss_mb"]
+        peak = f"{rss['self']:.0f} MiB"
+        if "children" in rss:
+            peak += f" (largest pool worker {rss['children']:.0f} MiB)"
+        rows.append(("peak RSS", peak))
+    log_kv_table("Bench", rows)
+    if baseline is not None:
+        try:
+            rows, changed = compare_reports(bench, baseline)
+        except ValueError as exc:
+            logger.warning("Not comparing with %s: %s", args.baseline, exc)
+        else:
+            log_kv_table(f"vs {args.baseline.name}", rows)
+            if changed:
+                logger.warning("Search changed (nodes or best move) for: %s", ", ".join(changed))
+    logger.info("Wrote %s", args.out)
+
+
+def _run_tablebase_build(args: argparse.Namespace) -> None:
+    from chess.ai.tablebase import Tablebase, parse_signature, signature_of
+    from chess.log import task_progress
+
+    tablebase = Tablebase(args.dir)
+    with task_progress("Tablebase") as progress:
+        for raw in args.signatures:
+            signature = signature_of(*parse_signature(raw))
+            task = progress.add_task(signature, total=None)
+
+            def report(done: int, total: int, task=task) -> None:
+                progress.update(task, completed=done, total=total)
+
+            path = tablebase.build(signature, on_progress=report)
+            get_logger(__name__).info("Wrote %s", path.parent / f"{signature}.*.npy")
 
 
 def main(argv: list[str] | None = None) -> int:
     parser = _build_parser()
     args = parser.parse_args(argv)
-    setup_logging(_resolve_log_level(args))
+    # UCI owns stdout: logs go to stderr and no banner is printed.
+    setup_logging(_resolve_log_level(args), stderr=args.command == "uci")
 
     settings = _load_settings(args)
 
-    if args.command in GUI_COMMANDS:
+    if args.command in GUI_COMMANDS or args.command == "uci":
         get_logger(__name__).debug(
             "config=%s square_size=%d ai.depth=%d",
             args.config,
@@ -90,6 +491,23 @@ def main(argv: list[str] | None = None) -> int:
         from chess.ui.vs_ai import run_vs_ai
 
         run_vs_ai(settings)
+    elif args.command == "book":
+        _run_book_build(args)
+    elif args.command == "selfplay":
+        _run_selfplay(args, settings)
+    elif args.command == "tablebase":
+        _run_tablebase_build(args)
+    elif args.command == "arena":
+        _run_arena(args, settings)
+    elif args.command == "analyse":
+        _run_analyse(args, settings)
+    elif args.command == "bench":
+        _run_bench(args)
+    elif args.command == "uci":
+        os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+        from chess.uci import run_uci
+
+        run_uci(settings)
     else:
         parser.error(f"unknown command: {args.command}")
 
@@ -10,7 +10,7 @@ from typing import Any
 import yaml
 
 from chess.core.types import AI_COLORS, PROMOTION_TYPES, Color, PieceType
-from chess.paths import DEFAULT_CONFIG
+from chess.paths import DEFAULT_CONFIG, ROOT_DIR
 
 
 def _parse_color(value: str) -> Color:
@@ -58,6 +58,11 @@ class AISettings:
     color: Color = Color.BLACK
     max_n_samples: int | None = None
     workers: int = 0
+    ponder: int = 3
+    book: Path | None = None
+    tablebases: Path | None = None
+    profile: bool = False
+    profile_dir: Path | None = None
 
     def __post_init__(self) -> None:
         if self.depth < 1 or self.depth > 8:
@@ -66,11 +71,14 @@ class AISettings:
             raise ValueError(f"ai.max_n_samples must be >= 1, got {self.max_n_samples}")
         if self.workers < 0 or self.workers > 32:
             raise ValueError(f"ai.workers must be 0–32, got {self.workers}")
+        if self.ponder < 0:
+            raise ValueError(f"ai.ponder must be >= 0, got {self.ponder}")
 
 
 @dataclass(frozen=True)
 class GameSettings:
     promotion: PieceType = PieceType.QUEEN
+    pgn: Path | None = None
 
 
 @dataclass(frozen=True)
@@ -108,9 +116,15 @@ class AppSettings:
             color=_parse_color(str(ai_raw.get("color", "black"))),
             max_n_samples=ai_raw.get("max_n_samples"),
             workers=int(ai_raw.get("workers", 0)),
+            ponder=int(ai_raw.get("ponder", 3)),
+            book=_resolve_path(ai_raw.get("book")),
+            tablebases=_resolve_path(ai_raw.get("tablebases")),
+            profile=bool(ai_raw.get("profile", False)),
+            profile_dir=_resolve_path(ai_raw.get("profile_dir")),
         )
         game = GameSettings(
             promotion=_parse_promotion(str(game_raw.get("promotion", "queen"))),
+            pgn=_resolve_path(game_raw.get("pgn")),
         )
 
         return cls(display=display, ai=ai, game=game)
@@ -123,6 +137,13 @@ def _display_settings(data: dict[str, Any]) -> DisplaySettings:
     return DisplaySettings(**{**dc.asdict(DisplaySettings()), **raw})
 
 
+def _resolve_path(value: Any) -> Path | None:
+    if value is None:
+        return None
+    path = Path(str(value)).expanduser()
+    return path if path.is_absolute() else ROOT_DIR / path
+
+
 def _section(data: dict[str, Any], key: str, default: Any) -> Any:
     value = data.get(key, default)
     return default if value is None else value
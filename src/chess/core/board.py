@@ -1,17 +1,12 @@
 import dataclasses as dc
+from collections.abc import Iterator
+from itertools import chain
 from typing import Any
 
 import pygame
 
 from chess.core.board_state import KING as STATE_KING
-from chess.core.board_state import PAWN as STATE_PAWN
 from chess.core.board_state import PIECE_VALUES, BoardState
-from chess.core.types import (
-    DIM_X as dim_x,
-)
-from chess.core.types import (
-    DIM_Y as dim_y,
-)
 from chess.core.types import (
     SQUARE_SIZE,
     Color,
@@ -22,11 +17,13 @@ from chess.layout import BOARD_INSET
 from chess.ui.render import render_board
 
 from .piece import (
+    EMPTY_SQUARE,
+    OFF_BOARD,
+    SQUARES,
     Bishop,
     King,
     Knight,
     NullPiece,
-    OffBoard,
     Pawn,
     Piece,
     Position,
@@ -46,21 +43,58 @@ _PIECE_CLASSES = {
 
 @dc.dataclass
 class Board:
-    pieces: dict[Color, list[Piece]] = dc.field(default_factory=dict)
     dragged_piece: Piece | None = None
     drag_origin: Position | None = None
     checks: dict[Color, bool] = dc.field(default_factory=dict)
     checkmates: dict[Color, Ending] = dc.field(default_factory=dict)
     turn: Color = Color.WHITE
-    promotion: PieceType = PieceType.KNIGHT
+    promotion: PieceType = PieceType.QUEEN
     moves_without_capture: int = 0
-    board: dict[Position, Piece] = dc.field(default_factory=dict)
-    kings: dict[Color, King] = dc.field(default_factory=dict)
     last_move: tuple[Position, Position] | None = None
     _state: BoardState | None = dc.field(default=None, repr=False, compare=False)
+    _legal_targets: dict[Position, tuple[Position, ...]] | None = dc.field(
+        default=None, repr=False, compare=False
+    )
+    # ``None`` until first use on boards built from a state (see ``from_state``).
+    _pieces: dict[Color, list[Piece]] | None = dc.field(default=None, init=False, repr=False)
+    _board: dict[Position, Piece] | None = dc.field(default=None, init=False, repr=False)
+    _kings: dict[Color, King] | None = dc.field(default=None, init=False, repr=False)
+
+    @property
+    def pieces(self) -> dict[Color, list[Piece]]:
+        if self._pieces is None:
+            self._materialise()
+        return self._pieces
+
+    @pieces.setter
+    def pieces(self, value: dict[Color, list[Piece]]) -> None:
+        self._pieces = value
+
+    @property
+    def board(self) -> dict[Position, Piece]:
+        if self._board is None:
+            self._materialise()
+        return self._board
+
+    @board.setter
+    def board(self, value: dict[Position, Piece]) -> None:
+        self._board = value
+
+    @property
+    def kings(self) -> dict[Color, King]:
+        if self._kings is None:
+            self._materialise()
+        return self._kings
+
+    @kings.setter
+    def kings(self, value: dict[Color, King]) -> None:
+        self._kings = value
 
     def invalidate_state(self) -> None:
+        if self._pieces is None:
+            self._materialise()
         self._state = None
+        self._legal_targets = None
 
     @property
     def state(self) -> BoardState:
@@ -71,8 +105,14 @@ class Board:
     def __post_init__(self):
         self.checks = {Color.WHITE: False, Color.BLACK: False}
         self.checkmates = {Color.WHITE: Ending.ONGOING, Color.BLACK: Ending.ONGOING}
-        self.board = {Position(x, y): NullPiece() for x in range(dim_x) for y in range(dim_y)}
+        self.board = dict.fromkeys(SQUARES, EMPTY_SQUARE)
         self.pieces = {Color.WHITE: [], Color.BLACK: []}
+        self.kings = {}
+
+    @classmethod
+    def new_game(cls, *args, **kwargs) -> "Board":
+        """Board at the start position; piece objects are only built once something reads them."""
+        return cls.from_state(BoardState.initial(), *args, **kwargs)
 
     @classmethod
     def from_pieces(cls, pieces: list[Piece], *args, **kwargs) -> "Board":
@@ -85,18 +125,33 @@ class Board:
     def add_piece(board: "Board", piece: Piece):
         if piece.color not in board.pieces:
             board.pieces[piece.color] = []
+        occupant = board.board.get(piece.position)
+        if occupant is not None and not isinstance(occupant, NullPiece):
+            board._remove_piece(occupant)
         board.pieces[piece.color].append(piece)
         piece.created = True
         board.board[piece.position] = piece
-        board.invalidate_state()
+        if isinstance(piece, King):
+            board.kings[piece.color] = piece
+        board._legal_targets = None
+        state = board._state
+        if state is not None:
+            value = piece.piece_type.value
+            state.set_square(
+                piece.position.x,
+                piece.position.y,
+                value if piece.color == Color.WHITE else -value,
+            )
+            if isinstance(piece, King | Rook):
+                state.set_castling(BoardState.castling_from_board(board))
 
     def get(self, position: Position) -> Piece:
-        if not self.in_bounds(position):
-            return OffBoard()
+        if position.index < 0:
+            return OFF_BOARD
         return self.board[position]
 
-    def promote_to(self, piece: Piece) -> Piece:
-        match self.promotion:
+    def promote_to(self, piece: Piece, piece_type: PieceType | None = None) -> Piece:
+        match piece_type or self.promotion:
             case PieceType.QUEEN:
                 return Queen(color=piece.color, position=piece.position)
             case PieceType.ROOK:
@@ -108,10 +163,38 @@ class Board:
             case _:
                 return piece
 
+    def legal_targets(self, piece: Piece) -> tuple[Position, ...]:
+        """Legal destination squares for ``piece``; empty unless it is on the board and to move.
+
+        Backed by one ``BoardState.generate_legal_moves`` call per position.
+        """
+        if self._legal_targets is None:
+            by_origin: dict[Position, list[Position]] = {}
+            for move in self.state.generate_legal_moves():
+                origin, target = SQUARES[move[1] * 8 + move[0]], SQUARES[move[3] * 8 + move[2]]
+                by_origin.setdefault(origin, []).append(target)
+            self._legal_targets = {
+                origin: tuple(dict.fromkeys(targets)) for origin, targets in by_origin.items()
+            }
+        if self.board.get(piece.position) is not piece:
+            return ()
+        return self._legal_targets.get(piece.position, ())
+
+    def iter_pieces(self) -> Iterator[Piece]:
+        """All live pieces, White first, without building a combined list."""
+        return chain.from_iterable(self.pieces.values())
+
+    def _remove_piece(self, piece: Piece) -> None:
+        pieces = self.pieces[piece.color]
+        for index, candidate in enumerate(pieces):
+            if candidate is piece:
+                del pieces[index]
+                return
+
     def _sync_grid_from_pieces(self) -> None:
-        self.board = {Position(x, y): NullPiece() for x in range(dim_x) for y in range(dim_y)}
+        self.board = dict.fromkeys(SQUARES, EMPTY_SQUARE)
         self.kings = {}
-        for piece in self.pieces[Color.WHITE] + self.pieces[Color.BLACK]:
+        for piece in self.iter_pieces():
             self.board[piece.position] = piece
             if isinstance(piece, King):
                 self.kings[piece.color] = piece
@@ -125,18 +208,43 @@ class Board:
                 piece.position.y,
                 piece.moved,
             )
-            for piece in self.pieces[Color.WHITE] + self.pieces[Color.BLACK]
+            for piece in self.iter_pieces()
+        )
+        return (
+            self.turn.value,
+            self.promotion.value,
+            self.moves_without_capture,
+            rows,
+            self.state.ep_file,
+            self.state.history_window(),
         )
-        return (self.turn.value, self.promotion.value, self.moves_without_capture, rows)
 
     @classmethod
     def from_search_state(cls, state: tuple[Any, ...]) -> "Board":
-        turn_val, promotion_val, moves_without_capture, piece_rows = state
-        board = cls(
-            turn=Color(turn_val),
-            promotion=PieceType(promotion_val),
-            moves_without_capture=moves_without_capture,
-        )
+        board = cls.from_state(BoardState.from_search_state(state))
+        board.promotion = PieceType(state[1])
+        return board
+
+    @classmethod
+    def from_fen(cls, fen: str) -> "Board":
+        return cls.from_state(BoardState.from_fen(fen))
+
+    @classmethod
+    def from_state(cls, state: BoardState, *args, **kwargs) -> "Board":
+        """Object board mirroring ``state``, which it adopts as its live state.
+
+        The piece objects are materialised from ``state`` on first access.
+        """
+        kwargs.setdefault("turn", Color.WHITE if state.turn == 0 else Color.BLACK)
+        kwargs.setdefault("moves_without_capture", state.halfmove)
+        board = cls(*args, **kwargs)
+        board._pieces = board._board = board._kings = None
+        board._state = state
+        board._sync_checks_from_state()
+        return board
+
+    def _materialise(self) -> None:
+        piece_rows = self.state.to_search_state()[3]
         white: list[Piece] = []
         black: list[Piece] = []
         for color_val, type_val, x, y, moved in piece_rows:
@@ -145,28 +253,27 @@ class Board:
             piece.moved = moved
             piece.created = True
             (white if piece.color == Color.WHITE else black).append(piece)
-        board.pieces = {Color.WHITE: white, Color.BLACK: black}
-        board._sync_grid_from_pieces()
-        board.invalidate_state()
-        board.update()
-        return board
+        self._pieces = {Color.WHITE: white, Color.BLACK: black}
+        self._sync_grid_from_pieces()
 
     @staticmethod
     def in_bounds(position: Position) -> bool:
-        return 0 <= position.x < dim_x and 0 <= position.y < dim_y
+        return position.index >= 0
 
     def update(self) -> None:
+        """Full resync after pieces were edited directly; moves keep everything in sync."""
+        self._legal_targets = None
         self._sync_grid_from_pieces()
         self._sync_checks_from_state()
 
     def _find_piece_at(self, x: int, y: int) -> Piece | None:
-        target = Position(x, y)
-        for piece in self.pieces[Color.WHITE] + self.pieces[Color.BLACK]:
-            if piece.position == target:
-                return piece
-        return None
+        piece = self.board.get(SQUARES[y * 8 + x])
+        if piece is None or isinstance(piece, NullPiece):
+            return None
+        return piece
 
     def _sync_pieces_from_undo(self, undo) -> int:
+        """Mirror one ``BoardState`` move onto the object board, touching only its squares."""
         moved = undo.moved_piece
         sign = 1 if moved > 0 else -1
         color = Color.WHITE if sign > 0 else Color.BLACK
@@ -177,30 +284,37 @@ class Board:
 
         capture_value = 0
         if undo.captured:
-            captured = self._find_piece_at(undo.tx, undo.ty)
+            captured = self._find_piece_at(undo.tx, undo.fy if undo.en_passant else undo.ty)
             if captured is not None:
-                self.pieces[captured.color].remove(captured)
+                self._remove_piece(captured)
                 capture_value = PIECE_VALUES.get(abs(undo.captured), 0)
+                if undo.en_passant:
+                    self.board[captured.position] = EMPTY_SQUARE
 
-        piece.position = Position(undo.tx, undo.ty)
+        origin = SQUARES[undo.fy * 8 + undo.fx]
+        target = SQUARES[undo.ty * 8 + undo.tx]
+        piece.position = target
         piece.moved += 1
+        self.board[origin] = EMPTY_SQUARE
+        self.board[target] = piece
 
-        promo_rank = 0 if sign > 0 else 7
-        if abs(moved) == STATE_PAWN and undo.ty == promo_rank:
-            self.pieces[color].remove(piece)
-            promoted = self.promote_to(piece)
+        if undo.promotion:
+            self._remove_piece(piece)
+            promoted = self.promote_to(piece, PieceType(abs(undo.promotion)))
             promoted.moved = piece.moved
             promoted.created = True
             self.pieces[color].append(promoted)
+            self.board[target] = promoted
 
         if abs(moved) == STATE_KING and abs(undo.tx - undo.fx) == 2:
             direction = 1 if undo.tx > undo.fx else -1
-            rook_from_x = 7 if direction == 1 else 0
-            rook_to_x = undo.tx - direction
-            rook = self._find_piece_at(rook_from_x, undo.fy)
+            rook_from = SQUARES[undo.fy * 8 + (7 if direction == 1 else 0)]
+            rook = self._find_piece_at(rook_from.x, rook_from.y)
             if rook is not None:
-                rook.position = Position(rook_to_x, undo.fy)
+                rook.position = SQUARES[undo.fy * 8 + undo.tx - direction]
                 rook.moved += 1
+                self.board[rook_from] = EMPTY_SQUARE
+                self.board[rook.position] = rook
 
         return capture_value
 
@@ -211,10 +325,27 @@ class Board:
             Color.BLACK: snapshot.in_check(1),
         }
 
+    def _after_move(self) -> None:
+        """Bookkeeping once ``state`` has played a move and the squares are mirrored."""
+        snapshot = self.state
+        self._legal_targets = None
+        self.turn = Color.BLACK if snapshot.turn == 1 else Color.WHITE
+        self.moves_without_capture = snapshot.halfmove
+        # A legal move never leaves the mover in check, so only the side to move needs a scan.
+        mover = Color.WHITE if self.turn == Color.BLACK else Color.BLACK
+        self.checks[mover] = False
+        self.checks[self.turn] = snapshot.in_check(snapshot.turn)
+
     def move_piece(
-        self, piece: Piece, new_position: Position, *, update_result: bool = True
+        self,
+        piece: Piece,
+        new_position: Position,
+        *,
+        update_result: bool = True,
+        promotion: PieceType | None = None,
     ) -> tuple[bool, int]:
-        origin = Position(piece.position.x, piece.position.y)
+        """Play ``piece``; a promoting pawn becomes ``promotion`` (default ``self.promotion``)."""
+        origin = piece.position
         if not self.in_bounds(new_position):
             return False, 0
 
@@ -226,28 +357,31 @@ class Board:
                 self.checkmates[opposite] = self.check_end(opposite)
             return True, 0
 
-        ok, capture_value = self.try_move(piece, new_position, move=True)
+        ok, capture_value = self.try_move(piece, new_position, move=True, promotion=promotion)
         if ok and update_result:
-            self.last_move = (origin, Position(new_position.x, new_position.y))
+            self.last_move = (origin, new_position)
             opposite = Color.WHITE if piece.color == Color.BLACK else Color.BLACK
             self.checkmates[opposite] = self.check_end(opposite)
         return ok, capture_value
 
-    def try_move(self, piece: Piece, new_position: Position, move: bool = True):
+    def try_move(
+        self,
+        piece: Piece,
+        new_position: Position,
+        move: bool = True,
+        promotion: PieceType | None = None,
+    ):
         fx, fy = piece.position.x, piece.position.y
         tx, ty = new_position.x, new_position.y
         if not move:
             return self.state.would_be_legal(fx, fy, tx, ty), 0
 
-        if not self.state.make_move(fx, fy, tx, ty):
+        if not self.state.make_move(fx, fy, tx, ty, (promotion or self.promotion).value):
             return False, 0
 
         undo = self.state.peek_undo()
         capture_value = self._sync_pieces_from_undo(undo) if undo is not None else 0
-        self.turn = Color.BLACK if self.state.turn == 1 else Color.WHITE
-        self.moves_without_capture = self.state.halfmove
-        self._sync_grid_from_pieces()
-        self._sync_checks_from_state()
+        self._after_move()
         return True, capture_value
 
     @staticmethod
@@ -261,11 +395,10 @@ class Board:
         if self.dragged_piece is None or self.drag_origin is None:
             return
         origin = self.drag_origin
-        self.dragged_piece.position = Position(origin.x, origin.y)
+        self.dragged_piece.position = origin
         self.board[origin] = self.dragged_piece
         self.dragged_piece = None
         self.drag_origin = None
-        self.invalidate_state()
 
     def is_legal_target(self, piece: Piece, target: Position, origin: Position) -> bool:
         if not self.in_bounds(target):
@@ -280,10 +413,9 @@ class Board:
                 return False
             piece = self.board[mouse_position]
             if not isinstance(piece, NullPiece) and piece.color == self.turn:
-                self.drag_origin = Position(mouse_position.x, mouse_position.y)
+                # The piece stays indexed on its square while dragged; the renderer skips it.
+                self.drag_origin = mouse_position
                 self.dragged_piece = piece
-                self.board[mouse_position] = NullPiece()
-                self.invalidate_state()
             return False
 
         if event.type == pygame.MOUSEBUTTONUP and event.button == 1:
@@ -305,7 +437,6 @@ class Board:
             if moved:
                 self.dragged_piece = None
                 self.drag_origin = None
-            self.update()
             return moved
 
         return False
@@ -318,7 +449,7 @@ class Board:
         ):
             return False
 
-        origin = Position(king.position.x, king.position.y)
+        origin = king.position
         if not self.state.would_be_legal(origin.x, origin.y, new_position.x, new_position.y):
             return False
 
@@ -328,17 +459,17 @@ class Board:
         undo = self.state.peek_undo()
         if undo is not None:
             self._sync_pieces_from_undo(undo)
-        self.turn = Color.BLACK if self.state.turn == 1 else Color.WHITE
-        self.moves_without_capture = self.state.halfmove
-        self._sync_grid_from_pieces()
-        self._sync_checks_from_state()
-        self.last_move = (origin, Position(new_position.x, new_position.y))
+        self._after_move()
+        self.last_move = (origin, new_position)
         return True
 
     def check_end(self, color: Color):
         if self.moves_without_capture >= 80:
             return Ending.DRAW
 
+        if self.state.is_threefold_repetition():
+            return Ending.DRAW
+
         if self.state.insufficient_material():
             return Ending.DRAW
 
@@ -2,18 +2,22 @@
 
 from __future__ import annotations
 
+import struct
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any
 
 import numpy as np
 
 from chess.core.types import Color, PieceType
-from chess.core.zobrist import ZOBRIST_PIECES, ZOBRIST_TURN, square_index
+from chess.core.zobrist import ZOBRIST_CASTLING, ZOBRIST_EP, ZOBRIST_PIECES, ZOBRIST_TURN
 
 if TYPE_CHECKING:
     from chess.core.board import Board
 
 Move4 = tuple[int, int, int, int]
+# Promotions carry the new piece type: ``(fx, fy, tx, ty, promotion)``.
+PromotionMove = tuple[int, int, int, int, int]
+StateMove = Move4 | PromotionMove
 
 PAWN = PieceType.PAWN.value
 ROOK = PieceType.ROOK.value
@@ -41,8 +45,19 @@ KING_DELTAS = ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1,
 ORTHO_DELTAS = ((1, 0), (-1, 0), (0, 1), (0, -1))
 DIAG_DELTAS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
 
+PROMOTION_PIECES = (QUEEN, ROOK, BISHOP, KNIGHT)
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+_FEN_WHITE = {"P": PAWN, "R": ROOK, "N": KNIGHT, "B": BISHOP, "Q": QUEEN, "K": KING}
+_FEN_VALUES = {**_FEN_WHITE, **{letter.lower(): -v for letter, v in _FEN_WHITE.items()}}
+_FEN_LETTERS = {value: letter for letter, value in _FEN_VALUES.items()}
+_FEN_CASTLING = {"K": WHITE_K_CASTLE, "Q": WHITE_Q_CASTLE, "k": BLACK_K_CASTLE, "q": BLACK_Q_CASTLE}
+
 MATE_SCORE = 100_000.0
 
+_PACKED = struct.Struct("<32sBBHH")
+PACKED_SIZE = _PACKED.size
+
 
 @dataclass
 class _Undo:
@@ -60,6 +75,9 @@ class _Undo:
     halfmove: int
     hash_: int
     turn: int
+    ep_file: int
+    promotion: int
+    en_passant: bool
 
 
 @dataclass
@@ -79,15 +97,12 @@ class _Probe:
     fy: int
     tx: int
     ty: int
+    ep_pawn: int
 
 
 def _zobrist_piece(x: int, y: int, value: int) -> int:
-    if value == 0:
-        return 0
-    color = Color.WHITE if value > 0 else Color.BLACK
-    piece_type = PieceType(abs(value))
-    idx = square_index(x, y)
-    return ZOBRIST_PIECES[idx][color.value - 1][piece_type.value - 1]
+    # Inlined ``zobrist.piece_key_index``: 13 signed values per square, value 0 keyed to 0.
+    return ZOBRIST_PIECES[(y * 8 + x) * 13 + value + 6]
 
 
 class BoardState:
@@ -103,7 +118,10 @@ class BoardState:
         "castling",
         "halfmove",
         "hash_",
+        "ep_file",
+        "fullmove",
         "_undo_stack",
+        "_history",
     )
 
     def __init__(self) -> None:
@@ -114,12 +132,36 @@ class BoardState:
         self.castling = WHITE_K_CASTLE | WHITE_Q_CASTLE | BLACK_K_CASTLE | BLACK_Q_CASTLE
         self.halfmove = 0
         self.hash_ = 0
+        self.ep_file = -1  # file of a pawn that just moved two squares and can be taken e.p.
+        self.fullmove = 1
         self._undo_stack: list[_Undo] = []
+        self._history: list[int] = []  # hashes of earlier positions, one per ply played
+
+    @classmethod
+    def initial(cls) -> BoardState:
+        """The standard start position, cloned from a prebuilt state."""
+        return _INITIAL_STATE.copy()
+
+    def copy(self) -> BoardState:
+        """Independent clone sharing no mutable state; the grid is one ``ndarray.copy()``."""
+        clone = BoardState.__new__(BoardState)
+        clone.grid = self.grid.copy()
+        clone.turn = self.turn
+        clone.wkx, clone.wky = self.wkx, self.wky
+        clone.bkx, clone.bky = self.bkx, self.bky
+        clone.castling = self.castling
+        clone.halfmove = self.halfmove
+        clone.hash_ = self.hash_
+        clone.ep_file = self.ep_file
+        clone.fullmove = self.fullmove
+        clone._undo_stack = self._undo_stack.copy()
+        clone._history = self._history.copy()
+        return clone
 
     @classmethod
     def from_board(cls, board: Board) -> BoardState:
         state = cls()
-        for piece in board.pieces[Color.WHITE] + board.pieces[Color.BLACK]:
+        for piece in board.iter_pieces():
             v = piece.piece_type.value
             if piece.color == Color.BLACK:
                 v = -v
@@ -132,36 +174,169 @@ class BoardState:
 
         state.turn = 0 if board.turn == Color.WHITE else 1
         state.halfmove = board.moves_without_capture
-        state.castling = 0
+        state.castling = cls.castling_from_board(board)
+        if board.last_move is not None:
+            origin, target = board.last_move
+            moved = int(state.grid[target.y, target.x])
+            if abs(moved) == PAWN and abs(target.y - origin.y) == 2:
+                state.ep_file = state._ep_file_after(target.x, target.y, moved)
+        state._recompute_hash()
+        return state
 
-        from chess.core.piece import Position
+    @classmethod
+    def from_fen(cls, fen: str) -> BoardState:
+        """Parse Forsyth-Edwards Notation; the clocks are optional and default to ``0 1``."""
+        fields = fen.split()
+        if len(fields) not in (4, 6):
+            raise ValueError(f"FEN needs 4 or 6 fields, got {len(fields)}: {fen!r}")
+        placement, side, castling, ep = fields[:4]
+        ranks = placement.split("/")
+        if len(ranks) != 8:
+            raise ValueError(f"FEN placement needs 8 ranks: {fen!r}")
 
-        for color, y in ((Color.WHITE, 7), (Color.BLACK, 0)):
-            king = board.kings.get(color)
-            if king is not None and king.moved == 0:
-                rook_h = board.get(Position(7, y))
-                rook_a = board.get(Position(0, y))
-                if color == Color.WHITE:
-                    if rook_h.piece_type == PieceType.ROOK and rook_h.moved == 0:
-                        state.castling |= WHITE_K_CASTLE
-                    if rook_a.piece_type == PieceType.ROOK and rook_a.moved == 0:
-                        state.castling |= WHITE_Q_CASTLE
+        state = cls()
+        cells: list[int] = []
+        for rank in ranks:
+            width = len(cells)
+            for char in rank:
+                if char.isdigit():
+                    cells.extend([0] * int(char))
+                elif char in _FEN_VALUES:
+                    cells.append(_FEN_VALUES[char])
                 else:
-                    if rook_h.piece_type == PieceType.ROOK and rook_h.moved == 0:
-                        state.castling |= BLACK_K_CASTLE
-                    if rook_a.piece_type == PieceType.ROOK and rook_a.moved == 0:
-                        state.castling |= BLACK_Q_CASTLE
+                    raise ValueError(f"bad FEN piece {char!r}: {fen!r}")
+            if len(cells) - width != 8:
+                raise ValueError(f"FEN rank {rank!r} does not cover 8 files: {fen!r}")
+        state.grid[:] = np.array(cells, dtype=np.int8).reshape(8, 8)
+        for value in (KING, -KING):
+            found = cells.count(value)
+            if found != 1:
+                raise ValueError(f"FEN needs exactly one king per side: {fen!r}")
+            y, x = divmod(cells.index(value), 8)
+            if value > 0:
+                state.wkx, state.wky = x, y
+            else:
+                state.bkx, state.bky = x, y
+
+        if side not in ("w", "b"):
+            raise ValueError(f"bad FEN side to move {side!r}: {fen!r}")
+        state.turn = 0 if side == "w" else 1
+        state.castling = 0
+        if castling != "-":
+            for char in castling:
+                rights = _FEN_CASTLING.get(char)
+                if rights is None:
+                    raise ValueError(f"bad FEN castling {castling!r}: {fen!r}")
+                state.castling |= rights
+        if ep != "-":
+            if len(ep) != 2 or ep[0] not in "abcdefgh" or ep[1] not in "36":
+                raise ValueError(f"bad FEN en-passant square {ep!r}: {fen!r}")
+            x = ord(ep[0]) - 97
+            pawn_y, pawn = (4, PAWN) if ep[1] == "3" else (3, -PAWN)
+            if state.grid[pawn_y, x] == pawn:
+                state.ep_file = state._ep_file_after(x, pawn_y, pawn)
+        if len(fields) == 6:
+            try:
+                state.halfmove, state.fullmove = int(fields[4]), int(fields[5])
+            except ValueError:
+                raise ValueError(f"bad FEN move counters: {fen!r}") from None
+        state._recompute_hash()
+        return state
 
+    @classmethod
+    def from_packed(cls, data: bytes) -> BoardState:
+        """Inverse of ``to_packed``; raises ``ValueError`` on a malformed record."""
+        if len(data) != PACKED_SIZE:
+            raise ValueError(f"packed position needs {PACKED_SIZE} bytes, got {len(data)}")
+        squares, flags, ep, halfmove, fullmove = _PACKED.unpack(data)
+        nibbles = np.frombuffer(squares, dtype=np.uint8)
+        codes = np.empty(64, dtype=np.int8)
+        codes[0::2] = nibbles & 0x0F
+        codes[1::2] = nibbles >> 4
+        if codes.max() > 12 or flags >> 5 or ep > 8:
+            raise ValueError(f"bad packed position: {data.hex()}")
+        state = cls()
+        state.grid[:] = np.where(codes > KING, KING - codes, codes).reshape(8, 8)
+        for value in (KING, -KING):
+            found = np.argwhere(state.grid == value)
+            if len(found) != 1:
+                raise ValueError(f"packed position needs exactly one king per side: {data.hex()}")
+            y, x = (int(v) for v in found[0])
+            if value > 0:
+                state.wkx, state.wky = x, y
+            else:
+                state.bkx, state.bky = x, y
+        state.turn = flags & 1
+        state.castling = flags >> 1
+        state.ep_file = ep - 1
+        state.halfmove, state.fullmove = halfmove, fullmove
         state._recompute_hash()
         return state
 
+    def to_packed(self) -> bytes:
+        """Fixed ``PACKED_SIZE``-byte record for bulk position files.
+
+        Layout (little endian): 64 four-bit square codes (a8 first, low nibble first;
+        0 empty, 1-6 white, 7-12 black), a flags byte (``turn | castling << 1``), the
+        en-passant file plus one (0 = none), then ``halfmove`` and ``fullmove`` as u16.
+        """
+        flat = self.grid.ravel()
+        codes = np.where(flat < 0, KING - flat, flat).astype(np.uint8)
+        squares = (codes[0::2] | (codes[1::2] << 4)).tobytes()
+        flags = self.turn | self.castling << 1
+        return _PACKED.pack(
+            squares, flags, self.ep_file + 1, min(self.halfmove, 0xFFFF), min(self.fullmove, 0xFFFF)
+        )
+
+    def to_fen(self) -> str:
+        ranks: list[str] = []
+        for row in self.grid.tolist():
+            rank = ""
+            empty = 0
+            for value in row:
+                if value == 0:
+                    empty += 1
+                    continue
+                if empty:
+                    rank += str(empty)
+                    empty = 0
+                rank += _FEN_LETTERS[value]
+            ranks.append(rank + str(empty) if empty else rank)
+        castling = "".join(c for c, bit in _FEN_CASTLING.items() if self.castling & bit) or "-"
+        ep = "-"
+        if self.ep_file >= 0:
+            ep = f"{chr(97 + self.ep_file)}{6 if self.turn == 0 else 3}"
+        side = "w" if self.turn == 0 else "b"
+        return f"{'/'.join(ranks)} {side} {castling} {ep} {self.halfmove} {self.fullmove}"
+
+    @staticmethod
+    def castling_from_board(board: Board) -> int:
+        """Castling bits implied by unmoved kings and corner rooks on ``board``."""
+        from chess.core.piece import Position
+
+        castling = 0
+        for color, y, king_side, queen_side in (
+            (Color.WHITE, 7, WHITE_K_CASTLE, WHITE_Q_CASTLE),
+            (Color.BLACK, 0, BLACK_K_CASTLE, BLACK_Q_CASTLE),
+        ):
+            king = board.kings.get(color)
+            if king is None or king.moved != 0:
+                continue
+            for x, right in ((7, king_side), (0, queen_side)):
+                rook = board.get(Position(x, y))
+                if rook.piece_type == PieceType.ROOK and rook.color == color and rook.moved == 0:
+                    castling |= right
+        return castling
+
     @classmethod
     def from_search_state(cls, state: tuple[Any, ...]) -> BoardState:
-        turn_val, _promotion_val, moves_without_capture, piece_rows = state
+        turn_val, _promotion_val, moves_without_capture, piece_rows, ep_file, history = state
         sb = cls()
         sb.turn = 0 if turn_val == Color.WHITE.value else 1
         sb.halfmove = moves_without_capture
         sb.castling = 0
+        sb.ep_file = ep_file
+        sb._history = list(history)
 
         white_king_moved = True
         black_king_moved = True
@@ -204,6 +379,43 @@ class BoardState:
         sb._recompute_hash()
         return sb
 
+    def to_search_state(self) -> tuple[Any, ...]:
+        """Picklable tuple in the ``Board.to_search_state`` layout.
+
+        Castling rights are encoded through the ``moved`` flag of kings and corner rooks.
+        The tuple ends with the en-passant file (-1 for none) and the repetition window.
+        """
+        white_castle = self.castling & (WHITE_K_CASTLE | WHITE_Q_CASTLE)
+        black_castle = self.castling & (BLACK_K_CASTLE | BLACK_Q_CASTLE)
+        corner_rights = {
+            (7, 7): WHITE_K_CASTLE,
+            (0, 7): WHITE_Q_CASTLE,
+            (7, 0): BLACK_K_CASTLE,
+            (0, 0): BLACK_Q_CASTLE,
+        }
+        rows = []
+        for y in range(8):
+            for x in range(8):
+                v = int(self.grid[y, x])
+                if v == 0:
+                    continue
+                kind = abs(v)
+                moved = 0
+                if kind == KING:
+                    moved = 0 if (white_castle if v > 0 else black_castle) else 1
+                elif kind == ROOK and (x, y) in corner_rights:
+                    moved = 0 if self.castling & corner_rights[(x, y)] else 1
+                color = Color.WHITE.value if v > 0 else Color.BLACK.value
+                rows.append((color, kind, x, y, moved))
+        turn = Color.WHITE.value if self.turn == 0 else Color.BLACK.value
+        return (turn, QUEEN, self.halfmove, tuple(rows), self.ep_file, self.history_window())
+
+    def history_window(self) -> tuple[int, ...]:
+        """Hashes of the positions that can still repeat (the last ``halfmove`` plies)."""
+        if self.halfmove == 0:
+            return ()
+        return tuple(self._history[-self.halfmove :])
+
     def _recompute_hash(self) -> None:
         h = ZOBRIST_TURN if self.turn == 1 else 0
         for y in range(8):
@@ -211,11 +423,55 @@ class BoardState:
                 v = int(self.grid[y, x])
                 if v:
                     h ^= _zobrist_piece(x, y, v)
+        if self.ep_file >= 0:
+            h ^= ZOBRIST_EP[self.ep_file]
+        h ^= ZOBRIST_CASTLING[self.castling]
         self.hash_ = h
 
+    def set_castling(self, castling: int) -> None:
+        self.hash_ ^= ZOBRIST_CASTLING[self.castling] ^ ZOBRIST_CASTLING[castling]
+        self.castling = castling
+
+    def _ep_file_after(self, x: int, y: int, pawn: int) -> int:
+        """En-passant file after ``pawn`` lands on ``(x, y)`` with a double push.
+
+        Only set when an enemy pawn stands beside it, so equal positions hash equally.
+        """
+        for nx in (x - 1, x + 1):
+            if 0 <= nx < 8 and self.grid[y, nx] == -pawn:
+                return x
+        return -1
+
+    def _repetition_window(self) -> list[int]:
+        # Only positions since the last capture or pawn move can recur, and a repeat needs at
+        # least 4 plies. Hashes include the side to move, so no parity filtering is needed.
+        history = self._history
+        return history[max(len(history) - self.halfmove, 0) : max(len(history) - 3, 0)]
+
+    def repetitions(self) -> int:
+        """Occurrences of the current position since the last capture or pawn move."""
+        return self._repetition_window().count(self.hash_) + 1
+
+    def is_repetition(self) -> bool:
+        """Whether the current position already occurred since the last irreversible move."""
+        return self.hash_ in self._repetition_window()
+
+    def is_threefold_repetition(self) -> bool:
+        return self.repetitions() >= 3
+
     def hash_key(self) -> int:
         return self.hash_
 
+    def set_square(self, x: int, y: int, value: int) -> None:
+        """Place ``value`` (0 clears) on a square, updating the hash and king squares."""
+        old = int(self.grid[y, x])
+        self.hash_ ^= _zobrist_piece(x, y, old) ^ _zobrist_piece(x, y, value)
+        self.grid[y, x] = value
+        if value == KING:
+            self.wkx, self.wky = x, y
+        elif value == -KING:
+            self.bkx, self.bky = x, y
+
     def _side_sign(self) -> int:
         return 1 if self.turn == 0 else -1
 
@@ -277,7 +533,93 @@ class BoardState:
         attacker = 1 if color == 0 else 0
         return self.is_square_attacked(kx, ky, attacker)
 
-    def _append_pawn_moves(self, moves: list[Move4], x: int, y: int, sign: int) -> None:
+    def attackers(self, x: int, y: int, by_color: int) -> list[tuple[int, int]]:
+        """Squares of ``by_color`` pieces attacking ``(x, y)``; pins are ignored."""
+        sign = 1 if by_color == 0 else -1
+        found: list[tuple[int, int]] = []
+        py = y + 1 if by_color == 0 else y - 1
+        if 0 <= py < 8:
+            for px in (x - 1, x + 1):
+                if 0 <= px < 8 and self.grid[py, px] == sign * PAWN:
+                    found.append((px, py))
+        for deltas, piece in ((KNIGHT_DELTAS, KNIGHT), (KING_DELTAS, KING)):
+            for dx, dy in deltas:
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < 8 and 0 <= ny < 8 and self.grid[ny, nx] == sign * piece:
+                    found.append((nx, ny))
+        for deltas, sliders in ((ORTHO_DELTAS, (ROOK, QUEEN)), (DIAG_DELTAS, (BISHOP, QUEEN))):
+            for dx, dy in deltas:
+                cx, cy = x + dx, y + dy
+                while 0 <= cx < 8 and 0 <= cy < 8:
+                    v = int(self.grid[cy, cx])
+                    if v:
+                        if v * sign > 0 and abs(v) in sliders:
+                            found.append((cx, cy))
+                        break
+                    cx += dx
+                    cy += dy
+        return found
+
+    def is_capture(self, move: StateMove) -> bool:
+        """Whether ``move`` takes a piece, en passant included."""
+        fx, fy, tx, ty = move[:4]
+        if self.grid[ty, tx] != 0:
+            return True
+        return abs(int(self.grid[fy, fx])) == PAWN and fx != tx
+
+    def see(self, move: StateMove) -> int:
+        """Static exchange evaluation of ``move`` in pawns, from the mover's side.
+
+        Both sides recapture on the target square with their least valuable attacker and
+        may stop whenever continuing would lose material. Sliders behind a capturer join
+        in (x-rays); pins and checks are ignored.
+        """
+        fx, fy, tx, ty = move[:4]
+        grid = self.grid
+        moved = int(grid[fy, fx])
+        sign = 1 if moved > 0 else -1
+        captured = int(grid[ty, tx])
+        cleared = [(fx, fy, moved)]
+        gain = [PIECE_VALUES[abs(captured)] if captured else 0]
+        on_square = abs(moved)
+        if abs(moved) == PAWN and fx != tx and captured == 0:
+            gain[0] = PIECE_VALUES[PAWN]
+            cleared.append((tx, fy, int(grid[fy, tx])))
+        if len(move) == 5:
+            gain[0] += PIECE_VALUES[move[4]] - PIECE_VALUES[PAWN]
+            on_square = move[4]
+        for cx, cy, _ in cleared:
+            grid[cy, cx] = 0
+        try:
+            side = 1 if sign > 0 else 0
+            while True:
+                options = self.attackers(tx, ty, side)
+                if not options:
+                    break
+                ax, ay = min(options, key=lambda sq: PIECE_VALUES[abs(int(grid[sq[1], sq[0]]))])
+                attacker = int(grid[ay, ax])
+                if abs(attacker) == KING:
+                    # The king may only take last: check whether the square is still defended.
+                    grid[ay, ax] = 0
+                    defended = bool(self.attackers(tx, ty, 1 - side))
+                    grid[ay, ax] = attacker
+                    if defended:
+                        break
+                gain.append(PIECE_VALUES[on_square] - gain[-1])
+                if max(-gain[-2], gain[-1]) < 0:
+                    break
+                cleared.append((ax, ay, attacker))
+                grid[ay, ax] = 0
+                on_square = abs(attacker)
+                side = 1 - side
+        finally:
+            for cx, cy, value in reversed(cleared):
+                grid[cy, cx] = value
+        for index in range(len(gain) - 1, 0, -1):
+            gain[index - 1] = -max(-gain[index - 1], gain[index])
+        return gain[0]
+
+    def _append_pawn_moves(self, moves: list[StateMove], x: int, y: int, sign: int) -> None:
         direction = -1 if sign > 0 else 1
         start_rank = 6 if sign > 0 else 1
         promo_rank = 0 if sign > 0 else 7
@@ -285,7 +627,7 @@ class BoardState:
         ny = y + direction
         if 0 <= ny < 8 and self.grid[ny, x] == 0:
             if ny == promo_rank:
-                moves.append((x, y, x, ny))
+                moves.extend((x, y, x, ny, piece) for piece in PROMOTION_PIECES)
             else:
                 moves.append((x, y, x, ny))
                 if y == start_rank and self.grid[y + 2 * direction, x] == 0:
@@ -296,11 +638,16 @@ class BoardState:
             if 0 <= nx < 8 and 0 <= ny < 8:
                 target = int(self.grid[ny, nx])
                 if target * sign < 0:
+                    if ny == promo_rank:
+                        moves.extend((x, y, nx, ny, piece) for piece in PROMOTION_PIECES)
+                    else:
+                        moves.append((x, y, nx, ny))
+                elif nx == self.ep_file and y == (3 if sign > 0 else 4):
                     moves.append((x, y, nx, ny))
 
     def _slide_moves(
         self,
-        moves: list[Move4],
+        moves: list[StateMove],
         x: int,
         y: int,
         sign: int,
@@ -323,7 +670,7 @@ class BoardState:
                 cx += dx
                 cy += dy
 
-    def _append_piece_moves(self, moves: list[Move4], x: int, y: int, sign: int) -> None:
+    def _append_piece_moves(self, moves: list[StateMove], x: int, y: int, sign: int) -> None:
         piece = int(self.grid[y, x])
         if piece * sign <= 0:
             return
@@ -354,7 +701,7 @@ class BoardState:
                         moves.append((x, y, nx, ny))
             self._append_castling(moves, x, y, sign)
 
-    def _append_castling(self, moves: list[Move4], x: int, y: int, sign: int) -> None:
+    def _append_castling(self, moves: list[StateMove], x: int, y: int, sign: int) -> None:
         if x != 4 or abs(int(self.grid[y, x])) != KING:
             return
         color = 0 if sign > 0 else 1
@@ -402,36 +749,37 @@ class BoardState:
             ):
                 moves.append((4, y, 2, y))
 
-    def generate_pseudo_legal_moves(self) -> list[Move4]:
-        moves: list[Move4] = []
+    def generate_pseudo_legal_moves(self) -> list[StateMove]:
+        moves: list[StateMove] = []
         sign = self._side_sign()
         for y in range(8):
             for x in range(8):
                 self._append_piece_moves(moves, x, y, sign)
         return moves
 
-    def generate_legal_moves(self) -> list[Move4]:
+    def generate_legal_moves(self) -> list[StateMove]:
         side = self.turn
-        legal: list[Move4] = []
+        legal: list[StateMove] = []
         for move in self.generate_pseudo_legal_moves():
-            if self._leaves_king_safe(*move, side):
+            if self._leaves_king_safe(move[0], move[1], move[2], move[3], side):
                 legal.append(move)
         return legal
 
     def has_legal_move(self) -> bool:
         side = self.turn
         for move in self.generate_pseudo_legal_moves():
-            if self._leaves_king_safe(*move, side):
+            if self._leaves_king_safe(move[0], move[1], move[2], move[3], side):
                 return True
         return False
 
     def would_be_legal(self, fx: int, fy: int, tx: int, ty: int) -> bool:
+        """Whether the piece on ``(fx, fy)`` may move to ``(tx, ty)`` (any promotion piece)."""
         moved = int(self.grid[fy, fx])
         if moved == 0 or (1 if moved > 0 else -1) != self._side_sign():
             return False
-        pseudo: list[Move4] = []
+        pseudo: list[StateMove] = []
         self._append_piece_moves(pseudo, fx, fy, self._side_sign())
-        if (fx, fy, tx, ty) not in pseudo:
+        if not any(move[2] == tx and move[3] == ty for move in pseudo):
             return False
         return self._leaves_king_safe(fx, fy, tx, ty, self.turn)
 
@@ -460,8 +808,13 @@ class BoardState:
             self.grid[fy, rook_to] = rook_val
             self.grid[fy, rook_from] = 0
 
+        # The promotion piece never affects the mover's own king safety.
         promo_rank = 0 if sign > 0 else 7
         new_piece = sign * QUEEN if abs(moved) == PAWN and ty == promo_rank else moved
+        ep_pawn = 0
+        if abs(moved) == PAWN and fx != tx and captured == 0:
+            ep_pawn = int(self.grid[fy, tx])
+            self.grid[fy, tx] = 0
         self.grid[fy, fx] = 0
         self.grid[ty, tx] = new_piece
 
@@ -487,18 +840,22 @@ class BoardState:
             fy=fy,
             tx=tx,
             ty=ty,
+            ep_pawn=ep_pawn,
         )
 
     def _probe_restore(self, probe: _Probe) -> None:
         self.grid[probe.fy, probe.fx] = probe.moved
         self.grid[probe.ty, probe.tx] = probe.captured
+        if probe.ep_pawn:
+            self.grid[probe.fy, probe.tx] = probe.ep_pawn
         self.wkx, self.wky = probe.wkx, probe.wky
         self.bkx, self.bky = probe.bkx, probe.bky
         if probe.had_rook:
             self.grid[probe.rook_fy, probe.rook_from] = probe.rook_val
             self.grid[probe.rook_fy, probe.rook_to] = 0
 
-    def make_move(self, fx: int, fy: int, tx: int, ty: int) -> bool:
+    def make_move(self, fx: int, fy: int, tx: int, ty: int, promotion: int = QUEEN) -> bool:
+        """Play a pseudo-legal move; ``promotion`` is the piece type a pawn promotes to."""
         moved = int(self.grid[fy, fx])
         if moved == 0:
             return False
@@ -513,6 +870,12 @@ class BoardState:
         old_half = self.halfmove
         old_hash = self.hash_
         old_turn = self.turn
+        old_ep = self.ep_file
+        en_passant = False
+
+        if old_ep >= 0:
+            self.hash_ ^= ZOBRIST_EP[old_ep]
+            self.ep_file = -1
 
         # Castling: king slides two squares horizontally.
         if abs(moved) == KING and abs(tx - fx) == 2:
@@ -521,23 +884,33 @@ class BoardState:
             else:
                 rook_from, rook_to = 0, 3
             rook_val = int(self.grid[fy, rook_from])
-            self.hash_ ^= _zobrist_piece(rook_from, fy, rook_val)
+            self.hash_ ^= ZOBRIST_PIECES[(fy * 8 + rook_from) * 13 + rook_val + 6]
             self.grid[fy, rook_to] = rook_val
             self.grid[fy, rook_from] = 0
-            self.hash_ ^= _zobrist_piece(rook_to, fy, rook_val)
+            self.hash_ ^= ZOBRIST_PIECES[(fy * 8 + rook_to) * 13 + rook_val + 6]
 
-        self.hash_ ^= _zobrist_piece(fx, fy, moved)
-        if captured:
-            self.hash_ ^= _zobrist_piece(tx, ty, captured)
+        from_key = (fy * 8 + fx) * 13 + 6
+        to_key = (ty * 8 + tx) * 13 + 6
+        # Value 0 maps to a zero key, so an empty target needs no branch.
+        self.hash_ ^= ZOBRIST_PIECES[from_key + moved] ^ ZOBRIST_PIECES[to_key + captured]
 
-        promo_rank = 0 if sign > 0 else 7
         new_piece = moved
-        if abs(moved) == PAWN and ty == promo_rank:
-            new_piece = sign * QUEEN
+        if abs(moved) == PAWN:
+            if ty == (0 if sign > 0 else 7):
+                new_piece = sign * promotion
+            elif fx != tx and captured == 0:
+                en_passant = True
+                captured = int(self.grid[fy, tx])
+                self.hash_ ^= ZOBRIST_PIECES[(fy * 8 + tx) * 13 + captured + 6]
+                self.grid[fy, tx] = 0
+            elif abs(ty - fy) == 2:
+                self.ep_file = self._ep_file_after(tx, ty, moved)
+                if self.ep_file >= 0:
+                    self.hash_ ^= ZOBRIST_EP[tx]
 
         self.grid[ty, tx] = new_piece
         self.grid[fy, fx] = 0
-        self.hash_ ^= _zobrist_piece(tx, ty, new_piece)
+        self.hash_ ^= ZOBRIST_PIECES[to_key + new_piece]
 
         if abs(moved) == KING:
             if sign > 0:
@@ -567,11 +940,16 @@ class BoardState:
             elif ty == 0:
                 self.castling &= ~BLACK_K_CASTLE
 
+        if self.castling != old_castling:
+            self.hash_ ^= ZOBRIST_CASTLING[old_castling] ^ ZOBRIST_CASTLING[self.castling]
+
         if captured or abs(moved) == PAWN:
             self.halfmove = 0
         else:
             self.halfmove += 1
 
+        if self.turn == 1:
+            self.fullmove += 1
         self.turn ^= 1
         self.hash_ ^= ZOBRIST_TURN
 
@@ -591,22 +969,37 @@ class BoardState:
                 halfmove=old_half,
                 hash_=old_hash,
                 turn=old_turn,
+                ep_file=old_ep,
+                promotion=new_piece if new_piece != moved else 0,
+                en_passant=en_passant,
             )
         )
+        self._history.append(old_hash)
         return True
 
     def peek_undo(self) -> _Undo | None:
         return self._undo_stack[-1] if self._undo_stack else None
 
+    def move_history(self) -> list[StateMove]:
+        """Moves played on this state (and its copies) that can still be unmade, oldest first."""
+        return [
+            (u.fx, u.fy, u.tx, u.ty, abs(u.promotion)) if u.promotion else (u.fx, u.fy, u.tx, u.ty)
+            for u in self._undo_stack
+        ]
+
     def unmake_move(self) -> None:
         undo = self._undo_stack.pop()
+        self._history.pop()
 
         self.turn = undo.turn
+        if undo.turn == 1:
+            self.fullmove -= 1
         self.hash_ = undo.hash_
         self.castling = undo.castling
         self.wkx, self.wky = undo.wkx, undo.wky
         self.bkx, self.bky = undo.bkx, undo.bky
         self.halfmove = undo.halfmove
+        self.ep_file = undo.ep_file
 
         fx, fy, tx, ty = undo.fx, undo.fy, undo.tx, undo.ty
         moved = undo.moved_piece
@@ -621,7 +1014,15 @@ class BoardState:
             self.grid[fy, rook_to] = 0
 
         self.grid[fy, fx] = moved
-        self.grid[ty, tx] = undo.captured
+        if undo.en_passant:
+            self.grid[ty, tx] = 0
+            self.grid[fy, tx] = undo.captured
+        else:
+            self.grid[ty, tx] = undo.captured
+
+    def piece_count(self) -> int:
+        """Pieces on the board, kings included (one vectorised count, no Python loop)."""
+        return int(np.count_nonzero(self.grid))
 
     def insufficient_material(self) -> bool:
         counts: dict[int, int] = {}
@@ -653,7 +1054,7 @@ class BoardState:
                 if v == 0:
                     continue
                 sign = 1 if v > 0 else -1
-                moves: list[Move4] = []
+                moves: list[StateMove] = []
                 self._append_piece_moves(moves, x, y, sign)
                 counts[(x, y)] = len(moves)
         return counts
@@ -679,3 +1080,37 @@ class BoardState:
         if agent_color == 1:
             score = -score
         return float(score)
+
+
+_INITIAL_STATE = BoardState.from_fen(START_FEN)
+
+
+def perft(state: BoardState, depth: int) -> int:
+    """Count leaf nodes of the legal move tree; the standard move-generator check."""
+    if depth == 0:
+        return 1
+    moves = state.generate_legal_moves()
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        state.make_move(*move)
+        nodes += perft(state, depth - 1)
+        state.unmake_move()
+    return nodes
+
+
+def move_to_uci(move: StateMove) -> str:
+    """Long algebraic move text (``e2e4``, ``a7a8n``), as used by UCI."""
+    text = f"{chr(97 + move[0])}{8 - move[1]}{chr(97 + move[2])}{8 - move[3]}"
+    if len(move) == 5:
+        text += _FEN_LETTERS[-move[4]]
+    return text
+
+
+def move_from_uci(state: BoardState, text: str) -> StateMove:
+    """The legal move in ``state`` written as ``text`` (``e2e4``, ``e7e8q``)."""
+    for move in state.generate_legal_moves():
+        if move_to_uci(move) == text:
+            return move
+    raise ValueError(f"illegal move {text!r} in {state.to_fen()}")
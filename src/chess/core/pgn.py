@@ -0,0 +1,306 @@
+"""PGN game records: SAN moves, a streaming reader and a writer.
+
+``iter_games`` reads one game at a time from a path or text stream, so archives of any
+size are processed with memory bounded by the longest single game. Comments, NAGs and
+variations are skipped; the main line is replayed through ``BoardState.make_move``.
+"""
+
+from __future__ import annotations
+
+import dataclasses as dc
+import re
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import TextIO
+
+from chess.core.board_state import (
+    BISHOP,
+    KING,
+    KNIGHT,
+    PAWN,
+    QUEEN,
+    ROOK,
+    START_FEN,
+    BoardState,
+    StateMove,
+)
+
+RESULTS = ("1-0", "0-1", "1/2-1/2", "*")
+SEVEN_TAG_ROSTER = ("Event", "Site", "Date", "Round", "White", "Black", "Result")
+LINE_WIDTH = 79
+
+_PIECE_LETTERS = {KNIGHT: "N", BISHOP: "B", ROOK: "R", QUEEN: "Q", KING: "K"}
+_LETTER_PIECES = {letter: piece for piece, letter in _PIECE_LETTERS.items()}
+_TAG = re.compile(r'^\[(\w+)\s+"((?:[^"\\]|\\.)*)"\]\s*$')
+_SAN = re.compile(r"^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?$")
+_MOVE_NUMBER = re.compile(r"^\d+\.+")
+
+
+def _square(x: int, y: int) -> str:
+    return f"{chr(97 + x)}{8 - y}"
+
+
+@dc.dataclass
+class PgnGame:
+    """One game: tag pairs, main-line moves from ``start_fen`` and the result.
+
+    ``error`` is set when the movetext stopped replaying (``moves`` holds the legal
+    prefix); readers of large archives can skip such games instead of aborting.
+    """
+
+    headers: dict[str, str] = dc.field(default_factory=dict)
+    moves: list[StateMove] = dc.field(default_factory=list)
+    result: str = "*"
+    error: str | None = None
+
+    @property
+    def start_fen(self) -> str:
+        return self.headers.get("FEN", START_FEN)
+
+    def start_state(self) -> BoardState:
+        return BoardState.from_fen(self.start_fen)
+
+    def sans(self) -> list[str]:
+        state = self.start_state()
+        sans = []
+        for move in self.moves:
+            sans.append(move_to_san(state, move))
+            state.make_move(*move)
+        return sans
+
+    @classmethod
+    def from_state(
+        cls, state: BoardState, headers: dict[str, str] | None = None, result: str = "*"
+    ) -> PgnGame:
+        """The game played on ``state``: its move history from where the history starts."""
+        moves = state.move_history()
+        start = state.copy()
+        for _ in moves:
+            start.unmake_move()
+        game = cls(headers=dict(headers or {}), moves=moves, result=result)
+        if start.to_fen() != START_FEN:
+            game.headers.update(SetUp="1", FEN=start.to_fen())
+        return game
+
+
+def _legal_candidates(state: BoardState, piece: int, tx: int, ty: int) -> list[StateMove]:
+    side = state.turn
+    sign = 1 if side == 0 else -1
+    return [
+        move
+        for move in state.generate_pseudo_legal_moves()
+        if move[2] == tx
+        and move[3] == ty
+        and state.grid[move[1], move[0]] == sign * piece
+        and state._leaves_king_safe(move[0], move[1], move[2], move[3], side)
+    ]
+
+
+def move_to_san(state: BoardState, move: StateMove) -> str:
+    """Standard algebraic notation of the legal ``move`` in ``state`` (``Nbd7``, ``exd8=Q+``)."""
+    fx, fy, tx, ty = move[:4]
+    piece = abs(int(state.grid[fy, fx]))
+    if piece == KING and abs(tx - fx) == 2:
+        san = "O-O" if tx > fx else "O-O-O"
+    else:
+        capture = state.is_capture(move)
+        target = _square(tx, ty)
+        if piece == PAWN:
+            san = f"{chr(97 + fx)}x{target}" if capture else target
+            if len(move) == 5:
+                san += f"={_PIECE_LETTERS[move[4]]}"
+        else:
+            rivals = [m for m in _legal_candidates(state, piece, tx, ty) if m[:2] != (fx, fy)]
+            hint = ""
+            if rivals:
+                if all(m[0] != fx for m in rivals):
+                    hint = chr(97 + fx)
+                elif all(m[1] != fy for m in rivals):
+                    hint = str(8 - fy)
+                else:
+                    hint = _square(fx, fy)
+            san = f"{_PIECE_LETTERS[piece]}{hint}{'x' if capture else ''}{target}"
+    state.make_move(*move)
+    if state.in_check(state.turn):
+        san += "+" if state.has_legal_move() else "#"
+    state.unmake_move()
+    return san
+
+
+def parse_san(state: BoardState, text: str) -> StateMove:
+    """The legal move in ``state`` written as ``text`` in SAN; raises ``ValueError``."""
+    san = text.rstrip("+#!?")
+    if san in ("O-O", "0-0", "O-O-O", "0-0-0"):
+        kx, ky = state._king_pos(state.turn)
+        tx = kx + (2 if len(san) == 3 else -2)
+        candidates = [m for m in _legal_candidates(state, KING, tx, ky) if m[:2] == (kx, ky)]
+    else:
+        match = _SAN.match(san)
+        if match is None:
+            raise ValueError(f"bad SAN {text!r}")
+        letter, file, rank, target, promotion = match.groups()
+        piece = _LETTER_PIECES[letter] if letter else PAWN
+        tx, ty = ord(target[0]) - 97, 8 - int(target[1])
+        candidates = [
+            move
+            for move in _legal_candidates(state, piece, tx, ty)
+            if (file is None or move[0] == ord(file) - 97)
+            and (rank is None or move[1] == 8 - int(rank))
+            and (len(move) == 5) == (promotion is not None)
+            and (promotion is None or move[4] == _LETTER_PIECES[promotion])
+        ]
+    if len(candidates) != 1:
+        problem = "illegal" if not candidates else "ambiguous"
+        raise ValueError(f"{problem} SAN {text!r} in {state.to_fen()}")
+    return candidates[0]
+
+
+def _events(lines: Iterable[str]) -> Iterator[tuple[str, str, str]]:
+    """``("tag", name, value)``, ``("blank", "", "")`` and main-line ``("token", text, "")``.
+
+    Comment and variation state carries across lines, so a ``{...}`` spanning lines (even
+    one holding ``[...]``) is skipped whole; NAGs and move numbers are dropped.
+    """
+    comment = False
+    depth = 0
+    for line in lines:
+        if not comment:
+            stripped = line.strip()
+            if stripped.startswith("%"):
+                continue
+            if not stripped:
+                yield "blank", "", ""
+                continue
+            tag = _TAG.match(stripped) if stripped.startswith("[") else None
+            if tag is not None:
+                depth = 0
+                yield "tag", tag.group(1), _unescape(tag.group(2))
+                continue
+        index = 0
+        length = len(line)
+        while index < length:
+            if comment:
+                end = line.find("}", index)
+                if end < 0:
+                    break
+                comment = False
+                index = end + 1
+                continue
+            char = line[index]
+            if char == ";":
+                break
+            index += 1
+            if char == "{":
+                comment = True
+            elif char == "(":
+                depth += 1
+            elif char == ")":
+                depth = max(depth - 1, 0)
+            elif not char.isspace():
+                end = index
+                while end < length and not line[end].isspace() and line[end] not in "{;()":
+                    end += 1
+                token = _MOVE_NUMBER.sub("", line[index - 1 : end])
+                index = end
+                if not depth and token and not token.startswith("$"):
+                    yield "token", token, ""
+
+
+def _replay(headers: dict[str, str], tokens: list[str]) -> PgnGame:
+    game = PgnGame(headers=headers, result=headers.get("Result", "*"))
+    try:
+        state = game.start_state()
+    except ValueError as exc:
+        game.error = str(exc)
+        return game
+    for token in tokens:
+        if token in RESULTS:
+            game.result = token
+            break
+        try:
+            move = parse_san(state, token)
+        except ValueError as exc:
+            game.error = str(exc)
+            break
+        state.make_move(*move)
+        game.moves.append(move)
+    return game
+
+
+def iter_games(source: Path | str | TextIO) -> Iterator[PgnGame]:
+    """Stream games from a PGN path or open text file, one game in memory at a time.
+
+    A game ends at its result token, or where new tags follow its movetext or a header
+    block closed by a blank line (games without tags or without moves are both valid).
+    """
+    if isinstance(source, (str, Path)):
+        with Path(source).open(encoding="utf-8", errors="replace") as handle:
+            yield from iter_games(handle)
+        return
+    headers: dict[str, str] = {}
+    tokens: list[str] = []
+    closed = False
+    for kind, text, value in _events(source):
+        if kind == "blank":
+            closed = bool(headers)
+        elif kind == "tag":
+            if tokens or closed:
+                yield _replay(headers, tokens)
+                headers, tokens = {}, []
+            closed = False
+            headers[text] = value
+        else:
+            tokens.append(text)
+            if text in RESULTS:
+                yield _replay(headers, tokens)
+                headers, tokens, closed = {}, [], False
+    if headers or tokens:
+        yield _replay(headers, tokens)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _unescape(value: str) -> str:
+    return re.sub(r"\\(.)", r"\1", value)
+
+
+def format_game(game: PgnGame) -> str:
+    """PGN text for ``game``: the seven-tag roster first, movetext wrapped at 79 columns."""
+    headers = {tag: "?" for tag in SEVEN_TAG_ROSTER}
+    headers["Date"] = "????.??.??"
+    headers.update(game.headers)
+    headers["Result"] = game.result
+    lines = [f'[{tag} "{_escape(value)}"]' for tag, value in headers.items()]
+    lines.append("")
+
+    state = game.start_state()
+    tokens: list[str] = []
+    for index, move in enumerate(game.moves):
+        if state.turn == 0:
+            tokens.append(f"{state.fullmove}.")
+        elif index == 0:
+            tokens.append(f"{state.fullmove}...")
+        tokens.append(move_to_san(state, move))
+        state.make_move(*move)
+    tokens.append(game.result)
+
+    line = ""
+    for token in tokens:
+        if line and len(line) + 1 + len(token) > LINE_WIDTH:
+            lines.append(line)
+            line = token
+        else:
+            line = f"{line} {token}" if line else token
+    lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def write_games(handle: TextIO, games: Iterable[PgnGame]) -> int:
+    """Write games separated by blank lines; returns how many were written."""
+    count = 0
+    for game in games:
+        handle.write(format_game(game) + "\n")
+        count += 1
+    return count
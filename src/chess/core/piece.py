@@ -1,4 +1,6 @@
 import dataclasses as dc
+from collections.abc import Sequence
+from functools import cache
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -11,59 +13,98 @@ if TYPE_CHECKING:
 _ASSETS_DIR = ASSETS_DIR
 
 
-@dc.dataclass
 class Position:
+    """Immutable board coordinate; on-board squares are canonical, so equality is identity.
+
+    ``index`` is ``y * 8 + x`` (``-1`` off the board) and ``name`` the algebraic square.
+    """
+
+    __slots__ = ("x", "y", "index", "name", "_hash")
+
     x: int
     y: int
+    index: int
+    name: str
+
+    def __new__(cls, x: int, y: int) -> "Position":
+        if 0 <= x < 8 and 0 <= y < 8:
+            return SQUARES[y * 8 + x]
+        return cls._make(int(x), int(y))
 
-    def move(self, x, y):
-        self.x += x
-        self.y += y
+    @classmethod
+    def _make(cls, x: int, y: int) -> "Position":
+        position = object.__new__(cls)
+        on_board = 0 <= x < 8 and 0 <= y < 8
+        index = y * 8 + x if on_board else -1
+        # x represented by letters and y represented by numbers
+        for slot, value in (
+            ("x", x),
+            ("y", y),
+            ("index", index),
+            ("name", f"{chr(97 + x)}{8 - y}"),
+            ("_hash", index if on_board else hash((x, y))),
+        ):
+            object.__setattr__(position, slot, value)
+        return position
+
+    def __setattr__(self, name, value):
+        raise dc.FrozenInstanceError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name):
+        raise dc.FrozenInstanceError(f"cannot delete field {name!r}")
 
     def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, Position):
+            return NotImplemented
         return self.x == other.x and self.y == other.y
 
     def __hash__(self):
-        return hash((self.x, self.y))
+        return self._hash
 
     def __repr__(self):
-        # x represented by letters and y represented by numbers
-        return f"{chr(97 + self.x)}{8 - self.y}"
+        return self.name
+
+    def __reduce__(self):
+        return (Position, (self.x, self.y))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     @classmethod
     def from_repr(cls, repr):
         return Position(ord(repr[0]) - 97, 8 - int(repr[1]))
 
 
-# a decorator for cleaning legal moves
-def update_attacking_squares(func):
-    def wrapper(*args, **kwargs):
-        piece = args[0]
-        result = func(*args, **kwargs)  # Call the original function and store its result
-        piece.attacking_squares = [pos for pos in piece.legal_moves if isinstance(pos, Position)]
-        return result  # Return the result of the original function call
+# The 64 canonical squares, indexed ``y * 8 + x``.
+SQUARES = tuple(Position._make(index % 8, index // 8) for index in range(64))
+
 
-    return wrapper
+@cache
+def piece_icon_path(piece_type: PieceType, color: Color) -> Path:
+    return _ASSETS_DIR / f"{piece_type.name.lower()}_{color.name.lower()}.png"
 
 
-@dc.dataclass
+@dc.dataclass(slots=True)
 class Piece:
     color: Color = Color.WHITE
     piece_type: PieceType = PieceType.UNDEFINED
     position: Position = Position(4, 4)
     name: str = "Piece"
-    icon_path: Path = Path.cwd()
     moved: int = 0
     created: bool = False
-    legal_moves: list = dc.field(default_factory=list)
-    attacking_squares: list = dc.field(default_factory=list)
+    legal_moves: Sequence[Position] = ()
+    attacking_squares: Sequence[Position] = ()
     max_n_legal_moves: int = 0
     value: int = 0
 
-    def __post_init__(self):
-        self.icon_path = (
-            _ASSETS_DIR / f"{self.piece_type.name.lower()}_{self.color.name.lower()}.png"
-        )
+    @property
+    def icon_path(self) -> Path:
+        return piece_icon_path(self.piece_type, self.color)
 
     def __str__(self):
         return f"{self.color.name} {self.piece_type.name} at {self.position}"
@@ -78,9 +119,10 @@ class Piece:
             return [MoveState.CAPTURED, MoveState.MOVED]
         return [MoveState.NOTALLOWED]
 
-    @update_attacking_squares
     def update_legal_moves(self, board: "Board"):
-        pass
+        """Refresh ``legal_moves`` from the board's cached ``BoardState`` move list."""
+        self.legal_moves = board.legal_targets(self)
+        self.attacking_squares = self.legal_moves
 
     def move(self, new_position, board: "Board"):
         if self.created is False:
@@ -96,364 +138,102 @@ class Piece:
         return legality
 
 
-@dc.dataclass
+@dc.dataclass(slots=True)
 class NullPiece(Piece):
+    """Empty square; share ``EMPTY_SQUARE`` rather than creating new instances."""
+
     piece_type: PieceType = PieceType.UNDEFINED
     value: int = 0
     max_n_legal_moves: int = 0
     color: Color = Color.UNDEFINED
+    _sealed: bool = dc.field(default=False, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "_sealed", True)
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_sealed", False):
+            raise dc.FrozenInstanceError(f"cannot assign to field {name!r} of an empty square")
+        object.__setattr__(self, name, value)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return "EMPTY_SQUARE"
 
     def update_legal_moves(self, board: "Board"):
-        self.legal_moves = []
-        self.attacking_squares = []
+        pass
 
 
-@dc.dataclass
+@dc.dataclass(slots=True)
 class OffBoard(NullPiece):
     piece_type: PieceType = PieceType.UNDEFINED
     value: int = 0
     max_n_legal_moves: int = 0
 
-    def update_legal_moves(self, board: "Board"):
-        self.legal_moves = []
-        self.attacking_squares = []
+    def __reduce__(self):
+        return "OFF_BOARD"
+
 
+EMPTY_SQUARE = NullPiece()
+OFF_BOARD = OffBoard()
 
-@dc.dataclass
+
+@dc.dataclass(slots=True)
 class Pawn(Piece):
     piece_type: PieceType = PieceType.PAWN
     value: int = 1
     max_n_legal_moves: int = 4
 
-    def _is_legal_move(self, new_position, board: "Board"):
-        direction = -1 if self.color == Color.WHITE else 1
-        capture_condition = (
-            board.get(new_position).color != self.color
-            and abs(new_position.x - self.position.x) == 1
-            and new_position.y - self.position.y == direction
-        )
-        if new_position in self.legal_moves:
-            if not isinstance(board.get(new_position), NullPiece):
-                if capture_condition:
-                    return [MoveState.CAPTURED, MoveState.MOVED]
-                else:
-                    return [MoveState.NOTALLOWED]
-            elif new_position.x == self.position.x:
-                return [MoveState.MOVED]
-        return [MoveState.NOTALLOWED]
-
     def update_legal_moves(self, board: "Board"):
-        moves = []
-        attacking_squares = []
-        direction = -1 if self.color == Color.WHITE else 1
-        if isinstance(board.get(Position(self.position.x, self.position.y + direction)), NullPiece):
-            moves.append(Position(self.position.x, self.position.y + direction))
-            if self.moved == 0 and isinstance(
-                board.get(Position(self.position.x, self.position.y + 2 * direction)),
-                NullPiece,
-            ):
-                moves.append(Position(self.position.x, self.position.y + 2 * direction))
-
-        for i in [1, -1]:
-            if not isinstance(
-                board.get(Position(self.position.x - i, self.position.y + direction)),
-                NullPiece,
-            ) and (
-                board.get(Position(self.position.x - i, self.position.y + direction)).color
-                != self.color
-            ):
-                moves.append(Position(self.position.x - i, self.position.y + direction))
-            attacking_squares.append(Position(self.position.x - i, self.position.y + direction))
-
-        self.legal_moves = [move for move in moves if not isinstance(board.get(move), OffBoard)]
-
-        self.attacking_squares = attacking_squares
-
-
-@dc.dataclass
+        """Pawns attack their forward diagonals, whether or not a capture is there."""
+        Piece.update_legal_moves(self, board)
+        forward = self.position.y + (-1 if self.color == Color.WHITE else 1)
+        self.attacking_squares = [
+            Position(x, forward)
+            for x in (self.position.x - 1, self.position.x + 1)
+            if 0 <= x < 8 and 0 <= forward < 8
+        ]
+
+
+@dc.dataclass(slots=True)
 class Rook(Piece):
     piece_type: PieceType = PieceType.ROOK
     value: int = 5
     max_n_legal_moves: int = 14
 
-    @update_attacking_squares
-    def update_legal_moves(self, board: "Board"):
-        moves = []
-
-        def check_displacement(x_dis, y_dis):
-            new_position = Position(self.position.x + x_dis, self.position.y + y_dis)
-            if (
-                new_position.x < 8
-                and new_position.x >= 0
-                and new_position.y < 8
-                and new_position.y >= 0
-            ):
-                if isinstance(board.get(new_position), NullPiece):
-                    moves.append(new_position)
-                    return False
-                else:
-                    if board.get(new_position).color != self.color:
-                        moves.append(new_position)
-                        return True
-
-            return True
 
-        for x_dis in range(1, 8):
-            if check_displacement(x_dis, 0):
-                break
-        for x_dis in range(-1, -8, -1):
-            if check_displacement(x_dis, 0):
-                break
-        for y_dis in range(1, 8):
-            if check_displacement(0, y_dis):
-                break
-        for y_dis in range(-1, -8, -1):
-            if check_displacement(0, y_dis):
-                break
-        self.legal_moves = [move for move in moves if not isinstance(board.get(move), OffBoard)]
-
-
-@dc.dataclass
+@dc.dataclass(slots=True)
 class Bishop(Piece):
     piece_type: PieceType = PieceType.BISHOP
     value: int = 3
     max_n_legal_moves: int = 13
 
-    @update_attacking_squares
-    def update_legal_moves(self, board: "Board"):
-        moves = []
-        for i in range(1, 8):
-            if self.position.x + i < 8 and self.position.y + i < 8:
-                if isinstance(
-                    board.get(Position(self.position.x + i, self.position.y + i)),
-                    NullPiece,
-                ):
-                    moves.append(Position(self.position.x + i, self.position.y + i))
-                else:
-                    if (
-                        board.get(Position(self.position.x + i, self.position.y + i)).color
-                        != self.color
-                    ):
-                        moves.append(Position(self.position.x + i, self.position.y + i))
-                    break
-        for i in range(1, 8):
-            if self.position.x - i >= 0 and self.position.y - i >= 0:
-                if isinstance(
-                    board.get(Position(self.position.x - i, self.position.y - i)),
-                    NullPiece,
-                ):
-                    moves.append(Position(self.position.x - i, self.position.y - i))
-                else:
-                    if (
-                        board.get(Position(self.position.x - i, self.position.y - i)).color
-                        != self.color
-                    ):
-                        moves.append(Position(self.position.x - i, self.position.y - i))
-                    break
-        for i in range(1, 8):
-            if self.position.x + i < 8 and self.position.y - i >= 0:
-                if isinstance(
-                    board.get(Position(self.position.x + i, self.position.y - i)),
-                    NullPiece,
-                ):
-                    moves.append(Position(self.position.x + i, self.position.y - i))
-                else:
-                    if (
-                        board.get(Position(self.position.x + i, self.position.y - i)).color
-                        != self.color
-                    ):
-                        moves.append(Position(self.position.x + i, self.position.y - i))
-                    break
-        for i in range(1, 8):
-            if self.position.x - i >= 0 and self.position.y + i < 8:
-                if isinstance(
-                    board.get(Position(self.position.x - i, self.position.y + i)),
-                    NullPiece,
-                ):
-                    moves.append(Position(self.position.x - i, self.position.y + i))
-                else:
-                    if (
-                        board.get(Position(self.position.x - i, self.position.y + i)).color
-                        != self.color
-                    ):
-                        moves.append(Position(self.position.x - i, self.position.y + i))
-                    break
-        self.legal_moves = [move for move in moves if not isinstance(board.get(move), OffBoard)]
-
 
-@dc.dataclass
+@dc.dataclass(slots=True)
 class Knight(Piece):
     piece_type: PieceType = PieceType.KNIGHT
     value: int = 3
     max_n_legal_moves: int = 8
 
-    @update_attacking_squares
-    def update_legal_moves(self, board: "Board"):
-        moves = []
-        for dx, dy in [
-            (2, 1),
-            (2, -1),
-            (-2, 1),
-            (-2, -1),
-            (1, 2),
-            (1, -2),
-            (-1, 2),
-            (-1, -2),
-        ]:
-            new_position = Position(self.position.x + dx, self.position.y + dy)
-            if isinstance(board.get(new_position), NullPiece):
-                moves.append(new_position)
-            else:
-                if (
-                    isinstance(board.get(new_position), Piece)
-                    and board.get(new_position).color != self.color
-                ):
-                    moves.append(new_position)
-        self.legal_moves = [move for move in moves if not isinstance(board.get(move), OffBoard)]
-
-
-@dc.dataclass
+
+@dc.dataclass(slots=True)
 class Queen(Piece):
     piece_type: PieceType = PieceType.QUEEN
     value: int = 9
     max_n_legal_moves: int = 27
 
-    @update_attacking_squares
-    def update_legal_moves(self, board: "Board"):
-        moves = []
-        for i in range(1, 8):
-            if self.position.y + i < 8:
-                if isinstance(board.get(Position(self.position.x, self.position.y + i)), NullPiece):
-                    moves.append(Position(self.position.x, self.position.y + i))
-                else:
-                    if (
-                        board.get(Position(self.position.x, self.position.y + i)).color
-                        != self.color
-                    ):
-                        moves.append(Position(self.position.x, self.position.y + i))
-                    break
-        for i in range(1, 8):
-            if self.position.y - i >= 0:
-                if isinstance(board.get(Position(self.position.x, self.position.y - i)), NullPiece):
-                    moves.append(Position(self.position.x, self.position.y - i))
-                else:
-                    if (
-                        board.get(Position(self.position.x, self.position.y - i)).color
-                        != self.color
-                    ):
-                        moves.append(Position(self.position.x, self.position.y - i))
-                    break
-        for i in range(1, 8):
-            if self.position.x + i < 8:
-                if isinstance(board.get(Position(self.position.x + i, self.position.y)), NullPiece):
-                    moves.append(Position(self.position.x + i, self.position.y))
-                else:
-                    if (
-                        board.get(Position(self.position.x + i, self.position.y)).color
-                        != self.color
-                    ):
-                        moves.append(Position(self.position.x + i, self.position.y))
-                    break
-        for i in range(1, 8):
-            if self.position.x - i >= 0:
-                if isinstance(board.get(Position(self.position.x - i, self.position.y)), NullPiece):
-                    moves.append(Position(self.position.x - i, self.position.y))
-                else:
-                    if (
-                        board.get(Position(self.position.x - i, self.position.y)).color
-                        != self.color
-                    ):
-                        moves.append(Position(self.position.x - i, self.position.y))
-                    break
-        for i in range(1, 8):
-            if self.position.x + i < 8 and self.position.y + i < 8:
-                if isinstance(
-                    board.get(Position(self.position.x + i, self.position.y + i)),
-                    NullPiece,
-                ):
-                    moves.append(Position(self.position.x + i, self.position.y + i))
-                else:
-                    if (
-                        board.get(Position(self.position.x + i, self.position.y + i)).color
-                        != self.color
-                    ):
-                        moves.append(Position(self.position.x + i, self.position.y + i))
-                    break
-        for i in range(1, 8):
-            if self.position.x - i >= 0 and self.position.y - i >= 0:
-                if isinstance(
-                    board.get(Position(self.position.x - i, self.position.y - i)),
-                    NullPiece,
-                ):
-                    moves.append(Position(self.position.x - i, self.position.y - i))
-                else:
-                    if (
-                        board.get(Position(self.position.x - i, self.position.y - i)).color
-                        != self.color
-                    ):
-                        moves.append(Position(self.position.x - i, self.position.y - i))
-                    break
-        for i in range(1, 8):
-            if self.position.x + i < 8 and self.position.y - i >= 0:
-                if isinstance(
-                    board.get(Position(self.position.x + i, self.position.y - i)),
-                    NullPiece,
-                ):
-                    moves.append(Position(self.position.x + i, self.position.y - i))
-                else:
-                    if (
-                        board.get(Position(self.position.x + i, self.position.y - i)).color
-                        != self.color
-                    ):
-                        moves.append(Position(self.position.x + i, self.position.y - i))
-                    break
-        for i in range(1, 8):
-            if self.position.x - i >= 0 and self.position.y + i < 8:
-                if isinstance(
-                    board.get(Position(self.position.x - i, self.position.y + i)),
-                    NullPiece,
-                ):
-                    moves.append(Position(self.position.x - i, self.position.y + i))
-                else:
-                    if (
-                        board.get(Position(self.position.x - i, self.position.y + i)).color
-                        != self.color
-                    ):
-                        moves.append(Position(self.position.x - i, self.position.y + i))
-                    break
-        self.legal_moves = [move for move in moves if not isinstance(board.get(move), OffBoard)]
-
 
-@dc.dataclass
+@dc.dataclass(slots=True)
 class King(Piece):
     piece_type: PieceType = PieceType.KING
     value: int = 100
     max_n_legal_moves: int = 8
 
-    @update_attacking_squares
-    def update_legal_moves(self, board: "Board"):
-        moves = []
-        for dx, dy in [
-            (1, 0),
-            (1, 1),
-            (0, 1),
-            (-1, 1),
-            (-1, 0),
-            (-1, -1),
-            (0, -1),
-            (1, -1),
-        ]:
-            new_position = Position(self.position.x + dx, self.position.y + dy)
-            if isinstance(board.get(new_position), NullPiece):
-                moves.append(new_position)
-            else:
-                if (
-                    isinstance(board.get(new_position), Piece)
-                    and board.get(new_position).color != self.color
-                ):
-                    moves.append(new_position)
-        self.legal_moves = [move for move in moves if not isinstance(board.get(move), OffBoard)]
-
 
 STARTING_PIECES = [
     Rook(color=Color.BLACK, position=Position(0, 0)),
@@ -4,17 +4,25 @@ from __future__ import annotations
 
 import random
 
-from chess.core.types import Color, PieceType
-
 random.seed(0xC055000)
 
-_PIECE_TYPES = len(PieceType)
+# Piece keys are flat and indexed by square and signed grid value (see ``piece_key_index``);
+# the slots for value 0 hold 0 so clearing or filling an empty square is a no-op.
+PIECE_VALUES_PER_SQUARE = 13
 
 ZOBRIST_TURN = random.getrandbits(64)
-ZOBRIST_PIECES: list[list[list[int]]] = [
-    [[random.getrandbits(64) for _ in range(_PIECE_TYPES)] for _ in Color] for _ in range(64)
+ZOBRIST_PIECES: list[int] = [
+    random.getrandbits(64) if value else 0 for _ in range(64) for value in range(-6, 7)
 ]
+# One key per castling-rights bitmask (WK=1, WQ=2, BK=4, BQ=8); no rights hash to 0.
+ZOBRIST_CASTLING: list[int] = [0] + [random.getrandbits(64) for _ in range(15)]
+ZOBRIST_EP: list[int] = [random.getrandbits(64) for _ in range(8)]
 
 
 def square_index(x: int, y: int) -> int:
     return y * 8 + x
+
+
+def piece_key_index(x: int, y: int, value: int) -> int:
+    """Index into ``ZOBRIST_PIECES`` for signed grid ``value`` (-6..6) on ``(x, y)``."""
+    return (y * 8 + x) * PIECE_VALUES_PER_SQUARE + value + 6
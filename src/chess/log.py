@@ -25,14 +25,16 @@ _console = Console()
 _configured = False
 
 
-def setup_logging(level: str = "INFO", show_path: bool = False) -> None:
+def setup_logging(level: str = "INFO", show_path: bool = False, stderr: bool = False) -> None:
+    """Route logging through rich; ``stderr`` keeps stdout free for protocol output."""
     global _configured
     numeric = getattr(logging, level.upper(), logging.INFO)
+    console = Console(stderr=True) if stderr else _console
     logging.basicConfig(
         level=numeric,
         format="%(message)s",
         datefmt="[%X]",
-        handlers=[RichHandler(console=_console, show_path=show_path, markup=True)],
+        handlers=[RichHandler(console=console, show_path=show_path, markup=True)],
         force=True,
     )
     for name in ("urllib3", "PIL"):
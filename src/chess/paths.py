@@ -6,5 +6,8 @@ ROOT_DIR = Path(__file__).resolve().parents[2]
 ASSETS_DIR = ROOT_DIR / "assets"
 ARTIFACTS_DIR = ROOT_DIR / "artifacts"
 RUNS_DIR = ARTIFACTS_DIR / "runs"
+DEFAULT_BOOK = ARTIFACTS_DIR / "book.bin"
+TABLEBASE_DIR = ARTIFACTS_DIR / "tablebases"
 CONFIGS_DIR = ROOT_DIR / "configs"
+BENCHMARKS_DIR = ROOT_DIR / "benchmarks"
 DEFAULT_CONFIG = CONFIGS_DIR / "default.yaml"
@@ -0,0 +1,279 @@
+"""UCI protocol front-end: drives ``MinMaxAgent`` over stdin/stdout."""
+
+from __future__ import annotations
+
+import dataclasses as dc
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable
+
+from chess import __version__
+from chess.ai.book import open_book
+from chess.ai.minmax import MinMaxAgent, shutdown_search_pool
+from chess.ai.profiling import make_profiler
+from chess.ai.tablebase import Tablebase
+from chess.config import AppSettings
+from chess.core.board_state import (
+    MATE_SCORE,
+    START_FEN,
+    BoardState,
+    StateMove,
+    move_from_uci,
+    move_to_uci,
+)
+from chess.core.types import Color
+from chess.log import get_logger
+
+ENGINE_NAME = f"chess-minimax {__version__}"
+DEFAULT_HASH_MB = 64
+MAX_HASH_MB = 4096
+MAX_THREADS = 32
+# Rough heap cost of one transposition-table entry (ordered-dict slot, key, ``TTEntry``).
+TT_ENTRY_BYTES = 256
+MAX_DEPTH = 64
+MOVE_OVERHEAD_MS = 30
+
+logger = get_logger(__name__)
+
+
+@dc.dataclass
+class GoLimits:
+    """Parsed ``go`` arguments; times are in milliseconds."""
+
+    depth: int | None = None
+    movetime: int | None = None
+    wtime: int | None = None
+    btime: int | None = None
+    winc: int = 0
+    binc: int = 0
+    movestogo: int | None = None
+    infinite: bool = False
+
+    @classmethod
+    def parse(cls, tokens: list[str]) -> GoLimits:
+        limits = cls()
+        fields = {field.name for field in dc.fields(cls)} - {"infinite"}
+        index = 0
+        while index < len(tokens):
+            name = tokens[index]
+            if name == "infinite":
+                limits.infinite = True
+            elif name in fields and index + 1 < len(tokens):
+                setattr(limits, name, int(tokens[index + 1]))
+                index += 1
+            index += 1
+        return limits
+
+    def budget_ms(self, turn: int) -> float | None:
+        """Time to spend on this move, or ``None`` when the search is not time-limited."""
+        if self.infinite:
+            return None
+        if self.movetime is not None:
+            return max(self.movetime - MOVE_OVERHEAD_MS, 1)
+        remaining = self.wtime if turn == 0 else self.btime
+        if remaining is None:
+            return None
+        increment = self.winc if turn == 0 else self.binc
+        budget = remaining / (self.movestogo or 30) + increment * 3 / 4
+        return max(min(budget, remaining - MOVE_OVERHEAD_MS), 1)
+
+
+def format_score(value: float) -> str:
+    """UCI ``score`` field from the side to move's point of view.
+
+    Mate values are ``MATE_SCORE`` minus the plies to mate, so the distance is exact even
+    when the reported PV is cut short.
+    """
+    if abs(value) >= MATE_SCORE / 2:
+        moves = (round(MATE_SCORE - abs(value)) + 1) // 2
+        return f"mate {moves if value > 0 else -moves}"
+    return f"cp {round(value * 100)}"
+
+
+class UciEngine:
+    """One UCI session; ``handle`` takes a command line and returns ``False`` on ``quit``."""
+
+    def __init__(self, settings: AppSettings, write: Callable[[str], None] | None = None) -> None:
+        self.settings = settings
+        self.hash_mb = DEFAULT_HASH_MB
+        self.threads = 1
+        self.state = BoardState.initial()
+        self._write_line = write or _print_line
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._search: threading.Thread | None = None
+        self._infinite = False
+        self._book = open_book(settings.ai.book)
+        self._tablebase = Tablebase(settings.ai.tablebases) if settings.ai.tablebases else None
+        self._agents = self._new_agents()
+
+    def _new_agents(self) -> dict[int, MinMaxAgent]:
+        # Search values are relative to ``agent.color``, so each side keeps its own TT.
+        tt_size = max(1, self.hash_mb * (1 << 20) // TT_ENTRY_BYTES // 2)
+        profiler = make_profiler(self.settings.ai.profile, self.settings.ai.profile_dir)
+        return {
+            turn: MinMaxAgent(
+                color=color,
+                depth=self.settings.ai.depth,
+                workers=self.threads,
+                tt_size=tt_size,
+                book=self._book,
+                tablebase=self._tablebase,
+                profiler=profiler,
+            )
+            for turn, color in ((0, Color.WHITE), (1, Color.BLACK))
+        }
+
+    def write(self, line: str) -> None:
+        with self._write_lock:
+            self._write_line(line)
+
+    def handle(self, line: str) -> bool:
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+        if command == "uci":
+            self.write(f"id name {ENGINE_NAME}")
+            self.write("id author chess contributors")
+            self.write(
+                f"option name Hash type spin default {DEFAULT_HASH_MB} min 1 max {MAX_HASH_MB}"
+            )
+            self.write(f"option name Threads type spin default 1 min 1 max {MAX_THREADS}")
+            self.write("uciok")
+        elif command == "isready":
+            self.write("readyok")
+        elif command == "ucinewgame":
+            self.stop()
+            self.state = BoardState.initial()
+            self._agents = self._new_agents()
+        elif command == "setoption":
+            self.stop()
+            self._set_option(args)
+        elif command == "position":
+            self.stop()
+            self._set_position(args)
+        elif command == "go":
+            self.stop()
+            try:
+                limits = GoLimits.parse(args)
+            except ValueError:
+                logger.warning("Ignoring malformed go command: %s", " ".join(args))
+                return True
+            self._go(limits)
+        elif command == "stop":
+            self.stop()
+        elif command == "quit":
+            self.stop()
+            return False
+        else:
+            logger.debug("Ignoring UCI command %r", line.strip())
+        return True
+
+    def stop(self) -> None:
+        """Interrupt a running search and wait for its ``bestmove``."""
+        if self._search is not None:
+            self._stop.set()
+            self._search.join()
+            self._search = None
+
+    def wait(self) -> None:
+        """Let a bounded search finish and answer (end of input); an infinite one is stopped."""
+        if self._search is not None and not self._infinite:
+            self._search.join()
+        self.stop()
+
+    def _set_option(self, args: list[str]) -> None:
+        if "name" not in args:
+            return
+        name_end = args.index("value") if "value" in args else len(args)
+        name = " ".join(args[args.index("name") + 1 : name_end]).lower()
+        value = " ".join(args[name_end + 1 :])
+        try:
+            if name == "hash":
+                self.hash_mb = min(max(int(value), 1), MAX_HASH_MB)
+            elif name == "threads":
+                self.threads = min(max(int(value), 1), MAX_THREADS)
+            else:
+                logger.debug("Ignoring unknown UCI option %r", name)
+                return
+        except ValueError:
+            logger.warning("Bad value for UCI option %s: %r", name, value)
+            return
+        self._agents = self._new_agents()
+
+    def _set_position(self, args: list[str]) -> None:
+        moves_at = args.index("moves") if "moves" in args else len(args)
+        if args[:1] == ["startpos"]:
+            fen = START_FEN
+        elif args[:1] == ["fen"]:
+            fen = " ".join(args[1:moves_at])
+        else:
+            logger.warning("Ignoring malformed position command: %s", " ".join(args))
+            return
+        try:
+            state = BoardState.from_fen(fen)
+            for text in args[moves_at + 1 :]:
+                state.make_move(*move_from_uci(state, text))
+        except ValueError as exc:
+            logger.warning("Ignoring position: %s", exc)
+            return
+        self.state = state
+
+    def _go(self, limits: GoLimits) -> None:
+        self._stop.clear()
+        self._infinite = limits.infinite
+        self._search = threading.Thread(
+            target=self._think, args=(self.state.copy(), limits), name="uci-search", daemon=True
+        )
+        self._search.start()
+
+    def _think(self, state: BoardState, limits: GoLimits) -> None:
+        agent = self._agents[state.turn]
+        start = time.perf_counter()
+        budget = limits.budget_ms(state.turn)
+        deadline = None if budget is None else start + budget / 1000
+        if limits.depth is not None:
+            max_depth = limits.depth
+        elif budget is not None or limits.infinite:
+            max_depth = MAX_DEPTH
+        else:
+            max_depth = agent.depth
+
+        def should_stop() -> bool:
+            return self._stop.is_set() or (deadline is not None and time.perf_counter() >= deadline)
+
+        def report(depth: int, value: float, pv: list[StateMove]) -> None:
+            elapsed = max(time.perf_counter() - start, 1e-6)
+            stats = agent.stats
+            nodes = stats.nodes + stats.qnodes
+            self.write(
+                f"info depth {depth} seldepth {stats.max_ply} score {format_score(value)} "
+                f"nodes {nodes} nps {int(nodes / elapsed)} time {int(elapsed * 1000)} "
+                f"pv {' '.join(move_to_uci(move) for move in pv)}"
+            )
+
+        move = agent.iterate(state, max_depth, should_stop=should_stop, on_iteration=report)
+        if limits.infinite:
+            # ``go infinite`` must not answer before ``stop`` even if the search finished.
+            self._stop.wait()
+        self.write(f"bestmove {move_to_uci(move) if move is not None else '0000'}")
+
+
+def _print_line(line: str) -> None:
+    print(line, flush=True)
+
+
+def run_uci(settings: AppSettings, lines: Iterable[str] | None = None) -> None:
+    """Serve UCI on stdin/stdout until ``quit`` or end of input."""
+    engine = UciEngine(settings)
+    try:
+        for line in lines if lines is not None else sys.stdin:
+            if not engine.handle(line):
+                break
+        else:
+            engine.wait()
+    finally:
+        engine.stop()
+        shutdown_search_pool()
@@ -4,9 +4,8 @@ from __future__ import annotations
 
 import pygame
 
-from chess.core.piece import Piece
+from chess.core.piece import Piece, piece_icon_path
 from chess.core.types import Color, PieceType
-from chess.paths import ASSETS_DIR
 
 _BASE_CACHE: dict[tuple[PieceType, Color], pygame.Surface] = {}
 _SCALED_CACHE: dict[tuple[PieceType, Color, int], pygame.Surface] = {}
@@ -18,7 +17,7 @@ def _load_base(piece_type: PieceType, color: Color) -> pygame.Surface:
     if cached is not None:
         return cached
 
-    path = ASSETS_DIR / f"{piece_type.name.lower()}_{color.name.lower()}.png"
+    path = piece_icon_path(piece_type, color)
     if not path.exists():
         raise FileNotFoundError(f"Missing piece asset: {path}")
 
@@ -6,7 +6,7 @@ from typing import TYPE_CHECKING
 
 import pygame
 
-from chess.core.piece import NullPiece, Position
+from chess.core.piece import NullPiece
 from chess.core.types import DIM_X, DIM_Y, Color, Ending
 from chess.layout import (
     BOARD_INSET,
@@ -140,19 +140,16 @@ def _draw_game_over_banner(
 
 
 def _draw_pieces(surface: pygame.Surface, board: Board, square_size: int) -> None:
-    for y in range(DIM_Y):
-        for x in range(DIM_X):
-            position = Position(x, y)
-            piece = board.board[position]
-            if isinstance(piece, NullPiece) or piece == board.dragged_piece:
-                continue
-            draw_piece(
-                surface,
-                piece,
-                BOARD_INSET + x * square_size,
-                BOARD_INSET + y * square_size,
-                square_size,
-            )
+    for position, piece in board.board.items():
+        if isinstance(piece, NullPiece) or piece is board.dragged_piece:
+            continue
+        draw_piece(
+            surface,
+            piece,
+            BOARD_INSET + position.x * square_size,
+            BOARD_INSET + position.y * square_size,
+            square_size,
+        )
 
     if board.dragged_piece is None:
         return
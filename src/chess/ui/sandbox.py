@@ -2,14 +2,11 @@
 
 from __future__ import annotations
 
-from copy import deepcopy
-
 import pygame
 
 from chess.config import AppSettings
 from chess.core.board import Board
 from chess.core.piece import (
-    STARTING_PIECES,
     Bishop,
     Color,
     King,
@@ -69,8 +66,7 @@ def run_sandbox(settings: AppSettings) -> None:
     pygame.display.set_caption("Chess — sandbox")
     screen = pygame.display.set_mode((display.sandbox_width, display.sandbox_height))
 
-    board = Board.from_pieces(deepcopy(STARTING_PIECES))
-    board.update()
+    board = Board.new_game()
 
     square_size = display.square_size
     new_piece_color = Color.WHITE
@@ -2,23 +2,30 @@
 
 from __future__ import annotations
 
+import itertools
+import multiprocessing
+import time
 from concurrent.futures import Future, ProcessPoolExecutor
-from copy import deepcopy
 
 import pygame
 
+from chess.ai.book import open_book
 from chess.ai.minmax import (
     MinMaxAgent,
     Move,
+    SearchStats,
     _choose_move_serial,
     _order_moves,
+    _ponder_move,
     _score_root_move,
+    init_ponder_worker,
     shutdown_search_pool,
 )
+from chess.ai.tablebase import Tablebase
 from chess.config import AppSettings
 from chess.core.board import Board
-from chess.core.board_state import BoardState, Move4
-from chess.core.piece import STARTING_PIECES
+from chess.core.board_state import BoardState, StateMove
+from chess.core.pgn import PgnGame, format_game
 from chess.core.types import Color, Ending
 from chess.layout import vs_ai_window_size
 from chess.log import get_logger
@@ -27,17 +34,37 @@ from chess.ui.scene import blit_scene, render_vs_ai_scene
 logger = get_logger(__name__)
 
 
+def _predict_replies(state: BoardState, count: int) -> list[StateMove]:
+    """Most likely replies for the side to move, by search move ordering (no evaluation)."""
+    return _order_moves(state, state.generate_legal_moves())[:count]
+
+
 class _BackgroundAi:
-    """Runs minimax in a persistent process pool (one future per root move)."""
+    """Runs minimax in a persistent process pool (one future per root move).
+
+    While the human is to move, :meth:`ponder` searches the AI's answer to the most likely
+    replies on the same pool and agent lineage, filling the workers' TTs; when the human
+    plays one of them, :meth:`request_move` adopts that search. The others are aborted
+    through a shared value their workers poll every ``ABORT_CHECK_INTERVAL`` nodes.
+    """
 
     def __init__(self, workers: int) -> None:
         pool_size = MinMaxAgent.resolve_pool_workers(workers)
-        self._executor = ProcessPoolExecutor(max_workers=pool_size)
+        self._ponder_live = multiprocessing.Value("q", 0, lock=False)
+        self._executor = ProcessPoolExecutor(
+            max_workers=pool_size, initializer=init_ponder_worker, initargs=(self._ponder_live,)
+        )
         self._workers = workers
         self._pool_size = pool_size
         self._futures: list[Future] = []
-        self._instant_move: Move4 | None = None
+        self._instant_move: StateMove | None = None
         self._parallel = False
+        self._ponder_ids = itertools.count(1)
+        self._ponder: dict[int, tuple[int, Future]] = {}
+        self._ponder_root: int | None = None
+        self.ponder_hits = 0
+        self.last_stats: SearchStats | None = None
+        self._requested_at = 0.0
 
     @property
     def pool_size(self) -> int:
@@ -51,21 +78,63 @@ class _BackgroundAi:
             return False
         return not all(f.done() for f in self._futures)
 
+    def ponder(self, board: Board, agent: MinMaxAgent, replies: int) -> None:
+        """Start searching the AI reply to the ``replies`` likeliest moves of the human."""
+        root = board.state.hash_key()
+        if replies <= 0 or self._ponder_root == root:
+            return
+        self._cancel_ponder()
+        self._ponder_root = root
+        batch = next(self._ponder_ids)
+        self._ponder_live.value = batch
+        state = BoardState.from_search_state(board.to_search_state())
+        for move in _predict_replies(state, replies):
+            state.make_move(*move)
+            payload = agent.search_payload(state.to_search_state())
+            ticket = next(self._ponder_ids)
+            future = self._executor.submit(_ponder_move, payload, batch, ticket)
+            self._ponder[state.hash_key()] = (ticket, future)
+            state.unmake_move()
+
+    def _cancel_ponder(self, keep: int = 0) -> None:
+        """Abort every ponder search but the one holding ticket ``keep``."""
+        self._ponder_live.value = -keep
+        for _, future in self._ponder.values():
+            future.cancel()
+        self._ponder = {}
+        self._ponder_root = None
+
     def request_move(self, board: Board, agent: MinMaxAgent) -> None:
         if self.thinking or self._instant_move is not None:
             return
         self._futures = []
         self._parallel = False
+        self._requested_at = time.perf_counter()
 
+        hit = self._ponder.pop(board.state.hash_key(), None)
         state_tuple = board.to_search_state()
         moves = board.state.generate_legal_moves()
+        known = agent.lookup_move(board.state) if moves else None
+        if hit is not None and known is None and len(moves) > 1:
+            ticket, future = hit
+            self._cancel_ponder(keep=ticket)
+            self.ponder_hits += 1
+            logger.debug("Ponder hit after %s", board.last_move)
+            self._futures = [future]
+            return
+        self._cancel_ponder()
+
         if not moves:
             return
+        if known is not None:
+            logger.debug("Book/tablebase move %s", known)
+            self._instant_move = known
+            return
         if len(moves) == 1:
             self._instant_move = moves[0]
             return
 
-        payload = (state_tuple, agent.depth, agent.color.value, agent.max_n_samples)
+        payload = agent.search_payload(state_tuple)
         parallel_workers = agent._worker_count(len(moves))
         if parallel_workers <= 1:
             self._futures = [self._executor.submit(_choose_move_serial, payload)]
@@ -84,17 +153,22 @@ class _BackgroundAi:
         if not self._futures or self.thinking:
             return None
 
+        stats = SearchStats()
         if self._parallel:
-            best_move: Move4 | None = None
+            best_move: StateMove | None = None
             best_value = float("-inf")
             for future in self._futures:
-                move_coords, value = future.result()
+                move_coords, value, unit_stats = future.result()
+                stats.merge(unit_stats)
                 if value > best_value or best_move is None:
                     best_value = value
                     best_move = move_coords
             coords = best_move
+            stats.elapsed = time.perf_counter() - self._requested_at
         else:
-            coords = self._futures[0].result()
+            coords, stats = self._futures[0].result()
+        self.last_stats = stats
+        logger.debug("AI search: %s", stats.summary())
 
         self._futures = []
         self._parallel = False
@@ -103,6 +177,7 @@ class _BackgroundAi:
         return MinMaxAgent._coords_to_move(coords)
 
     def shutdown(self) -> None:
+        self._cancel_ponder()
         self._executor.shutdown(wait=False, cancel_futures=True)
         shutdown_search_pool()
 
@@ -114,6 +189,34 @@ def _game_over(board: Board) -> bool:
     )
 
 
+def _result(board: Board) -> str:
+    if board.checkmates[Color.WHITE] == Ending.CHECKMATE:
+        return "0-1"
+    if board.checkmates[Color.BLACK] == Ending.CHECKMATE:
+        return "1-0"
+    return "1/2-1/2" if _game_over(board) else "*"
+
+
+def _save_pgn(board: Board, settings: AppSettings) -> None:
+    """Append the game to ``game.pgn`` (nothing is written if no move was played)."""
+    path = settings.game.pgn
+    if path is None or not board.state.move_history():
+        return
+    engine = f"minimax depth={settings.ai.depth}"
+    human_white = settings.ai.color == Color.BLACK
+    headers = {
+        "Event": "chess play-ai",
+        "Date": time.strftime("%Y.%m.%d"),
+        "White": "Human" if human_white else engine,
+        "Black": engine if human_white else "Human",
+    }
+    game = PgnGame.from_state(board.state, headers=headers, result=_result(board))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write(format_game(game) + "\n")
+    logger.info("Saved game to %s", path)
+
+
 def run_vs_ai(settings: AppSettings) -> None:
     display = settings.display
     square_size = display.square_size
@@ -124,15 +227,15 @@ def run_vs_ai(settings: AppSettings) -> None:
     screen = pygame.display.set_mode((window_w, window_h))
     clock = pygame.time.Clock()
 
-    board = Board.from_pieces(deepcopy(STARTING_PIECES))
-    board.promotion = settings.game.promotion
-    board.update()
+    board = Board.new_game(promotion=settings.game.promotion)
 
     ai = MinMaxAgent(
         color=settings.ai.color,
         depth=settings.ai.depth,
         max_n_samples=settings.ai.max_n_samples,
         workers=settings.ai.workers,
+        book=open_book(settings.ai.book),
+        tablebase=Tablebase(settings.ai.tablebases) if settings.ai.tablebases else None,
     )
     bg_ai = _BackgroundAi(workers=settings.ai.workers)
     think_frame = 0
@@ -156,6 +259,9 @@ def run_vs_ai(settings: AppSettings) -> None:
                     board.handle_event(event, square_size=square_size)
 
             human_input = board.turn == Color.WHITE and not _game_over(board)
+            human_to_move = board.turn != settings.ai.color and not _game_over(board)
+            if human_to_move and board.dragged_piece is None:
+                bg_ai.ponder(board, ai, settings.ai.ponder)
 
             if not _game_over(board) and board.turn == settings.ai.color:
                 move = bg_ai.take_move()
@@ -182,6 +288,7 @@ def run_vs_ai(settings: AppSettings) -> None:
             clock.tick(60)
     finally:
         bg_ai.shutdown()
+        _save_pgn(board, settings)
 
     pygame.quit()
     logger.info("Game closed")
@@ -0,0 +1,75 @@
+"""Arena match bookkeeping: agent specs, openings, Elo and SPRT."""
+
+from __future__ import annotations
+
+import math
+from pathlib import Path
+
+import pytest
+
+from chess.ai.arena import AgentSpec, ArenaStats, Sprt, load_openings, run_arena
+from chess.ai.selfplay import SelfPlayGame
+from chess.core.board_state import START_FEN
+
+
+def _game(result: str, white: str = "A") -> SelfPlayGame:
+    black = "B" if white == "A" else "A"
+    return SelfPlayGame(index=0, seed=0, result=result, white=white, black=black)
+
+
+def test_agent_spec_parse_and_reject() -> None:
+    spec = AgentSpec.parse("samples=8, depth=4,movetime=150")
+    assert spec == AgentSpec(depth=4, max_n_samples=8, movetime=150)
+    assert AgentSpec.parse(spec.label()) == spec
+    for bad in ("depth", "speed=3", "depth=0"):
+        with pytest.raises(ValueError):
+            AgentSpec.parse(bad)
+
+
+def test_stats_score_elo_and_sprt() -> None:
+    stats = ArenaStats()
+    for _ in range(30):
+        stats.add(_game("1-0", white="A"))
+        stats.add(_game("1-0", white="B"))
+    assert (stats.wins, stats.draws, stats.losses) == (30, 0, 30)
+    elo, margin = stats.elo()
+    assert elo == 0.0 and 0 < margin < math.inf
+
+    strong = ArenaStats()
+    for _ in range(40):
+        strong.add(_game("1-0"))
+        strong.add(_game("1/2-1/2", white="B"))
+    assert strong.score == 0.75
+    assert strong.elo()[0] == pytest.approx(190.8, abs=0.1)
+    sprt = Sprt(elo0=0, elo1=10)
+    assert sprt.decide(strong.llr(sprt)) == "H1"
+    assert sprt.decide(stats.llr(sprt)) is None
+
+
+def test_load_openings_accepts_fen_and_epd(tmp_path: Path) -> None:
+    path = tmp_path / "openings.epd"
+    path.write_text(
+        f"# two lines\n{START_FEN}\n"
+        "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - bm Nf3;\n\n",
+        encoding="utf-8",
+    )
+    assert load_openings(path) == [
+        START_FEN,
+        "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq -",
+    ]
+
+
+def test_run_arena_pairs_openings_with_reversed_colours() -> None:
+    openings = [START_FEN, "4k3/8/8/8/8/8/4P3/4K3 w - - 0 1"]
+    a, b = AgentSpec(depth=1), AgentSpec(depth=1, movetime=50)
+    games = sorted(
+        run_arena(a, b, 4, openings=openings, max_plies=4, workers=1, seed=0),
+        key=lambda game: game.index,
+    )
+    assert [game.start_fen for game in games] == [openings[0], openings[0], *openings[1:] * 2]
+    assert [(game.white, game.black) for game in games] == [("A", "B"), ("B", "A")] * 2
+    stats = ArenaStats()
+    for game in games:
+        assert len(game.move_nodes) == len(game.moves) and all(game.move_nodes)
+        stats.add(game)
+    assert stats.moves["A"] + stats.moves["B"] == sum(len(game.moves) for game in games)
@@ -0,0 +1,79 @@
+"""Batch analysis: packed positions, streaming input and bounded pool work."""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from chess.ai.batch import (
+    PositionResult,
+    iter_positions,
+    stream_analysis,
+    write_packed_positions,
+)
+from chess.core.board_state import PACKED_SIZE, START_FEN, BoardState
+
+FENS = [
+    START_FEN,
+    "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 b - - 12 40",
+]
+
+
+def test_packed_round_trip_and_rejects_bad_records() -> None:
+    for fen in FENS:
+        state = BoardState.from_fen(fen)
+        packed = state.to_packed()
+        assert len(packed) == PACKED_SIZE
+        restored = BoardState.from_packed(packed)
+        assert restored.to_fen() == fen and restored.hash_key() == state.hash_key()
+    with pytest.raises(ValueError):
+        BoardState.from_packed(b"\x00" * PACKED_SIZE)  # no kings
+    with pytest.raises(ValueError):
+        BoardState.from_packed(b"\x00" * (PACKED_SIZE - 1))
+
+
+def test_iter_positions_reads_text_and_packed(tmp_path: Path) -> None:
+    text = tmp_path / "positions.epd"
+    text.write_text(
+        f'# header\n{FENS[0]}\n\n8/8/8/4k3/8/8/8/R3K3 w - - id "krk";\n', encoding="utf-8"
+    )
+    assert list(iter_positions(text)) == [(None, FENS[0]), ("krk", "8/8/8/4k3/8/8/8/R3K3 w - -")]
+
+    packed = tmp_path / "positions.bin"
+    assert write_packed_positions(packed, FENS) == 3
+    records = list(iter_positions(packed))
+    assert [BoardState.from_packed(record).to_fen() for _, record in records] == FENS
+
+
+def test_stream_analysis_reports_results_and_errors() -> None:
+    positions = [(None, FENS[2]), ("bad", "8/8/8/8 w - -"), (None, "7k/8/8/8/8/8/8/K5RR b - - 0 1")]
+    results = list(stream_analysis(positions, depth=1, multipv=2, workers=1, chunk_size=2))
+    assert [result.index for result in results] == [0, 1, 2]
+    first = results[0]
+    assert first.best is not None and first.pv[0] == first.best and len(first.lines) == 2
+    assert first.nodes > 0 and first.error is None
+    assert results[1].error is not None and results[1].id == "bad"
+    # Checkmate has no lines; the score is the mated side's evaluation.
+    assert results[2].best is None and results[2].score is not None and results[2].score < 0
+    assert json.loads(first.to_json())["best"] == first.best
+
+
+def test_stream_analysis_pulls_input_lazily() -> None:
+    pulled = 0
+
+    def positions() -> Iterator[tuple[str | None, str]]:
+        nonlocal pulled
+        while True:
+            pulled += 1
+            yield None, FENS[2]
+
+    results = stream_analysis(positions(), depth=1, workers=2, chunk_size=2)
+    first = next(results)
+    results.close()
+    assert isinstance(first, PositionResult)
+    # At most 2 * workers chunks are queued ahead of the consumer.
+    assert pulled <= 2 * 2 * 2 + 2
@@ -0,0 +1,66 @@
+"""Search benchmark: EPD ids, report shape and baseline comparison."""
+
+from __future__ import annotations
+
+import copy
+from pathlib import Path
+
+import pytest
+
+from chess.ai import bench
+from chess.ai.bench import compare_reports, load_positions, load_report, run_bench, write_report
+from chess.paths import BENCHMARKS_DIR
+
+
+def test_load_positions_reads_ids(tmp_path: Path) -> None:
+    path = tmp_path / "suite.epd"
+    path.write_text(
+        '# suite\n8/8/8/4k3/8/8/8/R3K3 w - - id "krk";\n4k3/8/8/8/8/8/4P3/4K3 w - - 0 1\n',
+        encoding="utf-8",
+    )
+    assert load_positions(path) == [
+        ("krk", "8/8/8/4k3/8/8/8/R3K3 w - -"),
+        ("pos2", "4k3/8/8/8/8/8/4P3/4K3 w - - 0 1"),
+    ]
+    assert len(load_positions(BENCHMARKS_DIR / "positions.epd")) >= 6
+
+
+def test_report_round_trip_and_compare(tmp_path: Path) -> None:
+    positions = [("krk", "8/8/8/4k3/8/8/8/R3K3 w - -"), ("kpk", "4k3/8/8/8/8/8/4P3/4K3 w - -")]
+    report = run_bench(positions, depth=2, workers=(1, 1))
+    assert report["workers"] == [1]
+    assert report["speedup"] is None
+    run = report["positions"][0]["runs"]["1"]
+    assert run["nodes"] > 0 and len(run["depth_ms"]) == 2 and run["best"]
+    assert report["totals"]["1"]["nodes"] == sum(
+        entry["runs"]["1"]["nodes"] + entry["runs"]["1"]["qnodes"] for entry in report["positions"]
+    )
+
+    path = tmp_path / "bench.json"
+    write_report(path, report)
+    baseline = load_report(path)
+    rows, changed = compare_reports(report, baseline)
+    assert changed == [] and rows[0][0] == "workers=1 nodes"
+
+    baseline = copy.deepcopy(baseline)
+    baseline["positions"][1]["runs"]["1"]["nodes"] += 1
+    assert compare_reports(report, baseline)[1] == ["kpk"]
+    baseline["depth"] = 3
+    with pytest.raises(ValueError):
+        compare_reports(report, baseline)
+
+
+def test_pool_warm_up_runs_no_search(monkeypatch: pytest.MonkeyPatch) -> None:
+    searched: list[tuple[str, int]] = []
+    original = bench.bench_position
+
+    def recording(fen: str, depth: int, workers: int) -> dict:
+        searched.append((fen, workers))
+        return original(fen, depth, workers)
+
+    monkeypatch.setattr(bench, "bench_position", recording)
+    fen = "4k3/8/8/8/8/8/4P3/4K3 w - -"
+    report = run_bench([("kpk", fen)], depth=2, workers=(1, 2))
+    # A warm-up search would leave worker TTs primed for the first suite position.
+    assert searched == [(fen, 1), (fen, 2)]
+    assert report["speedup"] is not None
@@ -8,6 +8,7 @@ import pytest
 
 from chess.core.board import Board
 from chess.core.piece import STARTING_PIECES, Position
+from chess.core.types import Color
 
 
 @pytest.fixture
@@ -40,15 +41,102 @@ def test_move_piece_records_last_move(starting_board: Board) -> None:
 
 
 def test_restore_dragged_piece_returns_piece_to_origin(starting_board: Board) -> None:
-    from chess.core.piece import NullPiece
+    from chess.core.piece import EMPTY_SQUARE
 
     pawn = starting_board.board[Position(4, 6)]
     origin = Position(4, 6)
     starting_board.drag_origin = origin
     starting_board.dragged_piece = pawn
-    starting_board.board[origin] = NullPiece()
+    starting_board.board[origin] = EMPTY_SQUARE
     starting_board._restore_dragged_piece()
 
     assert starting_board.dragged_piece is None
     assert starting_board.board[origin] is pawn
     assert pawn.position == origin
+
+
+def test_square_index_tracks_captures_and_castling(starting_board: Board) -> None:
+    from chess.core.piece import NullPiece
+
+    for origin, target in (
+        ((4, 6), (4, 4)),
+        ((3, 1), (3, 3)),
+        ((4, 4), (3, 3)),
+        ((6, 0), (5, 2)),
+        ((6, 7), (5, 5)),
+        ((2, 0), (6, 4)),
+        ((5, 7), (4, 6)),
+        ((1, 0), (2, 2)),
+        ((4, 7), (6, 7)),
+    ):
+        piece = starting_board.board[Position(*origin)]
+        assert starting_board.move_piece(piece, Position(*target))[0], (origin, target)
+
+    live = list(starting_board.iter_pieces())
+    assert len(live) == 31
+    for piece in live:
+        assert starting_board.board[piece.position] is piece
+    occupied = [p for p in starting_board.board.values() if not isinstance(p, NullPiece)]
+    assert len(occupied) == len(live)
+    assert starting_board.board[Position(5, 7)].piece_type.name == "ROOK"
+    assert starting_board.board[Position(6, 7)].piece_type.name == "KING"
+    assert isinstance(starting_board.board[Position(7, 7)], NullPiece)
+
+
+def test_drag_keeps_piece_indexed(starting_board: Board) -> None:
+    pawn = starting_board.board[Position(4, 6)]
+    starting_board.drag_origin = Position(4, 6)
+    starting_board.dragged_piece = pawn
+    assert starting_board._find_piece_at(4, 6) is pawn
+    assert starting_board._find_piece_at(4, 5) is None
+
+
+def test_incremental_sync_matches_full_rebuild(starting_board: Board) -> None:
+    import numpy as np
+
+    from chess.core.board_state import BoardState
+    from chess.core.piece import Knight, Pawn
+    from chess.core.types import Color
+
+    before = starting_board.state
+    for origin, target in (
+        ((4, 6), (4, 4)),
+        ((3, 1), (3, 3)),
+        ((4, 4), (3, 3)),
+        ((3, 0), (3, 3)),
+        ((6, 7), (5, 5)),
+        ((3, 3), (4, 4)),
+    ):
+        piece = starting_board.board[Position(*origin)]
+        assert starting_board.move_piece(piece, Position(*target))[0], (origin, target)
+    assert starting_board.state is before
+
+    incremental = dict(starting_board.board)
+    rebuilt = BoardState.from_board(starting_board)
+    assert np.array_equal(rebuilt.grid, starting_board.state.grid)
+    assert rebuilt.hash_key() == starting_board.state.hash_key()
+    assert starting_board.checks == {Color.WHITE: True, Color.BLACK: False}
+    starting_board.update()
+    assert starting_board.board == incremental
+    assert starting_board.checks == {Color.WHITE: True, Color.BLACK: False}
+
+    Board.add_piece(starting_board, Pawn(color=Color.WHITE, position=Position(0, 4)))
+    Board.add_piece(starting_board, Knight(color=Color.BLACK, position=Position(0, 6)))
+    rebuilt = BoardState.from_board(starting_board)
+    assert starting_board.state is before
+    assert np.array_equal(rebuilt.grid, before.grid)
+    assert rebuilt.hash_key() == before.hash_key()
+    assert len(starting_board.pieces[Color.WHITE]) == 15
+
+
+def test_new_game_matches_starting_pieces_and_builds_pieces_lazily() -> None:
+    board = Board.new_game()
+    assert board._pieces is None
+    reference = Board.from_pieces(deepcopy(STARTING_PIECES)).state
+    assert board.state.to_fen() == reference.to_fen()
+    assert board.state.hash_key() == reference.hash_key()
+
+    assert board.move_piece(board.board[Position(4, 6)], Position(4, 4))[0]
+    assert len(board.pieces[Color.WHITE]) == 16
+    # Every new game owns its state; the prebuilt start position is never mutated.
+    assert Board.new_game().state.to_fen() == reference.to_fen()
@@ -0,0 +1,81 @@
+"""Opening book file format and agent integration."""
+
+from __future__ import annotations
+
+import random
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from chess.ai.book import (
+    BOOK_MAGIC,
+    OpeningBook,
+    collect_book_moves,
+    decode_move,
+    encode_move,
+    selfplay_lines,
+    starting_state,
+    write_book,
+)
+from chess.ai.minmax import MinMaxAgent
+from chess.core.types import Color
+
+E4 = (4, 6, 4, 4)
+D4 = (3, 6, 3, 4)
+E5 = (4, 1, 4, 3)
+
+
+def test_move_encoding_round_trips() -> None:
+    for move in (E4, D4, E5, (0, 0, 7, 7)):
+        assert decode_move(encode_move(move)) == move
+
+
+def test_book_lookup_returns_weighted_legal_moves(tmp_path: Path) -> None:
+    path = tmp_path / "book.bin"
+    counts = collect_book_moves([[E4, E5], [E4, E5], [D4]], plies=2)
+    assert write_book(path, counts) == 3
+
+    book = OpeningBook.open(path, rng=random.Random(0))
+    state = starting_state()
+    assert sorted(book.entries(state)) == [(D4, 1), (E4, 2)]
+    state.make_move(*E4)
+    assert book.pick(state) == E5
+    state.make_move(*E5)
+    assert book.pick(state) is None
+
+
+def test_illegal_moves_never_enter_or_leave_the_book(tmp_path: Path) -> None:
+    # E5 is Black's move: the line stops there and nothing after it counts either.
+    counts = collect_book_moves([[E4, E4, D4], [E5, E4]], plies=3)
+    assert counts == {starting_state().hash_key(): Counter({E4: 1})}
+
+    path = tmp_path / "book.bin"
+    write_book(path, {starting_state().hash_key(): Counter({E5: 1000, D4: 1})})
+    book = OpeningBook.open(path, rng=random.Random(0))
+    assert {book.pick(starting_state()) for _ in range(20)} == {D4}
+
+
+def test_book_rejects_foreign_files(tmp_path: Path) -> None:
+    path = tmp_path / "book.bin"
+    path.write_bytes(b"NOTABOOK" + bytes(8))
+    with pytest.raises(ValueError, match="magic"):
+        OpeningBook.open(path)
+    path.write_bytes(BOOK_MAGIC + bytes(8))
+    with pytest.raises(ValueError, match="Zobrist"):
+        OpeningBook.open(path)
+
+
+def test_agent_plays_book_move_without_searching(tmp_path: Path) -> None:
+    path = tmp_path / "book.bin"
+    write_book(path, {starting_state().hash_key(): Counter({D4: 5})})
+    agent = MinMaxAgent(color=Color.WHITE, depth=8, workers=1, book=OpeningBook.open(path))
+    assert agent.search(starting_state()) == D4
+    assert not agent._tt
+
+
+def test_selfplay_lines_are_playable() -> None:
+    lines = list(selfplay_lines(games=2, plies=3, depth=1, max_n_samples=4))
+    assert len(lines) == 2
+    counts = collect_book_moves(lines, plies=3)
+    assert sum(sum(moves.values()) for moves in counts.values()) == 6
@@ -1,11 +1,26 @@
 from __future__ import annotations
 
+import multiprocessing
+import threading
+import time
 from copy import deepcopy
 
 import pytest
 
-from chess.ai.minmax import MinMaxAgent, choose_move_in_subprocess
+from chess.ai.minmax import (
+    TT_EXACT,
+    TT_UPPER,
+    MinMaxAgent,
+    SearchStats,
+    _order_moves,
+    _ponder_move,
+    _score_root_move,
+    _worker_agent,
+    choose_move_in_subprocess,
+    init_ponder_worker,
+)
 from chess.core.board import Board
+from chess.core.board_state import BoardState
 from chess.core.piece import (
     STARTING_PIECES,
     King,
@@ -14,7 +29,7 @@ from chess.core.piece import (
     Rook,
 )
 from chess.core.types import Color, Ending
-from chess.ui.vs_ai import _BackgroundAi
+from chess.ui.vs_ai import _BackgroundAi, _predict_replies
 
 
 @pytest.fixture
@@ -75,6 +90,42 @@ def test_minimax_prefers_hanging_queen_capture() -> None:
     assert move[1] == Position(3, 4)
 
 
+def test_quiescence_sees_the_recapture_and_ordering_uses_see() -> None:
+    # Qxd5 wins a pawn at depth 1 but loses the queen to cxd5; Rxa5 wins a pawn safely.
+    state = BoardState.from_fen("4k3/8/2p5/p2p4/8/8/8/R2QK3 w - - 0 1")
+    agent = MinMaxAgent(color=Color.WHITE, depth=1, workers=1)
+    move, stats = agent.search_with_stats(state)
+    assert move == (0, 7, 0, 3)
+    assert stats.qnodes > 0 and stats.max_ply > 1
+
+    ordered = _order_moves(state, state.generate_legal_moves())
+    assert ordered[0] == (0, 7, 0, 3)
+    assert ordered[-1] == (3, 7, 3, 3)
+
+
+def test_analyse_ranks_root_moves_with_exact_values() -> None:
+    state = BoardState.from_fen("4k3/8/2p5/p2p4/8/8/8/R2QK3 w - - 0 1")
+    agent = MinMaxAgent(color=Color.WHITE, depth=2, workers=1)
+    lines = agent.analyse_state(state, multipv=3)
+    assert len(agent.stats.depth_nodes) == 2
+
+    # Reference: every root move searched separately with a full window.
+    exact = {}
+    for move in state.generate_legal_moves():
+        child = state.copy()
+        child.make_move(*move)
+        fresh = MinMaxAgent(color=Color.WHITE, depth=2, workers=1)
+        exact[move] = fresh._minimax(child, 1, float("-inf"), float("inf"), 1)[1]
+    assert [line.value for line in lines] == sorted(exact.values(), reverse=True)[:3]
+    for line in lines:
+        assert line.value == exact[line.move] and line.pv[0] == line.move
+
+    with pytest.raises(ValueError):
+        agent.analyse_state(state, multipv=0)
+    mated = BoardState.from_fen("R5k1/5ppp/8/8/8/8/8/6K1 b - - 0 1")
+    assert agent.analyse_state(mated) == []
+
+
 def test_terminal_checkmate_score() -> None:
     board = Board.from_pieces(
         [
@@ -102,6 +153,27 @@ def test_choose_move_in_subprocess_parallel(starting_board: Board) -> None:
     assert move in MinMaxAgent.generate_possible_moves(starting_board)
 
 
+def test_search_stats_count_serial_and_merge_parallel(starting_board: Board) -> None:
+    serial = MinMaxAgent(color=Color.WHITE, depth=3, workers=1)
+    move, stats = serial.search_with_stats(starting_board.state)
+    assert move is not None and stats is serial.stats
+    # Captures at the horizon (1.e4 d5 2.exd5) are resolved by quiescence past ply 3.
+    assert stats.nodes > 20 and stats.qnodes > 0 and stats.max_ply > 3
+    assert stats.tt_hits <= stats.tt_probes <= stats.nodes
+    assert 0 < stats.first_move_cutoffs <= stats.cutoffs
+    assert stats.elapsed > 0 and stats.nps > 0 and stats.branching_factor > 1
+
+    parallel = MinMaxAgent(color=Color.WHITE, depth=3, workers=2)
+    parallel.search(starting_board.state)
+    # Root moves are scored in workers; their counters come back with the results.
+    assert parallel.stats.nodes > 20 and parallel.stats.max_ply >= 3
+
+    total = SearchStats(nodes=5, max_ply=2)
+    total.merge(SearchStats(nodes=7, cutoffs=3, first_move_cutoffs=2, max_ply=4))
+    assert (total.nodes, total.cutoffs, total.max_ply) == (12, 3, 4)
+    assert total.first_move_cutoff_rate == pytest.approx(2 / 3)
+
+
 def test_background_ai_parallel_path(starting_board: Board) -> None:
     white_move = MinMaxAgent.generate_possible_moves(starting_board)[0]
     assert MinMaxAgent.apply_move(starting_board, white_move)
@@ -121,3 +193,179 @@ def test_background_ai_parallel_path(starting_board: Board) -> None:
         assert MinMaxAgent.apply_move(starting_board, move)
     finally:
         bg.shutdown()
+
+
+def test_background_ai_ponder_hit_reuses_search(starting_board: Board) -> None:
+    agent = MinMaxAgent(color=Color.BLACK, depth=2, workers=1)
+    bg = _BackgroundAi(workers=1)
+    try:
+        bg.ponder(starting_board, agent, replies=20)
+        white_move = MinMaxAgent.generate_possible_moves(starting_board)[0]
+        assert MinMaxAgent.apply_move(starting_board, white_move)
+
+        bg.request_move(starting_board, agent)
+        assert bg.ponder_hits == 1
+        bg._futures[0].result(timeout=60)
+        move = bg.take_move()
+        assert move in MinMaxAgent.generate_possible_moves(starting_board)
+    finally:
+        bg.shutdown()
+
+
+def test_background_ai_ponder_miss_discards_ponder_searches(starting_board: Board) -> None:
+    agent = MinMaxAgent(color=Color.BLACK, depth=3, workers=1)
+    bg = _BackgroundAi(workers=1)
+    try:
+        predicted = _predict_replies(starting_board.state.copy(), 2)
+        bg.ponder(starting_board, agent, replies=2)
+        white_move = next(
+            move
+            for move in MinMaxAgent.generate_possible_moves(starting_board)
+            if MinMaxAgent._move_coords(move) not in predicted
+        )
+        assert MinMaxAgent.apply_move(starting_board, white_move)
+        pondered = [future for _, future in bg._ponder.values()]
+
+        bg.request_move(starting_board, agent)
+        # The real search only waits for the ponder searches to notice the abort.
+        assert bg.ponder_hits == 0 and not bg._ponder
+        assert all(future.cancelled() or future.result(timeout=60) is None for future in pondered)
+        bg._futures[0].result(timeout=60)
+        assert bg.take_move() in MinMaxAgent.generate_possible_moves(starting_board)
+    finally:
+        bg.shutdown()
+
+
+def test_dropped_ponder_search_aborts_and_keeps_its_tt() -> None:
+    agent = MinMaxAgent(color=Color.BLACK, depth=6, workers=1)
+    state = BoardState.initial()
+    state.make_move(*state.generate_legal_moves()[0])
+    payload = agent.search_payload(state.to_search_state())
+    live = multiprocessing.Value("q", 1, lock=False)
+    init_ponder_worker(live)
+    try:
+        threading.Timer(0.2, setattr, (live, "value", 0)).start()
+        started = time.perf_counter()
+        assert _ponder_move(payload, 1, 2) is None
+        assert time.perf_counter() - started < 10
+        assert _worker_agent(payload)._tt
+
+        live.value = -2
+        assert _ponder_move(payload, 1, 3) is None
+        assert _ponder_move(agent.search_payload(state.to_search_state(), 1), 1, 2) is not None
+    finally:
+        init_ponder_worker(None)
+
+
+def test_background_ai_prefers_book_move_over_ponder_hit(starting_board: Board) -> None:
+    class _Book:
+        def pick(self, state: BoardState) -> tuple[int, int, int, int]:
+            return (4, 1, 4, 3)
+
+    agent = MinMaxAgent(color=Color.BLACK, depth=2, workers=1, book=_Book())  # type: ignore[arg-type]
+    bg = _BackgroundAi(workers=1)
+    try:
+        bg.ponder(starting_board, agent, replies=20)
+        white_move = MinMaxAgent.generate_possible_moves(starting_board)[0]
+        assert MinMaxAgent.apply_move(starting_board, white_move)
+        bg.request_move(starting_board, agent)
+        assert bg.ponder_hits == 0
+        assert bg.take_move() == MinMaxAgent._coords_to_move((4, 1, 4, 3))
+    finally:
+        bg.shutdown()
+
+
+def test_transposition_table_survives_between_moves(starting_board: Board) -> None:
+    agent = MinMaxAgent(color=Color.WHITE, depth=3, workers=1)
+    first = agent.choose_move(starting_board)
+    assert first is not None
+    entries = len(agent._tt)
+    assert entries > 0
+
+    again = agent.choose_move(starting_board)
+    assert again is not None
+    assert len(agent._tt) >= entries
+    assert agent.principal_variation(starting_board.state)[0] == MinMaxAgent._move_coords(again)
+
+
+def test_tt_prefers_replacing_stale_generations(starting_board: Board) -> None:
+    agent = MinMaxAgent(color=Color.WHITE, depth=2, workers=1, tt_size=64)
+    agent.choose_move(starting_board)
+    assert len(agent._tt) <= 64
+    generation = agent._generation
+
+    for _ in range(2):
+        reply = MinMaxAgent.generate_possible_moves(starting_board)[0]
+        assert MinMaxAgent.apply_move(starting_board, reply)
+    agent.choose_move(starting_board)
+    assert agent._generation == generation + 1
+    assert len(agent._tt) <= 64
+    assert any(entry.generation == agent._generation for entry in agent._tt.values())
+
+
+def test_tiny_tt_keeps_the_newest_root_and_pv_entries() -> None:
+    state = BoardState.initial()
+    agent = MinMaxAgent(color=Color.WHITE, depth=4, workers=1, tt_size=16)
+    move = agent.iterate(state, 4)
+    assert len(agent._tt) <= 16
+    # The root is stored last at every depth; a full table must not throw it away.
+    root = agent._tt[state.hash_key()]
+    assert root.depth == 4 and root.move == move
+    assert agent.principal_variation(state, 4)[0] == move
+
+    table = MinMaxAgent(color=Color.WHITE, tt_size=2)
+    table._tt_store(1, 3, 0.0, TT_EXACT, None)
+    table._tt_store(2, 2, 0.0, TT_UPPER, None)
+    table._tt_store(3, 1, 0.0, TT_EXACT, None)  # shallower than everything: skipped
+    assert set(table._tt) == {1, 2}
+    table._tt_store(4, 2, 0.0, TT_EXACT, None)  # exact beats a bound of equal depth
+    assert set(table._tt) == {1, 4}
+    table._generation += 1
+    table._tt_store(5, 0, 0.0, TT_UPPER, None)  # stale entries always make room
+    assert set(table._tt) == {4, 5}
+
+
+def test_worker_tt_follows_the_agent_lineage_across_depths() -> None:
+    state = BoardState.initial()
+    move = state.generate_legal_moves()[0]
+
+    def score(agent: MinMaxAgent, depth: int) -> SearchStats:
+        return _score_root_move(agent.search_payload(state.to_search_state(), depth), move)[2]
+
+    agent = MinMaxAgent(color=Color.WHITE, depth=3, workers=1)
+    cold = score(agent, 3).nodes
+    score(agent, 2)
+    warm = score(agent, 3)
+    # Deepening again reuses the lineage's worker TT; a new agent starts cold.
+    assert warm.tt_hits > 0 and warm.nodes < cold
+    assert score(MinMaxAgent(color=Color.WHITE, depth=3, workers=1), 3).nodes == cold
+
+
+def test_search_scores_repetitions_as_draws() -> None:
+    from chess.core.board_state import BoardState
+
+    board = Board.from_pieces(
+        [
+            King(color=Color.WHITE, position=Position(4, 7)),
+            Queen(color=Color.WHITE, position=Position(3, 7)),
+            King(color=Color.BLACK, position=Position(0, 0)),
+        ]
+    )
+    for origin, target in (((3, 7), (3, 6)), ((0, 0), (1, 0)), ((3, 6), (3, 7)), ((1, 0), (0, 0))):
+        assert board.move_piece(board.board[Position(*origin)], Position(*target))[0]
+    state = board.state
+    assert state.repetitions() == 2
+    assert state.history_window() == tuple(state._history)
+
+    agent = MinMaxAgent(color=Color.WHITE, depth=2, workers=1)
+    state.make_move(3, 7, 3, 6)
+    assert state.is_repetition()
+    assert agent._minimax(state, 2, float("-inf"), float("inf"), ply=1) == (None, 0.0)
+    state.unmake_move()
+
+    restored = BoardState.from_search_state(board.to_search_state())
+    restored.make_move(3, 7, 3, 6)
+    assert restored.is_repetition()
+    move, value = agent._minimax(state, 2, float("-inf"), float("inf"))
+    assert move != (3, 7, 3, 6)
+    assert value > 5
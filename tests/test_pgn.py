@@ -0,0 +1,147 @@
+"""PGN: SAN conversion, streaming reader, writer and the self-play/book hooks."""
+
+from __future__ import annotations
+
+import io
+from pathlib import Path
+
+import pytest
+
+from chess.ai.book import collect_book_moves, pgn_lines
+from chess.ai.selfplay import play_game
+from chess.core.board_state import BoardState
+from chess.core.pgn import (
+    PgnGame,
+    format_game,
+    iter_games,
+    move_to_san,
+    parse_san,
+    write_games,
+)
+
+OPERA_GAME = """[Event "Paris"]
+[White "Morphy, Paul"]
+[Black "Duke Karl / Count Isouard"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 d6 3. d4 Bg4 {This is a weak move
+already.} 4. dxe5 Bxf3 5. Qxf3 dxe5 6. Bc4 Nf6 7. Qb3 Qe7 8. Nc3 c6 9. Bg5 b5 $2
+10. Nxb5 cxb5 (10... Qb4+ 11. Qxb4 {variation} (11. Kd1)) 11. Bxb5+ Nbd7 ; line comment
+12. O-O-O Rd8 13. Rxd7 Rxd7 14. Rd1 Qe6 15. Bxd7+ Nxd7 16. Qb8+ Nxb8 17. Rd8# 1-0
+"""
+
+BROKEN_GAME = """[Event "Broken"]
+[Result "*"]
+
+1. e4 e5 2. Ke3 *
+"""
+
+FEN_GAME = """[Event "Endgame"]
+[SetUp "1"]
+[FEN "4k3/P7/8/8/8/8/8/4K3 w - - 0 40"]
+
+40. a8=N Kd7 41. Nb6+ *
+"""
+
+
+@pytest.mark.parametrize(
+    ("fen", "san"),
+    [
+        ("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1", "O-O"),
+        ("r3k2r/8/8/8/8/8/8/R3K2R b KQkq - 0 1", "O-O-O"),
+        ("4k3/1P6/8/8/8/8/8/4K3 w - - 0 1", "b8=Q+"),
+        ("2r1k3/1P6/8/8/8/8/8/4K3 w - - 0 1", "bxc8=N"),
+        ("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 2", "exd6"),
+        ("4k3/8/8/8/8/8/8/1N2KN2 w - - 0 1", "Nfd2"),
+        ("4k3/8/8/N7/8/8/8/N3K3 w - - 0 1", "N5b3"),
+        ("4k3/Q7/8/8/8/8/8/Q2QK3 w - - 0 1", "Qa1d4"),
+        ("6k1/5ppp/8/8/8/8/8/R3K3 w - - 0 1", "Ra8#"),
+    ],
+)
+def test_san_round_trips(fen: str, san: str) -> None:
+    state = BoardState.from_fen(fen)
+    move = parse_san(state, san)
+    assert move_to_san(state, move) == san
+    assert state.to_fen() == fen
+
+
+def test_parse_san_rejects_illegal_and_ambiguous_moves() -> None:
+    state = BoardState.from_fen("4k3/8/8/8/8/8/8/1N2KN2 w - - 0 1")
+    with pytest.raises(ValueError, match="ambiguous"):
+        parse_san(state, "Nd2")
+    with pytest.raises(ValueError, match="illegal"):
+        parse_san(state, "Nb4")
+    with pytest.raises(ValueError, match="bad SAN"):
+        parse_san(state, "Zz9")
+
+
+def test_iter_games_streams_main_lines_and_flags_bad_games(tmp_path: Path) -> None:
+    path = tmp_path / "games.pgn"
+    path.write_text(OPERA_GAME + "\n" + BROKEN_GAME + "\n" + FEN_GAME, encoding="utf-8")
+    games = iter_games(path)
+    opera = next(games)
+    assert opera.headers["Black"] == "Duke Karl / Count Isouard"
+    assert len(opera.moves) == 33 and opera.result == "1-0" and opera.error is None
+    sans = opera.sans()
+    assert sans[:2] == ["e4", "e5"] and sans[22:25] == ["O-O-O", "Rd8", "Rxd7"]
+    assert sans[-1] == "Rd8#"
+
+    broken = next(games)
+    assert len(broken.moves) == 2 and "Ke3" in (broken.error or "")
+
+    endgame = next(games)
+    assert endgame.start_fen == "4k3/P7/8/8/8/8/8/4K3 w - - 0 40"
+    assert endgame.sans() == ["a8=N", "Kd7", "Nb6+"]
+    assert next(games, None) is None
+
+
+def test_iter_games_splits_games_without_tags_or_moves() -> None:
+    untagged = list(iter_games(io.StringIO("1. e4 e5 1-0\n\n1. d4 d5 0-1\n")))
+    assert [(len(game.moves), game.result) for game in untagged] == [(2, "1-0"), (2, "0-1")]
+
+    text = '[Event "Empty"]\n\n[Event "Next"]\n\n1. e4 {a\n[Event "not a tag"]} e5 *\n'
+    empty, game = iter_games(io.StringIO(text))
+    assert empty.headers == {"Event": "Empty"} and empty.moves == []
+    assert game.headers == {"Event": "Next"} and game.sans() == ["e4", "e5"]
+
+
+def test_format_game_round_trips_through_reader() -> None:
+    games = list(iter_games(io.StringIO(OPERA_GAME + "\n" + FEN_GAME)))
+    out = io.StringIO()
+    assert write_games(out, games) == 2
+    text = out.getvalue()
+    assert text.startswith('[Event "Paris"]\n[Site "?"]')
+    assert "12. O-O-O Rd8" in text and "{" not in text
+    assert all(len(line) <= 79 for line in text.splitlines())
+    again = list(iter_games(io.StringIO(text)))
+    assert [(g.moves, g.result, g.start_fen) for g in again] == [
+        (g.moves, g.result, g.start_fen) for g in games
+    ]
+
+
+def test_from_state_records_history_and_black_to_move_start() -> None:
+    fen = "4k3/8/8/8/8/8/4p3/K7 b - - 0 30"
+    state = BoardState.from_fen(fen)
+    for san in ("e1=Q+", "Ka2", "Qe6+"):
+        state.make_move(*parse_san(state, san))
+    game = PgnGame.from_state(state, headers={"White": "a"}, result="*")
+    assert game.headers["FEN"] == fen and game.headers["SetUp"] == "1"
+    assert game.sans() == ["e1=Q+", "Ka2", "Qe6+"]
+    assert "30... e1=Q+ 31. Ka2 Qe6+ *" in format_game(game)
+
+    start = PgnGame.from_state(BoardState.initial())
+    assert start.moves == [] and "FEN" not in start.headers
+
+
+def test_selfplay_games_export_to_pgn_and_feed_the_book(tmp_path: Path) -> None:
+    game = play_game(0, seed=5, depth=1, max_n_samples=4, max_plies=12)
+    record = game.to_pgn()
+    assert record.result == game.result and record.headers["Round"] == "1"
+    path = tmp_path / "selfplay.pgn"
+    with path.open("w", encoding="utf-8") as handle:
+        write_games(handle, [record, PgnGame(headers={"FEN": "4k3/8/8/8/8/8/8/4K3 w - - 0 1"})])
+    lines = list(pgn_lines(path))
+    assert lines == [record.moves]
+    counts = collect_book_moves(lines, plies=4)
+    assert sum(sum(moves.values()) for moves in counts.values()) == 4
+    assert BoardState.initial().hash_key() in counts
@@ -0,0 +1,75 @@
+"""Piece model: shared sentinels and slotted pieces."""
+
+from __future__ import annotations
+
+import dataclasses as dc
+import pickle
+from copy import deepcopy
+
+import pytest
+
+from chess.core.board import Board
+from chess.core.piece import EMPTY_SQUARE, OFF_BOARD, STARTING_PIECES, Pawn, Position
+from chess.core.types import Color
+
+
+def test_empty_squares_share_one_immutable_sentinel() -> None:
+    board = Board.from_pieces(deepcopy(STARTING_PIECES))
+    empties = [piece for piece in board.board.values() if piece.color == Color.UNDEFINED]
+    assert len(empties) == 32
+    assert all(piece is EMPTY_SQUARE for piece in empties)
+    assert board.get(Position(-1, 3)) is OFF_BOARD
+
+    with pytest.raises(dc.FrozenInstanceError):
+        EMPTY_SQUARE.position = Position(0, 0)
+    assert pickle.loads(pickle.dumps(EMPTY_SQUARE)) is EMPTY_SQUARE
+    assert deepcopy(OFF_BOARD) is OFF_BOARD
+
+
+def test_pieces_are_slotted_with_lazy_icon_path() -> None:
+    pawn = Pawn(color=Color.BLACK, position=Position(2, 1))
+    assert not hasattr(pawn, "__dict__")
+    assert pawn.icon_path.name == "pawn_black.png"
+    assert pawn.icon_path is Pawn(color=Color.BLACK).icon_path
+
+
+def test_positions_are_canonical_and_immutable() -> None:
+    e4 = Position(4, 4)
+    assert e4 is Position.from_repr("e4")
+    assert (e4.index, e4.name, repr(e4)) == (36, "e4", "e4")
+    assert pickle.loads(pickle.dumps(e4)) is e4
+    with pytest.raises(dc.FrozenInstanceError):
+        e4.x = 5
+
+    off = Position(-1, 3)
+    assert off.index == -1
+    assert off == Position(-1, 3)
+    assert off != e4
+    assert not Board.in_bounds(off)
+    assert Pawn().position is not Pawn(position=Position(0, 0)).position
+
+
+def test_update_legal_moves_is_a_view_over_board_state() -> None:
+    board = Board.from_pieces(deepcopy(STARTING_PIECES))
+    knight = board.board[Position(6, 7)]
+    knight.update_legal_moves(board)
+    assert set(knight.legal_moves) == {Position(5, 5), Position(7, 5)}
+    assert knight.attacking_squares == knight.legal_moves
+
+    black_pawn = board.board[Position(4, 1)]
+    black_pawn.update_legal_moves(board)
+    assert black_pawn.legal_moves == ()
+
+    pawn = board.board[Position(4, 6)]
+    pawn.update_legal_moves(board)
+    assert set(pawn.legal_moves) == {Position(4, 5), Position(4, 4)}
+    # Pawns attack the empty diagonals, never the squares they push to.
+    assert pawn.attacking_squares == [Position(3, 5), Position(5, 5)]
+    rook_pawn = board.board[Position(0, 1)]
+    rook_pawn.update_legal_moves(board)
+    assert rook_pawn.attacking_squares == [Position(1, 2)]
+    assert board.move_piece(pawn, Position(4, 4))[0]
+    black_pawn.update_legal_moves(board)
+    assert set(black_pawn.legal_moves) == {Position(4, 2), Position(4, 3)}
+    pawn.update_legal_moves(board)
+    assert pawn.legal_moves == ()
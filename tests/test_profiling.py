@@ -0,0 +1,49 @@
+"""Opt-in search profiling hooks."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+from chess.ai.minmax import MinMaxAgent, _get_search_pool, shutdown_search_pool
+from chess.ai.profiling import SearchProfiler, make_profiler
+from chess.core.board_state import BoardState
+from chess.core.types import Color
+
+
+def test_profiler_times_phases_and_restores_methods(tmp_path: Path) -> None:
+    originals = (BoardState.make_move, BoardState.generate_legal_moves)
+    profiler = SearchProfiler(tmp_path)
+    agent = MinMaxAgent(Color.WHITE, depth=2, workers=1, profiler=profiler)
+    assert agent.search(BoardState.initial()) is not None
+
+    phases = {phase: calls for phase, calls, _, _ in profiler.breakdown()}
+    assert phases["make_move"] == phases["unmake_move"] > 0
+    assert phases["movegen"] > 0 and phases["evaluate"] > 0
+    assert profiler.elapsed > 0
+    assert (BoardState.make_move, BoardState.generate_legal_moves) == originals
+    assert len(list(tmp_path.glob("search-*.pstats"))) == 1
+
+
+def test_profiling_is_off_by_default() -> None:
+    assert make_profiler(False) is None
+    assert MinMaxAgent().profiler is None
+
+
+def _worker_is_unprofiled() -> bool:
+    return not hasattr(BoardState.make_move, "__wrapped__") and sys.getprofile() is None
+
+
+def test_profiled_parallel_search_leaves_pool_workers_unpatched(tmp_path: Path) -> None:
+    profiler = SearchProfiler(tmp_path)
+    agent = MinMaxAgent(Color.WHITE, depth=2, workers=2, profiler=profiler)
+    try:
+        assert agent.search(BoardState.initial()) is not None
+        pool = _get_search_pool(2)
+        assert all(pool.submit(_worker_is_unprofiled).result(timeout=30) for _ in range(4))
+
+        pool_row = profiler.breakdown()[-1]
+        assert pool_row[0] == "pool_overhead" and pool_row[1] == 20
+        assert 0.0 <= pool_row[3] <= 1.0
+    finally:
+        shutdown_search_pool()
@@ -0,0 +1,190 @@
+"""BoardState rules: perft, en passant, promotion, repetition and FEN."""
+
+from __future__ import annotations
+
+from copy import deepcopy
+
+import numpy as np
+import pytest
+
+from chess.ai.book import decode_move, encode_move
+from chess.ai.minmax import MinMaxAgent
+from chess.core.board import Board
+from chess.core.board_state import (
+    BISHOP,
+    KNIGHT,
+    PAWN,
+    QUEEN,
+    ROOK,
+    START_FEN,
+    BoardState,
+    perft,
+)
+from chess.core.piece import STARTING_PIECES, Knight, Position
+from chess.core.types import Color, Ending, PieceType
+
+
+def _state(rows: str, turn: int = 0, castling: str = "-") -> BoardState:
+    return BoardState.from_fen(f"{rows} {'wb'[turn]} {castling} - 0 1")
+
+
+@pytest.mark.parametrize(("depth", "nodes"), [(1, 20), (2, 400), (3, 8902)])
+def test_perft_start_position(depth: int, nodes: int) -> None:
+    state = BoardState.from_board(Board.from_pieces(deepcopy(STARTING_PIECES)))
+    assert perft(state, depth) == nodes
+
+
+def test_perft_en_passant_position() -> None:
+    # Chess Programming Wiki perft position 3 (pins and en passant along the rank).
+    assert perft(_state("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8"), 3) == 2812
+
+
+def test_perft_promotion_position() -> None:
+    # Chess Programming Wiki perft position 4 (promotions, including under-promotion).
+    state = _state(
+        "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1",
+        castling="kq",
+    )
+    assert perft(state, 2) == 264
+
+
+def test_en_passant_make_unmake_restores_everything() -> None:
+    state = _state("4k3/8/8/8/5p2/8/4P3/4K3")
+    state.make_move(4, 6, 4, 4)
+    assert state.ep_file == 4
+    before = (state.grid.copy(), state.hash_key())
+    capture = (5, 4, 4, 5)
+    assert capture in state.generate_legal_moves()
+    state.make_move(*capture)
+    assert state.grid[4, 4] == 0 and state.grid[5, 4] == -PAWN
+    state._recompute_hash()
+    incremental = state.hash_key()
+    state.unmake_move()
+    assert np.array_equal(state.grid, before[0])
+    assert state.hash_key() == before[1]
+    assert state.ep_file == 4
+    state.make_move(*capture)
+    assert state.hash_key() == incremental
+
+
+def test_double_push_without_neighbour_sets_no_en_passant() -> None:
+    state = _state("4k3/8/8/8/8/8/4P3/4K3")
+    state.make_move(4, 6, 4, 4)
+    assert state.ep_file == -1
+
+
+def test_under_promotion_on_board_and_in_moves() -> None:
+    board = Board.from_search_state(_state("7k/P7/8/8/8/8/8/K7").to_search_state())
+    promotions = {m for m in board.state.generate_legal_moves() if len(m) == 5}
+    assert promotions == {(0, 1, 0, 0, piece) for piece in (QUEEN, ROOK, BISHOP, KNIGHT)}
+    move = (Position(0, 1), Position(0, 0), PieceType.KNIGHT)
+    assert move in MinMaxAgent.generate_possible_moves(board)
+    assert MinMaxAgent.apply_move(board, move)
+    assert isinstance(board.board[Position(0, 0)], Knight)
+    assert board.state.grid[0, 0] == KNIGHT
+    assert decode_move(encode_move((0, 1, 0, 0, KNIGHT))) == (0, 1, 0, 0, KNIGHT)
+
+
+def test_threefold_repetition_ends_the_game() -> None:
+    board = Board.from_pieces(deepcopy(STARTING_PIECES))
+    shuffle = [((6, 7), (5, 5)), ((6, 0), (5, 2)), ((5, 5), (6, 7)), ((5, 2), (6, 0))]
+    for _ in range(2):
+        for origin, target in shuffle:
+            assert board.move_piece(board.board[Position(*origin)], Position(*target))[0]
+    assert board.state.repetitions() == 3
+    assert board.checkmates[Color.WHITE] == Ending.DRAW
+
+
+def test_hash_includes_castling_rights_incrementally() -> None:
+    with_rights = _state("r3k2r/8/8/8/8/8/8/R3K2R", castling="KQkq")
+    without = _state("r3k2r/8/8/8/8/8/8/R3K2R")
+    assert with_rights.hash_key() != without.hash_key()
+
+    # Rook out and back: same squares, fewer rights, different hash.
+    for move in ((7, 7, 7, 6), (0, 0, 0, 1), (7, 6, 7, 7), (0, 1, 0, 0)):
+        with_rights.make_move(*move)
+    assert with_rights.castling == 2 | 4
+    incremental = with_rights.hash_key()
+    with_rights._recompute_hash()
+    assert with_rights.hash_key() == incremental
+    assert with_rights.repetitions() == 1
+    for _ in range(4):
+        with_rights.unmake_move()
+    assert with_rights.castling == 15
+
+
+KIWIPETE = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+
+
+@pytest.mark.parametrize(("depth", "nodes"), [(1, 48), (2, 2039), (3, 97862)])
+def test_perft_kiwipete(depth: int, nodes: int) -> None:
+    assert perft(BoardState.from_fen(KIWIPETE), depth) == nodes
+
+
+@pytest.mark.parametrize(
+    "fen",
+    [
+        START_FEN,
+        KIWIPETE,
+        "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3",
+        "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 b - - 12 40",
+    ],
+)
+def test_fen_round_trip(fen: str) -> None:
+    state = BoardState.from_fen(fen)
+    assert state.to_fen() == fen
+    assert Board.from_fen(fen).state.to_fen() == fen
+
+
+def test_fen_matches_object_board_and_tracks_moves() -> None:
+    from_pieces = Board.from_pieces(deepcopy(STARTING_PIECES)).state
+    parsed = BoardState.from_fen(START_FEN)
+    assert np.array_equal(parsed.grid, from_pieces.grid)
+    assert parsed.hash_key() == from_pieces.hash_key()
+    assert parsed.castling == from_pieces.castling
+
+    board = Board.from_fen(START_FEN)
+    for origin, target in (((4, 6), (4, 4)), ((2, 1), (2, 3)), ((4, 4), (4, 3)), ((3, 1), (3, 3))):
+        assert board.move_piece(board.board[Position(*origin)], Position(*target))[0]
+    assert board.state.to_fen() == ("rnbqkbnr/pp2pppp/8/2ppP3/8/8/PPPP1PPP/RNBQKBNR w KQkq d6 0 3")
+    # A double push with no pawn able to capture records no en-passant square.
+    assert BoardState.from_fen("4k3/8/8/8/4P3/8/8/4K3 b - e3 0 1").ep_file == -1
+
+
+@pytest.mark.parametrize(
+    "fen",
+    [
+        "8/8/8/8/8/8/8/8 w - - 0 1",
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w KQkq - 0 1",
+        "rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1",
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - zero 1",
+    ],
+)
+def test_fen_rejects_malformed_input(fen: str) -> None:
+    with pytest.raises(ValueError):
+        BoardState.from_fen(fen)
+
+
+@pytest.mark.parametrize(
+    ("fen", "move", "see"),
+    [
+        ("4k3/8/2p5/3p4/8/8/8/3QK3 w - - 0 1", (3, 7, 3, 3), -8),  # QxP defended by a pawn
+        ("4k3/8/8/3p4/8/8/8/3RK3 w - - 0 1", (3, 7, 3, 3), 1),  # undefended pawn
+        ("4k3/8/4p3/3n4/4P3/8/8/4K3 w - - 0 1", (4, 4, 3, 3), 2),  # PxN, pawn recaptures
+        ("3rk3/3r4/8/3p4/8/8/3R4/3RK3 w - - 0 1", (3, 6, 3, 3), -4),  # x-ray rooks
+        ("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1", (4, 3, 3, 2), 1),  # en passant
+        ("1n2k3/P7/8/8/8/8/8/4K3 w - - 0 1", (0, 1, 1, 0, QUEEN), 11),  # capture-promotion
+    ],
+)
+def test_static_exchange_evaluation(fen: str, move: tuple[int, ...], see: int) -> None:
+    state = BoardState.from_fen(fen)
+    assert state.see(move) == see
+    assert state.to_fen() == fen
+    assert state.is_capture(move)
+
+
+def test_attackers_lists_every_piece_on_the_square() -> None:
+    state = BoardState.from_fen("4k3/8/2p5/3p4/8/2N5/8/3QK3 w - - 0 1")
+    assert sorted(state.attackers(3, 3, 0)) == [(2, 5), (3, 7)]
+    assert state.attackers(3, 3, 1) == [(2, 2)]
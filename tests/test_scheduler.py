@@ -0,0 +1,155 @@
+"""Multi-game search scheduler."""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import Future
+from copy import deepcopy
+
+import pytest
+
+from chess.ai.minmax import MinMaxAgent, _order_moves, _score_root_move, _worker_agents
+from chess.ai.scheduler import SearchScheduler
+from chess.core.board import Board
+from chess.core.board_state import BoardState
+from chess.core.piece import STARTING_PIECES
+from chess.core.types import Color
+
+
+class _ManualExecutor:
+    """Records submitted work units and runs them only when asked."""
+
+    def __init__(self) -> None:
+        self.submitted: list[tuple[tuple, Future]] = []
+
+    def submit(self, fn, *args):
+        future: Future = Future()
+        self.submitted.append((args, future))
+        return future
+
+    def run_next(self) -> None:
+        for args, future in self.submitted:
+            if not future.done():
+                future.set_result(_score_root_move(*args))
+                return
+
+    def shutdown(self, **_kwargs) -> None:
+        pass
+
+
+@pytest.fixture
+def start_state() -> BoardState:
+    board = Board.from_pieces(deepcopy(STARTING_PIECES))
+    board.update()
+    return board.state
+
+
+@pytest.fixture
+def reply_state(start_state: BoardState) -> BoardState:
+    state = BoardState.from_search_state(start_state.to_search_state())
+    state.make_move(4, 6, 4, 4)
+    return state
+
+
+def test_state_round_trips_through_search_tuple(start_state: BoardState) -> None:
+    restored = BoardState.from_search_state(start_state.to_search_state())
+    assert restored.hash_key() == start_state.hash_key()
+    assert restored.castling == start_state.castling
+
+
+def test_scheduler_bounds_inflight_and_completes_jobs(start_state: BoardState) -> None:
+    executor = _ManualExecutor()
+    scheduler = SearchScheduler(workers=1, executor=executor)
+    agent = MinMaxAgent(color=Color.WHITE, depth=1, workers=1)
+
+    first = scheduler.submit("a", start_state, agent)
+    second = scheduler.submit("b", start_state, agent)
+    assert len(executor.submitted) == 1
+    assert scheduler.metrics().queue_depth == 39
+
+    while not (first.done() and second.done()):
+        executor.run_next()
+
+    legal = start_state.generate_legal_moves()
+    assert first.result() in legal
+    assert second.result() in legal
+    metrics = scheduler.metrics()
+    assert metrics.completed_jobs == 2
+    assert metrics.queue_depth == 0
+    assert metrics.inflight == 0
+
+
+def test_scheduler_alternates_between_equal_games(
+    start_state: BoardState, reply_state: BoardState
+) -> None:
+    executor = _ManualExecutor()
+    scheduler = SearchScheduler(workers=1, executor=executor)
+    scheduler.submit("white", start_state, MinMaxAgent(color=Color.WHITE, depth=1))
+    scheduler.submit("black", reply_state, MinMaxAgent(color=Color.BLACK, depth=1))
+
+    for _ in range(5):
+        executor.run_next()
+    owners = [args[0][0][0] for args, _ in executor.submitted[:6]]
+    white, black = Color.WHITE.value, Color.BLACK.value
+    assert owners == [white, black, white, black, white, black]
+
+
+def test_scheduler_priority_preempts_fair_share(start_state: BoardState) -> None:
+    executor = _ManualExecutor()
+    scheduler = SearchScheduler(workers=1, executor=executor)
+    agent = MinMaxAgent(color=Color.WHITE, depth=1, workers=1)
+    low = scheduler.submit("low", start_state, agent)
+    high = scheduler.submit("high", start_state, agent, priority=5)
+
+    while not high.done():
+        executor.run_next()
+    assert not low.done()
+    assert scheduler.metrics().queued_jobs == 1
+    scheduler.shutdown()
+    assert low.cancelled()
+
+
+def test_scheduler_resolves_expired_job_with_best_so_far(start_state: BoardState) -> None:
+    executor = _ManualExecutor()
+    scheduler = SearchScheduler(workers=2, executor=executor)
+    agent = MinMaxAgent(color=Color.WHITE, depth=1, workers=1)
+    job = scheduler.submit("a", start_state, agent, deadline=time.monotonic() + 1.0)
+    executor.run_next()
+    executor.run_next()
+    assert not job.done()
+
+    # Two units scored (a3, then the better a4), two more dispatched but never run.
+    ordered = _order_moves(start_state, start_state.generate_legal_moves())
+    assert job.result(timeout=5) == ordered[1] != ordered[0]
+    assert len(executor.submitted) == 4
+    assert scheduler.metrics().expired_jobs == 1
+    scheduler.shutdown()
+
+
+def test_scheduler_expires_queued_job_without_any_scored_move(start_state: BoardState) -> None:
+    executor = _ManualExecutor()
+    scheduler = SearchScheduler(workers=1, executor=executor)
+    agent = MinMaxAgent(color=Color.WHITE, depth=1, workers=1)
+    busy = scheduler.submit("busy", start_state, agent, priority=5)
+    late = scheduler.submit("late", start_state, agent, deadline=time.monotonic() + 0.05)
+
+    # Nothing completes, so only the deadline watcher can resolve the queued job.
+    ordered = _order_moves(start_state, start_state.generate_legal_moves())
+    assert late.result(timeout=5) == ordered[0]
+    assert not busy.done() and len(executor.submitted) == 1
+    assert scheduler.metrics().expired_jobs == 1
+    scheduler.shutdown()
+
+
+def test_scheduler_keeps_one_worker_tt_per_active_game(start_state: BoardState) -> None:
+    executor = _ManualExecutor()
+    scheduler = SearchScheduler(workers=1, executor=executor)
+    agents = [MinMaxAgent(color=Color.WHITE, depth=1, workers=1) for _ in range(4)]
+    for _ in range(2):
+        jobs = [scheduler.submit(f"g{i}", start_state, agent) for i, agent in enumerate(agents)]
+        while not all(job.done() for job in jobs):
+            executor.run_next()
+        # Units of the four games alternated on the single worker, yet none lost its TT.
+        assert all(agent._lineage in _worker_agents for agent in agents)
+    assert all(args[2] == 4 for args, _ in executor.submitted[-20:])
+    scheduler.shutdown()
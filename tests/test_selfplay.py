@@ -0,0 +1,40 @@
+"""Headless self-play games and their records."""
+
+from __future__ import annotations
+
+import json
+
+from chess.ai.selfplay import game_outcome, play_game, run_selfplay
+from chess.core.board_state import BoardState, move_to_uci
+
+
+def test_game_outcome_reports_mate_stalemate_and_ongoing() -> None:
+    fools_mate = "rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3"
+    assert game_outcome(BoardState.from_fen(fools_mate)) == ("0-1", "checkmate")
+    assert game_outcome(BoardState.from_fen("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1")) == (
+        "1/2-1/2",
+        "stalemate",
+    )
+    assert game_outcome(BoardState.initial()) is None
+
+
+def test_play_game_records_legal_moves_with_timings() -> None:
+    game = play_game(0, seed=7, depth=1, max_plies=6)
+    assert (game.result, game.termination) == ("*", "max_plies")
+    assert len(game.moves) == len(game.move_ms) == 6
+    state = BoardState.initial()
+    for text in game.moves:
+        legal = {move_to_uci(move): move for move in state.generate_legal_moves()}
+        assert text in legal
+        state.make_move(*legal[text])
+    assert json.loads(game.to_json())["moves"] == game.moves
+
+
+def test_run_selfplay_is_reproducible_from_seed() -> None:
+    def run() -> list[list[str]]:
+        games = run_selfplay(2, 1, max_n_samples=4, max_plies=8, workers=1, seed=3)
+        return [game.moves for game in sorted(games, key=lambda game: game.index)]
+
+    first = run()
+    assert first == run()
+    assert first[0] != first[1]
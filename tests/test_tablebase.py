@@ -0,0 +1,110 @@
+"""Endgame tablebase solver, indexing, and probing."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from chess.ai.minmax import MinMaxAgent
+from chess.ai.tablebase import _BASE, Tablebase, _layout, parse_signature, solve
+from chess.core.board_state import KING, MATE_SCORE, QUEEN, BoardState
+from chess.core.types import Color
+
+
+def _kqk(turn: int) -> BoardState:
+    state = BoardState()
+    state.grid[:] = 0
+    state.grid[2, 2] = KING
+    state.grid[0, 0] = -KING
+    state.grid[5, 1] = QUEEN
+    state.wkx, state.wky = 2, 2
+    state.bkx, state.bky = 0, 0
+    state.castling = 0
+    state.turn = turn
+    return state
+
+
+def test_solve_propagates_mate_distances_and_draws() -> None:
+    # 0 -> 1 -> 2 (mated); 3 <-> 4 cycle; 5 -> fixed external win for the opponent.
+    offsets = np.array([0, 1, 2, 2, 3, 4, 5])
+    children = np.array([1, 2, 4, 3, 6])
+    fixed = np.array([_BASE - 3])
+    mated = np.array([False, False, True, False, False, False])
+    values = solve(offsets, children, fixed, mated)
+    assert values.tolist() == [-(_BASE - 2), _BASE - 1, -_BASE, 0, 0, -(_BASE - 4)]
+
+
+def test_signatures_are_normalised() -> None:
+    assert parse_signature("kqvk")[0] == [KING, QUEEN]
+    with pytest.raises(ValueError, match="stronger"):
+        parse_signature("KvKQ")
+    with pytest.raises(ValueError, match="more than"):
+        parse_signature("KQRvKR")
+
+
+def test_symmetric_positions_share_an_index() -> None:
+    layout = _layout("KQvK")
+    squares = [(2, 2), (1, 5), (0, 0)]
+    mirrored = [(7 - x, y) for x, y in squares]
+    assert layout.index(squares, 0) == layout.index(mirrored, 0)
+    decoded, turn = layout.decode(layout.index(squares, 1))
+    assert turn == 1
+    assert layout.index(decoded, 1) == layout.index(squares, 1)
+
+
+def test_probe_without_tables(tmp_path: Path) -> None:
+    tablebase = Tablebase(tmp_path)
+    bare = _kqk(0)
+    bare.grid[5, 1] = 0
+    assert tablebase.probe(bare) == (0, 0)
+    assert tablebase.probe(_kqk(0)) is None
+    assert tablebase.best_move(_kqk(0)) is None
+
+
+class _StubTablebase:
+    directory = Path("stub")
+    max_pieces = 3
+
+    def probe(self, state: BoardState) -> tuple[int, int] | None:
+        return (1, 1) if state.turn == 0 else (-1, 2)
+
+    def best_move(self, state: BoardState) -> tuple[int, int, int, int]:
+        return (1, 5, 1, 1)
+
+
+def test_agent_probes_tablebase_at_leaves_and_root() -> None:
+    agent = MinMaxAgent(color=Color.WHITE, depth=4, workers=1, tablebase=_StubTablebase())
+    assert agent.evaluate_state(_kqk(0)) > 50_000
+    assert agent.evaluate_state(_kqk(1)) > 50_000
+    assert agent.search(_kqk(0)) == (1, 5, 1, 1)
+    assert not agent._tt
+
+
+def test_agent_skips_probes_outside_the_endgame(tmp_path: Path) -> None:
+    stub = _StubTablebase()
+    stub.probe = None  # type: ignore[assignment]  # any call would raise
+    agent = MinMaxAgent(color=Color.WHITE, depth=1, workers=1, tablebase=stub)
+    agent.evaluate_state(BoardState.initial())
+    assert Tablebase(tmp_path).max_pieces == 0
+
+
+@pytest.mark.slow
+def test_built_kqk_table_plays_the_longest_mate(tmp_path: Path) -> None:
+    tablebase = Tablebase(tmp_path)
+    assert tablebase.max_pieces == 0
+    tablebase.build("KQvK")
+    assert tablebase.max_pieces == 3
+
+    # Longest White-to-move KQvK win: mate in 10 (19 plies).
+    state = BoardState.from_fen("K7/1Q6/8/8/5k2/8/8/8 w - - 0 1")
+    assert tablebase.probe(state) == (1, 19)
+    agent = MinMaxAgent(color=Color.WHITE, depth=1, workers=1, tablebase=tablebase)
+    assert agent.evaluate_state(state) == MATE_SCORE - 19
+
+    # Each best move brings mate one ply closer, for the defender as well.
+    for dtm in range(18, -1, -1):
+        state.make_move(*tablebase.best_move(state))
+        assert tablebase.probe(state) == (-1 if dtm % 2 == 0 else 1, dtm)
+    assert not state.has_legal_move() and state.in_check(state.turn)
@@ -0,0 +1,68 @@
+"""UCI front-end: protocol replies, time budgets and interruptible search."""
+
+from __future__ import annotations
+
+import time
+
+from chess.config import AppSettings
+from chess.uci import GoLimits, UciEngine, format_score
+
+MATE_IN_ONE = "6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1"
+
+
+def _engine() -> tuple[UciEngine, list[str]]:
+    lines: list[str] = []
+    return UciEngine(AppSettings(), write=lines.append), lines
+
+
+def test_go_limits_parse_and_budget() -> None:
+    limits = GoLimits.parse(
+        ["wtime", "60000", "btime", "30000", "winc", "1000", "binc", "0", "movestogo", "20"]
+    )
+    assert limits.budget_ms(0) == 60000 / 20 + 750
+    assert limits.budget_ms(1) == 30000 / 20
+    assert GoLimits.parse(["depth", "3"]).budget_ms(0) is None
+    assert GoLimits.parse(["infinite"]).infinite
+    assert format_score(1.25) == "cp 125"
+    assert format_score(100_000.0 - 1) == "mate 1"
+    assert format_score(-(100_000.0 - 2)) == "mate -1"
+    assert format_score(100_000.0 - 5) == "mate 3"
+
+
+def test_handshake_position_and_depth_limited_go() -> None:
+    engine, lines = _engine()
+    engine.handle("uci")
+    assert lines[0].startswith("id name") and lines[-1] == "uciok"
+    assert any(line.startswith("option name Hash") for line in lines)
+    engine.handle("setoption name Hash value 8")
+    assert engine.hash_mb == 8
+    engine.handle(f"position fen {MATE_IN_ONE}")
+    engine.handle("go depth 2")
+    engine.wait()
+    infos = [line for line in lines if line.startswith("info depth")]
+    assert [line.split()[2] for line in infos] == ["1", "2"]
+    assert "score mate 1" in infos[-1] and " pv a1a8" in infos[-1]
+    assert lines[-1] == "bestmove a1a8"
+
+
+def test_mate_distance_comes_from_the_score_not_the_pv() -> None:
+    engine, lines = _engine()
+    # 1. Kb6 Kb8 2. Rh8#: three plies, so mate in two moves.
+    engine.handle("position fen k7/8/2K5/8/8/8/8/7R w - - 0 1")
+    engine.handle("go depth 5")
+    engine.wait()
+    infos = [line for line in lines if line.startswith("info depth")]
+    assert all("score mate 2" in line for line in infos[2:])
+
+
+def test_position_moves_and_stop_interrupts_infinite_search() -> None:
+    engine, lines = _engine()
+    engine.handle("position startpos moves e2e4 e7e5 g1f3")
+    assert engine.state.turn == 1
+    engine.handle("go infinite")
+    time.sleep(0.2)
+    assert not any(line.startswith("bestmove") for line in lines)
+    start = time.perf_counter()
+    engine.handle("stop")
+    assert time.perf_counter() - start < 2
+    assert lines[-1].startswith("bestmove ") and lines[-1] != "bestmove 0000"